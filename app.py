@@ -5,6 +5,7 @@ Orquestra o processamento e permite download dos arquivos gerados
 """
 
 import os
+import json
 import sys
 import streamlit as st
 from pathlib import Path
@@ -12,7 +13,7 @@ import logging
 from datetime import datetime
 import pandas as pd
 import time
-from glob import glob
+from functools import partial
 from PIL import Image
 import pytz
 
@@ -20,12 +21,14 @@ import pytz
 sys.path.append(str(Path(__file__).parent))
 
 # Importar módulos do projeto
-from src.config_manager import ConfigManager
-from src.api_caller import APICaller
+from src.config_manager import ConfigManager, env_flag
+from src.pipeline import run_pipeline, request_key
 from src.protagonismo_analyzer import ProtagonismoAnalyzer
-from src.data_consolidator import DataConsolidator
-from src.batch_processor import BatchProcessor
-from src.utils.file_utils import create_directories
+from src.api_caller import APICaller
+from src.job_runner import get_job_runner, STATUS_NA_FILA
+from src.artifact_catalog import ArtifactCatalog, TIPO_DOWNLOAD_LOTE_FINAL, TIPO_RELATORIO_EXECUCAO
+from src.utils.log_tail import LogTailer
+from src.utils.logging_setup import setup_logging, close_log_file, FORMATO_PADRAO
 
 # Configuração da página
 st.set_page_config(
@@ -48,28 +51,6 @@ class SaoPauloFormatter(logging.Formatter):
             s = ct.strftime(self.default_time_format)
         return s
 
-def setup_logging():
-    """Configura o sistema de logging"""
-    formatter = SaoPauloFormatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Garantir que o diretório de logs existe
-    log_dir = Path('logs')
-    log_dir.mkdir(exist_ok=True)
-    
-    file_handler = logging.FileHandler(log_dir / 'app.log', encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        handlers=[file_handler, stream_handler]
-    )
-    return logging.getLogger(__name__)
-
 def rotate_logs():
     """Rotaciona os arquivos de log para manter apenas os últimos 3 processamentos"""
     logger.info("Iniciando rotação de logs")
@@ -101,9 +82,15 @@ def rotate_logs():
     
     # Mover o principal para .1
     base_log.rename(log_1)
+    
+    # Fecha os handlers que escreviam no arquivo movido; na próxima mensagem eles reabrem
+    # um novo app.log (senão continuariam gravando em app.log.1)
+    close_log_file(base_log)
     logger.info("Movido app.log para app.log.1")
 
-logger = setup_logging()
+# Gravação dos logs em segundo plano (configurada uma única vez por processo)
+logger = setup_logging(SaoPauloFormatter(fmt=FORMATO_PADRAO),
+                       calls_log=env_flag('LOG_CHAMADAS_DEEPSEEK'))
 
 # Inicialização do session state
 if 'processing' not in st.session_state:
@@ -112,145 +99,297 @@ if 'last_processed_file' not in st.session_state:
     st.session_state.last_processed_file = None
 if 'processing_confirmed' not in st.session_state:
     st.session_state.processing_confirmed = False
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'extrair_marcas' not in st.session_state:
+    st.session_state.extrair_marcas = env_flag('EXTRAIR_MARCAS')
+if 'analise_combinada' not in st.session_state:
+    st.session_state.analise_combinada = env_flag('ANALISE_COMBINADA')
+
+# Validade (segundos) das listagens em cache; o cache também é invalidado a cada
+# alteração no catálogo de artefatos (a versão do catálogo faz parte da chave)
+TTL_LISTAGENS = 30
+
+@st.cache_resource(show_spinner=False)
+def get_config_manager():
+    """Configurações do sistema (instância única, compartilhada entre sessões e reruns)"""
+    config_manager = ConfigManager()
+    logger.info("Configurações carregadas com sucesso")
+    return config_manager
+
+@st.cache_resource(show_spinner=False)
+def get_protagonismo_analyzer():
+    """Analisador de protagonismo com porta-vozes carregados e padrões pré-compilados"""
+    return ProtagonismoAnalyzer(get_config_manager())
+
+@st.cache_resource(show_spinner=False)
+def get_api_caller():
+    """Cliente da API de clippings (sessão HTTP reaproveitada entre execuções)"""
+    return APICaller(get_config_manager())
+
+@st.cache_resource(show_spinner=False)
+def get_artifact_catalog():
+    """Catálogo de artefatos (schema verificado uma única vez)"""
+    return ArtifactCatalog(get_config_manager())
+
+@st.cache_data(ttl=TTL_LISTAGENS, show_spinner=False)
+def _list_latest_files(versao_catalogo, directory, pattern, limit):
+    """Consulta o catálogo; resultado em cache até a próxima alteração do catálogo"""
+    sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
+    catalog = get_artifact_catalog()
+    
+    # Incorpora ao catálogo arquivos gerados antes dele existir (apenas uma vez)
+    catalog.index_existing(directory, pattern, TIPO_DOWNLOAD_LOTE_FINAL)
+    
+    return [
+        (item['caminho'], item['nome'], datetime.fromtimestamp(item['mtime'], tz=sao_paulo_tz))
+        for item in catalog.list_recent(TIPO_DOWNLOAD_LOTE_FINAL, limit)
+    ]
 
 def get_latest_files(directory='downloads', pattern='Tabela_atualizacao_em_lote_limpo_*.xlsx', limit=10):
     """
-    Retorna os últimos N arquivos que correspondem ao padrão especificado
+    Retorna os últimos N arquivos disponíveis para download
+    ATUALIZADO: Consulta o catálogo de artefatos em vez de varrer diretórios (com cache)
     
     Args:
-        directory: Diretório onde procurar os arquivos
-        pattern: Padrão de nome dos arquivos
+        directory: Diretório indexado na primeira consulta (arquivos anteriores ao catálogo)
+        pattern: Padrão de nome dos arquivos indexados na primeira consulta
         limit: Número máximo de arquivos a retornar
     
     Returns:
         Lista de tuplas (caminho_completo, nome_arquivo, data_modificação)
     """
     try:
-        # Fuso horário de São Paulo
-        sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
-        
-        # Tentar vários caminhos possíveis
-        possible_paths = [
-            directory,
-            f'/app/{directory}',
-            os.path.join(os.getcwd(), directory)
-        ]
-        
-        files = []
-        for base_path in possible_paths:
-            if os.path.exists(base_path):
-                search_pattern = os.path.join(base_path, pattern)
-                found_files = glob(search_pattern)
-                if found_files:
-                    files.extend(found_files)
-                    break
+        versao = get_artifact_catalog().version()
+        return _list_latest_files(versao, directory, pattern, limit)
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar arquivos: {str(e)}")
+        return []
+
+@st.cache_data(ttl=TTL_LISTAGENS, show_spinner=False)
+def _load_latest_run_report(versao_catalogo):
+    """Relatório de desempenho da última execução (cache até a próxima alteração do catálogo)"""
+    for item in get_artifact_catalog().list_recent(TIPO_RELATORIO_EXECUCAO, 1):
+        with open(item['caminho'], 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+def get_latest_run_report():
+    """Retorna o relatório da última execução (run_report_*.json) ou None"""
+    try:
+        return _load_latest_run_report(get_artifact_catalog().version())
+    except Exception as e:
+        logger.error(f"Erro ao ler relatório da execução: {str(e)}")
+        return None
+
+def render_run_report(relatorio):
+    """Exibe tempo, CPU, memória e linhas de cada etapa da última execução"""
+    with st.expander(f"⏱️ Perfil da execução {relatorio['run_id']}"):
+        col_tempo, col_cpu, col_memoria = st.columns(3)
+        col_tempo.metric("Duração", f"{relatorio['duracao_s']:.1f}s")
+        col_cpu.metric("CPU", f"{relatorio['cpu_processo_s']:.1f}s")
+        col_memoria.metric("Pico RSS", f"{relatorio['pico_rss_mb']} MB" if relatorio.get('pico_rss_mb') else "-")
         
-        if not files:
-            # Se não encontrou nada, criar o diretório
-            Path(directory).mkdir(parents=True, exist_ok=True)
-            logger.warning(f"Nenhum arquivo encontrado em {directory} com padrão {pattern}")
-            return []
+        etapas = pd.DataFrame(relatorio.get('etapas', []))
+        if not etapas.empty:
+            colunas = [c for c in ['etapa', 'duracao_s', 'cpu_thread_s', 'linhas_entrada', 'linhas_saida',
+                                   'deepseek_s', 'regras_s', 'pico_rss_mb', 'pico_tracemalloc_mb']
+                       if c in etapas.columns]
+            st.dataframe(etapas[colunas], hide_index=True, use_container_width=True)
         
-        # Remover duplicatas mantendo o caminho mais curto
-        unique_files = {}
-        for f in files:
-            basename = os.path.basename(f)
-            if basename not in unique_files or len(f) < len(unique_files[basename]):
-                unique_files[basename] = f
+        secoes = relatorio.get('secoes') or {}
+        if secoes:
+            st.dataframe(
+                pd.DataFrame([{'seção': nome, **secao} for nome, secao in secoes.items()]),
+                hide_index=True, use_container_width=True
+            )
         
-        # Ordenar por data de modificação (mais recente primeiro)
-        files_with_time = [
-            (f, os.path.basename(f), datetime.fromtimestamp(os.path.getmtime(f), tz=sao_paulo_tz))
-            for f in unique_files.values()
-        ]
-        files_with_time.sort(key=lambda x: x[2], reverse=True)
+        orcamento = relatorio.get('orcamento')
+        if orcamento:
+            esgotado = f" - orçamento esgotado por {orcamento['esgotado_por']}" if orcamento.get('esgotado_por') else ""
+            st.caption(f"Modo orçamento: {orcamento['chamadas']} chamadas à DeepSeek, "
+                       f"{orcamento['recusadas']} nível(is) por regra{esgotado}")
         
-        logger.info(f"Encontrados {len(files_with_time)} arquivo(s) em {directory}")
+        repeticoes = relatorio.get('repeticoes_deepseek')
+        if repeticoes:
+            st.caption(f"Falhas transitórias: {repeticoes['enfileirados']} par(es) repetido(s) "
+                       f"({repeticoes['repeticoes']} repetições em {repeticoes['rodadas']} rodada(s)), "
+                       f"{repeticoes['permanentes']} falha(s) permanente(s)")
         
-        return files_with_time[:limit]
+        render_token_usage(relatorio)
+
+def render_token_usage(relatorio):
+    """Exibe requisições, tokens e custo da execução por caminho de decisão e por marca"""
+    deepseek = relatorio.get('deepseek')
+    if deepseek:
+        col_chamadas, col_tokens, col_cache, col_custo = st.columns(4)
+        col_chamadas.metric("Chamadas DeepSeek", deepseek.get('chamadas', 0))
+        col_tokens.metric("Tokens", deepseek.get('prompt_tokens', 0) + deepseek.get('completion_tokens', 0))
+        col_cache.metric("Prompt em cache", deepseek.get('cached_tokens', 0))
+        col_custo.metric("Custo estimado", f"US$ {deepseek.get('custo_usd', 0):.4f}")
+        if deepseek.get('streams_interrompidos'):
+            st.caption(f"Streams encerrados antecipadamente: {deepseek['streams_interrompidos']} · Tokens estimados: "
+                       f"{deepseek.get('prompt_tokens_estimados', 0) + deepseek.get('completion_tokens_estimados', 0)}")
+        if deepseek.get('timeouts') or deepseek.get('hedges'):
+            st.caption(f"Timeouts: {deepseek.get('timeouts', 0)} · Requisições duplicadas (hedge): "
+                       f"{deepseek.get('hedges', 0)}, {deepseek.get('hedges_vencedores', 0)} vencedoras")
     
-    except Exception as e:
-        logger.error(f"Erro ao buscar arquivos: {str(e)}")
-        return []
+    tokens = relatorio.get('tokens_protagonismo')
+    if not tokens:
+        return
+    colunas = ['decisoes', 'requisicoes', 'prompt_tokens', 'cached_tokens', 'completion_tokens',
+               'prompt_tokens_estimados', 'completion_tokens_estimados', 'custo_usd']
+    st.caption("Protagonismo por caminho de decisão")
+    st.dataframe(
+        pd.DataFrame([{'caminho': caminho, **valores} for caminho, valores in tokens['por_caminho'].items()],
+                     columns=['caminho'] + colunas),
+        hide_index=True, use_container_width=True
+    )
+    if tokens.get('por_marca'):
+        st.caption("Protagonismo por marca")
+        st.dataframe(
+            pd.DataFrame([{'marca': marca, **valores['total']} for marca, valores in tokens['por_marca'].items()],
+                         columns=['marca'] + colunas),
+            hide_index=True, use_container_width=True
+        )
 
-def run_processing():
+@st.cache_data(ttl=TTL_LISTAGENS, max_entries=20, show_spinner=False)
+def _read_file_bytes(filepath, mtime):
     """
-    Executa o processamento completo do sistema
+    Conteúdo de um arquivo para download (relido apenas se o arquivo mudar)
+    mtime vem do registro no catálogo: nenhuma chamada a stat() a cada rerun
     """
-    try:
-        # Criar diretórios necessários
-        create_directories()
-        
-        # Carregar configurações
-        config_manager = ConfigManager()
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+# Rótulos das etapas exibidos no painel de progresso
+ROTULOS_ETAPAS = {
+    'api': '📡 Chamando API e carregando dados',
+    'marcas': '🏷️ Extraindo marcas (análise de exclusividade)',
+    'protagonismo': '🔍 Analisando protagonismo das marcas',
+    'consolidacao': '📊 Consolidando dados',
+    'lote': '⚙️ Processando em lote e gerando arquivo final'
+}
+
+def _resolve_download_path(arquivo_final):
+    """Retorna o caminho da cópia em downloads (mesmo caminho registrado no catálogo)"""
+    arquivo_download = Path(f"downloads/{os.path.basename(arquivo_final)}")
+    if arquivo_download.exists():
+        return str(arquivo_download.resolve())
+    elif os.path.exists(arquivo_final):
+        return arquivo_final
+    elif os.path.exists(f"/app/downloads/{os.path.basename(arquivo_final)}"):
+        return f"/app/downloads/{os.path.basename(arquivo_final)}"
+    else:
+        logger.warning(f"Arquivo gerado mas não encontrado em: {arquivo_final}")
+        return arquivo_final
+
+def _processing_job(progress_callback, cache, extrair_marcas=None, analise_combinada=None):
+    """
+    Executa o processamento completo (roda na thread do job, fora do script Streamlit)
+    
+    O cache é compartilhado entre jobs da fila e semeado com os recursos da interface
+    (configurações, analisador e cliente da API já inicializados)
+    """
+    config_manager = cache.get('config_manager')
+    if config_manager is None:
+        config_manager = cache['config_manager'] = ConfigManager()
         logger.info("Configurações carregadas com sucesso")
+    
+    analyzer = cache.get('protagonismo_analyzer')
+    if analyzer is None:
+        analyzer = cache['protagonismo_analyzer'] = ProtagonismoAnalyzer(config_manager)
+    else:
+        analyzer.refresh_porta_vozes()
+    
+    arquivo_final = run_pipeline(config_manager, progress_callback=progress_callback,
+                                 protagonismo_analyzer=analyzer,
+                                 api_caller=cache.get('api_caller'),
+                                 extrair_marcas=extrair_marcas,
+                                 analise_combinada=analise_combinada)
+    
+    if not arquivo_final:
+        return None
+    return _resolve_download_path(arquivo_final)
+
+def run_processing(extrair_marcas=False, analise_combinada=False):
+    """
+    Enfileira o processamento completo em segundo plano
+    
+    Pedidos idênticos a um processamento já na fila ou em execução são anexados a ele
+    
+    Args:
+        extrair_marcas: Executa também a extração de marcas (análise de exclusividade)
+        analise_combinada: Extrai marcas e protagonismo em uma única chamada por notícia
+    
+    Returns:
+        Identificador do job (consultado a cada execução do script)
+    """
+    runner = get_job_runner()
+    config_manager = get_config_manager()
+    runner.cache.setdefault('config_manager', config_manager)
+    runner.cache.setdefault('protagonismo_analyzer', get_protagonismo_analyzer())
+    runner.cache.setdefault('api_caller', get_api_caller())
+    return runner.submit(partial(_processing_job, extrair_marcas=extrair_marcas,
+                                 analise_combinada=analise_combinada),
+                         chave=request_key(config_manager, extrair_marcas, analise_combinada))
+
+def render_job_progress(estado):
+    """Exibe o progresso publicado pelo job em execução"""
+    if estado['status'] == STATUS_NA_FILA:
+        st.info("⏳ Processamento na fila. Será iniciado assim que o processamento atual terminar.")
+    elif 'fila' in estado['etapas'] and len(estado['etapas']) == 1:
+        st.info("⏳ Aguardando outro processamento (iniciado fora desta interface) terminar.")
+    else:
+        st.info("🔄 Processamento em andamento. A página pode ser recarregada sem interromper o processamento.")
+    
+    for etapa, rotulo in ROTULOS_ETAPAS.items():
+        evento = estado['etapas'].get(etapa)
+        if not evento:
+            continue
         
-        # Etapa 1: Chamar API e carregar dados
-        with st.spinner('📡 Chamando API e carregando dados...'):
-            logger.info("Iniciando chamada da API...")
-            api_caller = APICaller(config_manager)
-            final_df = api_caller.fetch_data()
-            
-            if final_df.empty:
-                st.error("❌ Nenhum dado foi retornado pela API")
-                return None
-            
-            logger.info(f"API retornou {len(final_df)} registros")
-            st.success(f"✅ API retornou {len(final_df)} registros")
-        
-        # Etapa 2: Análise de protagonismo
-        with st.spinner('🔍 Analisando protagonismo das marcas...'):
-            logger.info("Iniciando análise de protagonismo...")
-            protagonismo_analyzer = ProtagonismoAnalyzer(config_manager)
-            df_resultados = protagonismo_analyzer.analyze_protagonismo(final_df)
-            
-            if df_resultados.empty:
-                st.error("❌ Análise de protagonismo não retornou resultados")
-                return None
-            
-            logger.info(f"Análise de protagonismo gerou {len(df_resultados)} resultados")
-            st.success(f"✅ Análise gerou {len(df_resultados)} resultados")
+        if evento.get('status') == 'concluida':
+            registros = evento.get('registros')
+            st.success(f"✅ {rotulo}" + (f" - {registros} registros" if registros is not None else ""))
+            continue
         
-        # Etapa 3: Consolidação dos dados
-        with st.spinner('📊 Consolidando dados...'):
-            logger.info("Iniciando consolidação dos dados...")
-            consolidator = DataConsolidator(config_manager)
-            final_df_consolidado = consolidator.consolidate_data(final_df, df_resultados)
-            
-            logger.info(f"Consolidação gerou {len(final_df_consolidado)} registros")
-            st.success(f"✅ Consolidação gerou {len(final_df_consolidado)} registros")
+        if evento.get('status') == 'erro':
+            st.warning(f"⚠️ {rotulo}: {evento.get('erro')}")
+            continue
         
-        # Etapa 4: Processamento em lote
-        with st.spinner('⚙️ Processando em lote e gerando arquivo final...'):
-            logger.info("Iniciando processamento em lote...")
-            batch_processor = BatchProcessor(config_manager)
-            arquivo_final = batch_processor.process_batch(final_df_consolidado, final_df)
-            
-            if arquivo_final:
-                logger.info(f"Processamento concluído. Arquivo gerado: {arquivo_final}")
-                st.success(f"✅ Arquivo gerado com sucesso!")
-                
-                # Tentar encontrar o arquivo no diretório de downloads
-                # O batch_processor pode retornar o caminho completo ou relativo
-                if os.path.exists(arquivo_final):
-                    return arquivo_final
-                elif os.path.exists(f"downloads/{os.path.basename(arquivo_final)}"):
-                    return f"downloads/{os.path.basename(arquivo_final)}"
-                elif os.path.exists(f"/app/downloads/{os.path.basename(arquivo_final)}"):
-                    return f"/app/downloads/{os.path.basename(arquivo_final)}"
-                else:
-                    logger.warning(f"Arquivo gerado mas não encontrado em: {arquivo_final}")
-                    return arquivo_final
-            else:
-                logger.error("Erro ao gerar arquivo final")
-                return None
+        processados = evento.get('processados')
+        total = evento.get('total')
+        if processados is not None and total:
+            st.progress(min(processados / total, 1.0), text=f"{rotulo}: {processados}/{total}")
+        else:
+            st.markdown(f"**{rotulo}...**")
         
-    except Exception as e:
-        logger.error(f"Erro durante a execução: {str(e)}", exc_info=True)
-        return None
+        if etapa == 'protagonismo' and 'chamadas_deepseek' in evento:
+            col_feitas, col_pendentes, col_eta = st.columns(3)
+            col_feitas.metric("Chamadas DeepSeek", evento['chamadas_deepseek'])
+            col_pendentes.metric("Pendentes (estimativa)", evento.get('chamadas_pendentes_estimadas', 0))
+            eta = estado.get('eta_etapas', {}).get(etapa)
+            col_eta.metric("Tempo restante", f"{int(eta // 60)}min {int(eta % 60)}s" if eta is not None else "-")
+    
+    anexos = f" | Pedidos anexados: {estado['anexos']}" if estado.get('anexos') else ""
+    st.caption(f"Job {estado['job_id']} | Decorrido: {int(estado['decorrido_segundos'])}s{anexos}")
+
+# Linhas do log atual exibidas enquanto há processamento em andamento
+LINHAS_LOG_PROCESSANDO = 15
+
+@st.cache_resource(show_spinner=False)
+def get_log_tailers():
+    """Leitores incrementais do log atual e dos rotacionados (guardam o deslocamento entre reruns)"""
+    log_dir = Path('logs')
+    return {
+        nome: LogTailer(log_dir / nome)
+        for nome in ['app.log', 'app.log.1', 'app.log.2', 'app.log.3']
+    }
 
+@st.cache_resource(show_spinner=False)
 def load_logo():
-    """Carrega o logo do Bradesco"""
+    """Carrega o logo do Bradesco (uma única vez por processo)"""
     logo_paths = [
         'bradesco-logo.png',
         '/app/bradesco-logo.png',
@@ -271,6 +410,13 @@ def load_logo():
 def main():
     """Interface principal do Streamlit"""
     
+    # Estado do job em segundo plano (reanexa a um job ativo após recarregar a página)
+    runner = get_job_runner()
+    job = runner.get(st.session_state.job_id) or runner.active_job()
+    if job:
+        st.session_state.job_id = job.job_id
+    st.session_state.processing = bool(job and job.ativo)
+    
     # Carregar e exibir logo no topo
     logo = load_logo()
     
@@ -315,27 +461,21 @@ def main():
         
         st.markdown("---")
         
-        # Informações de log
+        # Informações de log (tail incremental: apenas linhas novas são lidas a cada rerun)
         st.header("📝 Últimos Logs")
-        log_dir = Path('logs')
-        log_files = [log_dir / 'app.log', log_dir / 'app.log.1', log_dir / 'app.log.2', log_dir / 'app.log.3']
         all_logs = []
         
-        for log_file in log_files:
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-                        lines = f.readlines()
-                        if lines:
-                            # Pegar as últimas 3 linhas de cada arquivo de log
-                            last_lines = lines[-3:]
-                            all_logs.extend(last_lines)
-                except Exception as e:
-                    logger.error(f"Erro ao ler {log_file}: {str(e)}")
+        for log_file, tailer in get_log_tailers().items():
+            # Durante o processamento, acompanha mais linhas do log atual
+            n_linhas = LINHAS_LOG_PROCESSANDO if log_file == 'app.log' and st.session_state.processing else 3
+            try:
+                all_logs.extend(tailer.tail(n_linhas))
+            except Exception as e:
+                logger.error(f"Erro ao ler {log_file}: {str(e)}")
         
         if all_logs:
             # Combinar todas as linhas (já ordenadas por recência de arquivo)
-            last_logs = ''.join(all_logs)
+            last_logs = '\n'.join(all_logs)
             st.text_area("Logs", last_logs, height=200, label_visibility="collapsed")
         else:
             st.info("Nenhum log disponível ainda")
@@ -348,6 +488,18 @@ def main():
         
         # Botão de processamento
         if not st.session_state.processing:
+            st.checkbox(
+                "🏷️ Extrair marcas (análise de exclusividade)",
+                key='extrair_marcas',
+                disabled=st.session_state.processing_confirmed,
+                help="Executa a extração de marcas do mês sobre os mesmos dados, em paralelo com o protagonismo"
+            )
+            st.checkbox(
+                "🔗 Análise combinada (uma chamada por notícia)",
+                key='analise_combinada',
+                disabled=st.session_state.processing_confirmed or not st.session_state.extrair_marcas,
+                help="Extrai as marcas e avalia o protagonismo na mesma chamada à DeepSeek"
+            )
             if st.button("▶️ Iniciar Processamento", 
                         type="primary", 
                         use_container_width=True,
@@ -363,9 +515,11 @@ def main():
             
             with col_yes:
                 if st.button("✅ Sim, processar", type="primary", use_container_width=True):
-                    # Rotacionar logs antes de iniciar novo processamento
-                    rotate_logs()
-                    st.session_state.processing = True
+                    # Rotacionar logs antes de iniciar novo processamento (não durante outro em andamento)
+                    if runner.active_job() is None:
+                        rotate_logs()
+                    st.session_state.job_id = run_processing(st.session_state.extrair_marcas,
+                                                             st.session_state.analise_combinada)
                     st.session_state.processing_confirmed = False
                     st.rerun()
             
@@ -374,53 +528,30 @@ def main():
                     st.session_state.processing_confirmed = False
                     st.rerun()
         
-        # Executar processamento
+        # Acompanhar processamento em segundo plano
         if st.session_state.processing:
-            st.info("🔄 Processamento em andamento. Por favor, aguarde...")
-            
-            # Container para mensagens de progresso
-            progress_container = st.container()
+            render_job_progress(job.snapshot())
+        elif job:
+            estado = job.snapshot()
+            arquivo_final = estado['resultado']
             
-            with progress_container:
-                arquivo_final = run_processing()
+            if arquivo_final:
+                st.session_state.last_processed_file = arquivo_final
+                st.balloons()
+                st.success("🎉 Processamento concluído com sucesso!")
                 
-                if arquivo_final:
-                    st.session_state.last_processed_file = arquivo_final
-                    st.balloons()
-                    st.success("🎉 Processamento concluído com sucesso!")
-                    
-                    # Informar sobre o arquivo gerado
-                    st.info(f"📄 Arquivo: {os.path.basename(arquivo_final)}")
-                else:
-                    # Tentar encontrar arquivo gerado recentemente
-                    import glob
-                    possible_files = []
-                    for base_path in ['downloads', '/app/downloads', os.path.join(os.getcwd(), 'downloads')]:
-                        if os.path.exists(base_path):
-                            pattern = os.path.join(base_path, '*.xlsx')
-                            possible_files.extend(glob.glob(pattern))
-                    
-                    if possible_files:
-                        # Pegar o mais recente
-                        latest_file = max(possible_files, key=os.path.getmtime)
-                        arquivo_final = latest_file
-                        st.session_state.last_processed_file = arquivo_final
-                        st.balloons()
-                        st.success("🎉 Processamento concluído com sucesso!")
-                        st.info(f"📄 Arquivo: {os.path.basename(arquivo_final)}")
-                        logger.info(f"Arquivo encontrado apesar de process_batch retornar None: {arquivo_final}")
-                    else:
-                        st.error("❌ Processamento falhou. Verifique os logs para mais detalhes.")
+                # Informar sobre o arquivo gerado
+                st.info(f"📄 Arquivo: {os.path.basename(arquivo_final)}")
+            else:
+                st.error("❌ Processamento falhou. Verifique os logs para mais detalhes.")
             
-            # Resetar estado
-            st.session_state.processing = False
-            time.sleep(2)
-            st.rerun()
+            # Resultado exibido uma única vez
+            st.session_state.job_id = None
     
     with col2:
         st.header("📊 Estatísticas")
         
-        # Buscar arquivos gerados
+        # Buscar arquivos gerados (mesma listagem usada na seção de downloads)
         files = get_latest_files()
         
         if files:
@@ -433,13 +564,15 @@ def main():
                          last_file[2].strftime("%d/%m/%Y %H:%M"))
         else:
             st.info("Nenhum arquivo gerado ainda")
+        
+        relatorio = get_latest_run_report()
+        if relatorio:
+            render_run_report(relatorio)
     
     # Seção de download
     st.markdown("---")
     st.header("📥 Downloads Disponíveis")
     
-    files = get_latest_files()
-    
     if files:
         st.success(f"✅ {len(files)} arquivo(s) disponível(is) para download")
         
@@ -458,14 +591,13 @@ def main():
             
             with col_download:
                 try:
-                    with open(filepath, 'rb') as f:
-                        st.download_button(
-                            label="⬇️ Download",
-                            data=f,
-                            file_name=filename,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            key=f"download_{idx}"
-                        )
+                    st.download_button(
+                        label="⬇️ Download",
+                        data=_read_file_bytes(filepath, mod_time),
+                        file_name=filename,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        key=f"download_{idx}"
+                    )
                 except Exception as e:
                     st.error(f"Erro: {str(e)}")
                     logger.error(f"Erro ao preparar download de {filepath}: {str(e)}")
@@ -485,6 +617,11 @@ def main():
         """,
         unsafe_allow_html=True
     )
+    
+    # Enquanto houver job em execução, atualiza o painel periodicamente (consulta barata ao estado do job)
+    if st.session_state.processing:
+        time.sleep(1)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Benchmarks e corpus sintético para medir o desempenho do processamento
+"""
@@ -0,0 +1,189 @@
+"""
+Gerador determinístico de notícias sintéticas (clippings) para benchmarks e testes de carga
+Produz registros no mesmo formato da API de Clippings (Id, Titulo, Conteudo, Canais, URLs,
+veículo), com menções às marcas monitoradas, marcas compostas, porta-vozes e canais em
+proporções configuráveis.
+
+Cada notícia é gerada a partir de (semente, índice): a notícia i é sempre a mesma,
+independentemente de quantas notícias são geradas ou da ordem em que são pedidas
+(permite paginar o corpus no servidor de teste sem mantê-lo em memória).
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+MARCAS_MONITORADAS = ['Bradesco', 'Itaú', 'Santander', 'Ágora', 'Bradesco Asset', 'BBI']
+MARCAS_COMPOSTAS = ['Bradesco Asset', 'Bradesco BBI', 'Itaú Unibanco']
+OUTRAS_EMPRESAS = ['Petrobras', 'Vale', 'Nubank', 'XP Investimentos', 'BTG Pactual', 'Caixa',
+                   'Banco do Brasil', 'Ambev', 'Magazine Luiza', 'Localiza', 'Embraer', 'Suzano']
+
+CANAIS_MARCAS = ['Bradesco', 'Economia', 'ESG', 'Inovação/TI', 'Institucional/Negócios', 'MKT',
+                 'Atacado / Banco de Investimento', 'Itaú', 'Santander', 'Corretora/Ágora',
+                 'Asset', 'BBI']
+CANAIS_OUTROS = ['Concorrentes', 'Mercado', 'Varejo', 'Política', 'Internacional']
+
+VEICULOS = ['Valor Econômico', 'Folha de S.Paulo', 'O Estado de S. Paulo', 'O Globo', 'InfoMoney',
+            'Exame', 'Estadão Conteúdo', 'CNN Brasil', 'Bloomberg Línea', 'Correio Braziliense']
+
+PALAVRAS = (
+    "o a os as um uma de do da dos das em no na nos nas por para com sem sobre entre após "
+    "mercado banco bancos crédito juros taxa inflação economia governo empresa empresas clientes "
+    "investimento investimentos ações bolsa dólar real trimestre resultado lucro receita "
+    "carteira digital agência agências conta cartão financiamento imobiliário agronegócio "
+    "sustentabilidade tecnologia inovação plataforma serviço serviços produto produtos "
+    "analistas projeção crescimento queda alta recuo expectativa cenário setor brasileiro "
+    "país anúncio anunciou informou afirmou destacou segundo conforme diretor presidente "
+    "executivo equipe estratégia expansão parceria acordo aquisição oferta emissão fundo "
+    "fundos gestora renda fixa variável recomendação compra venda neutra preço alvo papel"
+).split()
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Eduardo', 'Fernanda', 'Gustavo', 'Helena', 'Igor',
+         'Juliana', 'Lucas', 'Mariana', 'Octavio', 'Paula', 'Rafael', 'Sérgio', 'Tatiana', 'Vinícius']
+SOBRENOMES = ['Almeida', 'Barbosa', 'Cardoso', 'Duarte', 'Esteves', 'Ferreira', 'Gonçalves',
+              'Henriques', 'Lacerda', 'Machado', 'Nogueira', 'Oliveira', 'Pereira', 'Queiroz',
+              'Rodrigues', 'Siqueira', 'Teixeira', 'Vasconcelos']
+
+DATA_INICIAL = datetime(2025, 1, 1, 6, 0, 0)
+
+
+def generate_porta_vozes(quantidade: int = 200, seed: int = 7) -> List[str]:
+    """Nomes de porta-vozes (nome + sobrenome(s)) únicos e determinísticos"""
+    rng = random.Random(seed)
+    nomes = []
+    vistos = set()
+    while len(nomes) < quantidade:
+        partes = [rng.choice(NOMES), rng.choice(SOBRENOMES)]
+        if rng.random() < 0.5 or len(vistos) >= len(NOMES) * len(SOBRENOMES):
+            partes.append(rng.choice(SOBRENOMES))
+        nome = ' '.join(partes)
+        if nome not in vistos:
+            vistos.add(nome)
+            nomes.append(nome)
+    return nomes
+
+
+class CorpusGenerator:
+    """
+    Notícias sintéticas com menções planejadas
+
+    Args:
+        seed: Semente do corpus
+        palavras_por_noticia: Tamanho médio do conteúdo (palavras)
+        taxa_mencoes: Fração das notícias que mencionam alguma marca monitorada
+        max_mencoes: Máximo de menções de uma marca em uma notícia
+        taxa_compostas: Fração das menções escritas como marca composta (ex.: "Bradesco BBI")
+        taxa_porta_voz: Fração das notícias com um porta-voz citado
+        taxa_canal_marca: Fração das notícias com canais de marcas (as demais são filtradas)
+        taxa_noticia_longa: Fração das notícias com conteúdo 20x maior (notícias de ~50 KB)
+        porta_vozes: Lista de porta-vozes (padrão: generate_porta_vozes())
+    """
+
+    def __init__(self, seed: int = 42, palavras_por_noticia: int = 120, taxa_mencoes: float = 0.6,
+                 max_mencoes: int = 8, taxa_compostas: float = 0.3, taxa_porta_voz: float = 0.15,
+                 taxa_canal_marca: float = 0.8, taxa_noticia_longa: float = 0.01,
+                 porta_vozes: Optional[List[str]] = None):
+        self.seed = seed
+        self.palavras_por_noticia = palavras_por_noticia
+        self.taxa_mencoes = taxa_mencoes
+        self.max_mencoes = max_mencoes
+        self.taxa_compostas = taxa_compostas
+        self.taxa_porta_voz = taxa_porta_voz
+        self.taxa_canal_marca = taxa_canal_marca
+        self.taxa_noticia_longa = taxa_noticia_longa
+        self.porta_vozes = porta_vozes if porta_vozes is not None else generate_porta_vozes()
+
+    def article(self, indice: int) -> Dict:
+        """Notícia de índice `indice` (sempre a mesma para a mesma semente)"""
+        rng = random.Random(self.seed * 1_000_003 + indice)
+
+        tamanho = max(10, int(rng.gauss(self.palavras_por_noticia, self.palavras_por_noticia / 4)))
+        if rng.random() < self.taxa_noticia_longa:
+            tamanho *= 20
+        palavras = rng.choices(PALAVRAS, k=tamanho)
+
+        # Menções planejadas (inseridas em posições aleatórias do conteúdo)
+        mencoes = []
+        marcas_citadas = []
+        if rng.random() < self.taxa_mencoes:
+            for marca in rng.sample(MARCAS_MONITORADAS, rng.randint(1, 3)):
+                marcas_citadas.append(marca)
+                for _ in range(rng.randint(1, self.max_mencoes)):
+                    compostas = [c for c in MARCAS_COMPOSTAS if c.startswith(marca) and c != marca]
+                    if compostas and rng.random() < self.taxa_compostas:
+                        mencoes.append(rng.choice(compostas))
+                    else:
+                        mencoes.append(marca)
+        mencoes.extend(rng.sample(OUTRAS_EMPRESAS, rng.randint(0, 3)))
+        if self.porta_vozes and rng.random() < self.taxa_porta_voz:
+            mencoes.append(f"{rng.choice(self.porta_vozes)}, diretor")
+        for mencao in mencoes:
+            palavras.insert(rng.randrange(len(palavras) + 1), mencao)
+
+        # Frases de 8 a 20 palavras
+        frases = []
+        posicao = 0
+        while posicao < len(palavras):
+            passo = rng.randint(8, 20)
+            frase = ' '.join(palavras[posicao:posicao + passo])
+            frases.append(frase[:1].upper() + frase[1:] + '.')
+            posicao += passo
+
+        titulo_palavras = rng.choices(PALAVRAS, k=rng.randint(6, 12))
+        if marcas_citadas and rng.random() < 0.3:
+            titulo_palavras.insert(rng.randrange(len(titulo_palavras) + 1), marcas_citadas[0])
+        titulo = ' '.join(titulo_palavras).capitalize()
+
+        if rng.random() < self.taxa_canal_marca:
+            canais = rng.sample(CANAIS_MARCAS, rng.randint(1, 3))
+        else:
+            canais = rng.sample(CANAIS_OUTROS, rng.randint(1, 2))
+
+        id_noticia = 100_000_000 + indice
+        return {
+            'Id': id_noticia,
+            'Titulo': titulo,
+            'Conteudo': ' '.join(frases),
+            'Canais': canais,
+            'IdVeiculo': rng.randint(1, len(VEICULOS)),
+            'Veiculo': rng.choice(VEICULOS),
+            'DataVeiculacao': (DATA_INICIAL + timedelta(minutes=indice)).isoformat(),
+            'UrlVisualizacao': f"https://clipping.exemplo.com.br/visualizar/{id_noticia}",
+            'UrlOriginal': f"https://noticias.exemplo.com.br/{id_noticia}"
+        }
+
+    def iter_articles(self, quantidade: int, inicio: int = 0) -> Iterator[Dict]:
+        """Notícias de índice inicio .. inicio + quantidade - 1"""
+        for indice in range(inicio, inicio + quantidade):
+            yield self.article(indice)
+
+    def dataframe(self, quantidade: int) -> pd.DataFrame:
+        """Corpus como DataFrame (mesma normalização aplicada à resposta da API)"""
+        return pd.json_normalize(list(self.iter_articles(quantidade)))
+
+
+def generate_resultados(final_df: pd.DataFrame, seed: int = 42,
+                        marcas: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Resultados de protagonismo sintéticos no formato largo (entrada da consolidação)
+
+    Níveis, ocorrências e porta-vozes sorteados por notícia, incluindo notícias sem
+    classificação válida e erros de API (removidos pelos filtros da consolidação)
+    """
+    rng = random.Random(seed)
+    marcas = marcas or MARCAS_MONITORADAS
+    niveis = ['Dedicada', 'Conteúdo', 'Citação', 'Nenhum Nível Encontrado', None, 'Erro na API']
+    pesos = [0.1, 0.15, 0.25, 0.2, 0.28, 0.02]
+
+    resultados = final_df[['Id', 'UrlVisualizacao', 'UrlOriginal', 'Titulo']].copy()
+    quantidade = len(resultados)
+    for marca in marcas:
+        resultados[f'Nivel de Protagonismo {marca}'] = rng.choices(niveis, weights=pesos, k=quantidade)
+        resultados[f'Ocorrencias {marca}'] = [rng.randint(0, 10) for _ in range(quantidade)]
+        if marca in ['Bradesco', 'Ágora', 'Bradesco Asset', 'BBI']:
+            resultados[f'Porta-Voz {marca}'] = [
+                'Porta-voz Exemplo' if rng.random() < 0.05 else None for _ in range(quantidade)
+            ]
+    return resultados
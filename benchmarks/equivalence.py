@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Verificação de equivalência entre o analisador de referência e um motor candidato
+Executa o ProtagonismoAnalyzer atual e um motor candidato (ex.: regras vetorizadas,
+contagem em uma passada, prompts em lote) sobre o mesmo conjunto de notícias, com as
+respostas da DeepSeek gravadas e reproduzidas, compara os resultados (formato largo)
+célula a célula e informa as divergências e o ganho de velocidade.
+
+Otimizações só devem ser incorporadas com resultado sem divergências.
+
+Uso:
+    python -m benchmarks.equivalence --candidato meu_pacote.motor:MotorOtimizado
+    python -m benchmarks.equivalence --candidato ... --snapshot dados/api/Favoritos_Marcas.xlsx
+    python -m benchmarks.equivalence --candidato ... --noticias 5000 --estrito
+
+O motor candidato recebe o ConfigManager no construtor e implementa
+analyze_protagonismo(final_df, salvar=False) retornando o DataFrame no formato largo.
+
+Respostas da DeepSeek: a primeira execução de cada prompt chama a API configurada
+(DEEPSEEK_API_URL - use benchmarks/fake_servers.py para não gastar) e grava a resposta;
+as seguintes reproduzem a gravação. Com --estrito, prompts sem gravação não chamam a API
+e resultam em 'Erro na API' (aparecendo como divergência).
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Adicionar a raiz do projeto ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Os rastros por notícia não fazem parte da comparação
+os.environ.setdefault('TRACE_NOTICIAS', 'false')
+
+import pandas as pd
+import requests
+
+from src.config_manager import ConfigManager
+from src.deepseek_client import DeepSeekClient
+from src.utils.jsonl_cache import JsonlCache
+
+REFERENCIA_PADRAO = 'src.protagonismo_analyzer:ProtagonismoAnalyzer'
+
+
+def request_fingerprint(messages: List[Dict], temperature: float, model: str, params: Dict) -> str:
+    """
+    Identificador de uma requisição à DeepSeek (mesmo prompt e parâmetros → mesma resposta)
+    A forma de entrega (stream ou resposta completa) não altera a resposta e fica de fora
+    """
+    params = {nome: valor for nome, valor in params.items() if nome not in ('stream', 'stream_options')}
+    conteudo = json.dumps({'model': model, 'messages': messages, 'temperature': temperature, **params},
+                          ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+class ReplayDeepSeekClient(DeepSeekClient):
+    """
+    Cliente DeepSeek que reproduz respostas gravadas
+
+    Requisições sem gravação chamam a API (e são gravadas) ou, no modo estrito, falham
+    como erro de requisição
+
+    Args:
+        gravacoes: Log das respostas gravadas
+        respostas: Respostas carregadas uma única vez (gravacoes.load()) e compartilhadas entre
+            os clientes dos motores; as novas gravações entram nele antes de irem para o disco
+        estrito: Não chama a API para requisições sem gravação
+    """
+
+    def __init__(self, config_manager: ConfigManager, gravacoes: JsonlCache, respostas: Dict,
+                 estrito: bool = False):
+        super().__init__(config_manager)
+        self.gravacoes = gravacoes
+        self.respostas = respostas
+        self.estrito = estrito
+        self.replay_stats = {'reproduzidas': 0, 'gravadas': 0, 'ausentes': 0}
+
+    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.1,
+             model: str = "deepseek-chat", contexto: Optional[Dict] = None,
+             encerrar_quando: Optional[Callable[[str], object]] = None, **params) -> Dict:
+        chave = request_fingerprint(messages, temperature, model, params)
+        resposta = self.respostas.get(chave)
+        if resposta is not None:
+            self.replay_stats['reproduzidas'] += 1
+            return dict(resposta)
+
+        if self.estrito:
+            self.replay_stats['ausentes'] += 1
+            raise requests.exceptions.RequestException(f"Resposta não gravada para a requisição {chave[:12]}")
+
+        resposta = super().chat(messages, temperature=temperature, model=model, contexto=contexto,
+                                encerrar_quando=encerrar_quando, **params)
+        self.gravacoes.append(chave, resposta)
+        self.respostas[chave] = resposta
+        self.replay_stats['gravadas'] += 1
+        return resposta
+
+
+def load_engine(caminho: str):
+    """Importa a classe do motor a partir de 'modulo:Classe'"""
+    modulo, _, classe = caminho.partition(':')
+    if not classe:
+        raise ValueError(f"Informe o motor como modulo:Classe (recebido: {caminho})")
+    return getattr(importlib.import_module(modulo), classe)
+
+
+def load_snapshot(config_manager: ConfigManager, snapshot: Optional[str], noticias: int) -> pd.DataFrame:
+    """
+    Notícias usadas na comparação
+
+    - snapshot: planilha salva pela coleta (ex.: dados/api/Favoritos_Marcas.xlsx, Canais já normalizado)
+    - caso contrário: corpus sintético, com o campo Canais normalizado como na coleta
+    """
+    if snapshot:
+        return pd.read_excel(snapshot)
+
+    from benchmarks.corpus import CorpusGenerator
+    df = CorpusGenerator().dataframe(noticias)
+    df['Canais'] = df['Canais'].apply(config_manager.normalize_channel_field)
+    return df
+
+
+def run_engine(classe, config_manager: ConfigManager, final_df: pd.DataFrame, gravacoes: JsonlCache,
+               respostas: Dict, estrito: bool, repeticoes: int) -> Tuple[pd.DataFrame, float, Dict]:
+    """
+    Executa um motor sobre as notícias
+
+    Returns:
+        Tupla (resultado, melhor tempo em segundos, estatísticas da reprodução)
+    """
+    motor = classe(config_manager)
+    cliente = ReplayDeepSeekClient(config_manager, gravacoes, respostas, estrito)
+    motor.deepseek_client = cliente
+
+    resultado = None
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = motor.analyze_protagonismo(final_df.copy(), salvar=False)
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, min(tempos), dict(cliente.replay_stats)
+
+
+def _same_value(a, b) -> bool:
+    a_vazio = a is None or (isinstance(a, float) and a != a)
+    b_vazio = b is None or (isinstance(b, float) and b != b)
+    if a_vazio or b_vazio:
+        return a_vazio and b_vazio
+    return a == b
+
+
+def diff_frames(referencia: pd.DataFrame, candidato: pd.DataFrame, chave: str = 'Id',
+                limite_exemplos: int = 20) -> Dict:
+    """
+    Compara dois resultados no formato largo, linha a linha pela chave e célula a célula
+
+    Valores vazios (None/NaN) são equivalentes entre si; números são comparados pelo valor
+    (1 == 1.0). Linhas com chave repetida são alinhadas pela ordem de ocorrência.
+
+    Returns:
+        Dicionário com colunas/linhas exclusivas de cada lado, divergências por coluna,
+        total de divergências e exemplos (chave, coluna, referência, candidato)
+    """
+    def indexar(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df['_ocorrencia'] = df.groupby(chave).cumcount()
+        return df.set_index([chave, '_ocorrencia'])
+
+    ref = indexar(referencia)
+    cand = indexar(candidato)
+
+    colunas_comuns = [coluna for coluna in ref.columns if coluna in cand.columns]
+    linhas_comuns = ref.index.intersection(cand.index)
+
+    por_coluna = {}
+    exemplos = []
+    for coluna in colunas_comuns:
+        valores_ref = ref.loc[linhas_comuns, coluna].tolist()
+        valores_cand = cand.loc[linhas_comuns, coluna].tolist()
+        divergentes = 0
+        for linha, valor_ref, valor_cand in zip(linhas_comuns, valores_ref, valores_cand):
+            if not _same_value(valor_ref, valor_cand):
+                divergentes += 1
+                if len(exemplos) < limite_exemplos:
+                    exemplos.append({'chave': linha[0], 'coluna': coluna,
+                                     'referencia': valor_ref, 'candidato': valor_cand})
+        if divergentes:
+            por_coluna[coluna] = divergentes
+
+    return {
+        'linhas_referencia': len(ref),
+        'linhas_candidato': len(cand),
+        'colunas_so_referencia': [coluna for coluna in ref.columns if coluna not in cand.columns],
+        'colunas_so_candidato': [coluna for coluna in cand.columns if coluna not in ref.columns],
+        'linhas_so_referencia': len(ref.index.difference(cand.index)),
+        'linhas_so_candidato': len(cand.index.difference(ref.index)),
+        'divergencias_por_coluna': por_coluna,
+        'total_divergencias': sum(por_coluna.values()),
+        'exemplos': exemplos
+    }
+
+
+def is_equivalent(diferencas: Dict) -> bool:
+    return not (diferencas['total_divergencias'] or diferencas['colunas_so_referencia']
+                or diferencas['colunas_so_candidato'] or diferencas['linhas_so_referencia']
+                or diferencas['linhas_so_candidato'])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Equivalência entre o analisador de referência e um motor candidato")
+    parser.add_argument('--candidato', default=REFERENCIA_PADRAO,
+                        help="Motor candidato (modulo:Classe); padrão: o próprio analisador (verifica o determinismo)")
+    parser.add_argument('--referencia', default=REFERENCIA_PADRAO, help="Motor de referência (modulo:Classe)")
+    parser.add_argument('--snapshot', help="Planilha de notícias (padrão: corpus sintético)")
+    parser.add_argument('--noticias', type=int, default=2000, help="Tamanho do corpus sintético")
+    parser.add_argument('--gravacoes', help="Arquivo das respostas gravadas "
+                                            "(padrão: dados/equivalencia/respostas_deepseek.jsonl)")
+    parser.add_argument('--estrito', action='store_true', help="Não chama a API para prompts sem gravação")
+    parser.add_argument('--repeticoes', type=int, default=1, help="Execuções de cada motor (usa o melhor tempo)")
+    parser.add_argument('--relatorio', help="Grava o relatório completo em JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    config_manager = ConfigManager()
+    arquivo_gravacoes = Path(args.gravacoes or config_manager.base_path / "dados" / "equivalencia" /
+                             "respostas_deepseek.jsonl")
+    arquivo_gravacoes.parent.mkdir(parents=True, exist_ok=True)
+    gravacoes = JsonlCache(arquivo_gravacoes, key_field='requisicao', value_field='resposta')
+    # Carregadas uma vez: o candidato reproduz também o que a referência acabou de gravar
+    respostas = gravacoes.load()
+
+    final_df = load_snapshot(config_manager, args.snapshot, args.noticias)
+    print(f"📰 {len(final_df)} notícias | gravações: {arquivo_gravacoes}")
+
+    try:
+        resultado_ref, tempo_ref, replay_ref = run_engine(
+            load_engine(args.referencia), config_manager, final_df, gravacoes, respostas, args.estrito,
+            args.repeticoes
+        )
+        resultado_cand, tempo_cand, replay_cand = run_engine(
+            load_engine(args.candidato), config_manager, final_df, gravacoes, respostas, args.estrito,
+            args.repeticoes
+        )
+    finally:
+        gravacoes.close()
+
+    diferencas = diff_frames(resultado_ref, resultado_cand)
+    aceleracao = tempo_ref / tempo_cand if tempo_cand else float('inf')
+
+    print(f"⏱️ Referência: {tempo_ref:.3f}s | Candidato: {tempo_cand:.3f}s | Aceleração: {aceleracao:.2f}x")
+    print(f"🎞️ DeepSeek - referência: {replay_ref} | candidato: {replay_cand}")
+    print(f"📋 Linhas: {diferencas['linhas_referencia']} (referência) x {diferencas['linhas_candidato']} (candidato)")
+    for rotulo, campo in [("Colunas só na referência", 'colunas_so_referencia'),
+                          ("Colunas só no candidato", 'colunas_so_candidato'),
+                          ("Linhas só na referência", 'linhas_so_referencia'),
+                          ("Linhas só no candidato", 'linhas_so_candidato')]:
+        if diferencas[campo]:
+            print(f"   {rotulo}: {diferencas[campo]}")
+    for coluna, quantidade in diferencas['divergencias_por_coluna'].items():
+        print(f"   {coluna}: {quantidade} divergência(s)")
+    for exemplo in diferencas['exemplos']:
+        print(f"   · Id {exemplo['chave']} | {exemplo['coluna']}: "
+              f"{exemplo['referencia']!r} → {exemplo['candidato']!r}")
+
+    if args.relatorio:
+        with open(args.relatorio, 'w', encoding='utf-8') as f:
+            json.dump({
+                'referencia': args.referencia, 'candidato': args.candidato,
+                'noticias': len(final_df), 'tempo_referencia_s': round(tempo_ref, 4),
+                'tempo_candidato_s': round(tempo_cand, 4), 'aceleracao': round(aceleracao, 3),
+                'deepseek_referencia': replay_ref, 'deepseek_candidato': replay_cand,
+                **diferencas
+            }, f, ensure_ascii=False, indent=2, default=str)
+
+    if is_equivalent(diferencas):
+        print("✅ Resultados equivalentes")
+        return 0
+    print(f"❌ {diferencas['total_divergencias']} célula(s) divergente(s)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Servidores locais que substituem a API de Clippings e a DeepSeek em testes de carga
+Permitem executar o pipeline completo (main.py) sem rede e sem custo:
+
+- Clippings: serve um corpus sintético (benchmarks/corpus.py), com paginação opcional
+  (campo "Pagina" no corpo da requisição) e erros 500 sorteados
+- DeepSeek: endpoint /v1/chat/completions compatível com OpenAI, com latência sorteada
+  (distribuição log-normal), requisições travadas, limite de taxa com respostas 429 e respostas determinísticas
+  calculadas a partir do texto da notícia; atende "stream" (SSE), "max_tokens" e "stop"
+
+Uso:
+    python -m benchmarks.fake_servers --noticias 50000 --paginas 10 --latencia-mediana-ms 400
+
+O comando imprime as variáveis de ambiente que direcionam o ConfigManager para os
+servidores locais (CLIPPINGS_API_URL ou API_CONFIG_FILE, DEEPSEEK_API_URL).
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Adicionar a raiz do projeto ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import CorpusGenerator, MARCAS_MONITORADAS, MARCAS_COMPOSTAS, OUTRAS_EMPRESAS
+
+logger = logging.getLogger(__name__)
+
+# Marcas reconhecidas pela DeepSeek local (as compostas primeiro: "Bradesco BBI" antes de "Bradesco")
+MARCAS_CONHECIDAS = sorted(set(MARCAS_MONITORADAS + MARCAS_COMPOSTAS + OUTRAS_EMPRESAS), key=len, reverse=True)
+
+# Marcadores do início do texto da notícia nos prompts do sistema
+MARCADORES_TEXTO = ('Texto da Notícia:', 'TEXTO:')
+
+# Caracteres por token (mesma estimativa do campo "usage")
+CARACTERES_POR_TOKEN = 4
+
+# Justificativa acrescentada às respostas prolixas (o modelo "divaga" depois do nível)
+JUSTIFICATIVA_PROLIXA = (
+    "\n\nJustificativa: a marca é mencionada no texto da notícia e, considerando os critérios "
+    "informados, o papel dela na narrativa corresponde ao nível indicado acima. Não há outros "
+    "elementos que alterem a classificação."
+)
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    """Base dos handlers: leitura do corpo JSON e respostas JSON"""
+
+    def log_message(self, formato, *args):
+        logger.debug("%s - %s", self.address_string(), formato % args)
+
+    def _read_json(self) -> Dict:
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        corpo = self.rfile.read(tamanho) if tamanho else b''
+        try:
+            return json.loads(corpo or b'{}')
+        except json.JSONDecodeError:
+            return {}
+
+    def _send_json(self, status: int, dados, headers: Optional[Dict[str, str]] = None):
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _send_event(self, dados):
+        """Um evento server-sent events (linha 'data: ...')"""
+        self.wfile.write(b'data: ' + json.dumps(dados, ensure_ascii=False).encode('utf-8') + b'\n\n')
+
+
+class _ClippingsHandler(_JsonHandler):
+    server: "FakeClippingsServer"
+
+    def do_POST(self):
+        servidor = self.server
+        dados = self._read_json()
+        servidor.count('requisicoes')
+
+        if servidor.latencia_ms:
+            time.sleep(servidor.latencia_ms / 1000)
+        if servidor.draw() < servidor.taxa_500:
+            servidor.count('erros_500')
+            self._send_json(500, {'erro': 'Erro interno simulado'})
+            return
+
+        inicio, quantidade = 0, servidor.noticias
+        pagina = dados.get('Pagina')
+        if pagina is not None:
+            tamanho_pagina = int(dados.get('TamanhoPagina') or servidor.tamanho_pagina)
+            inicio = int(pagina) * tamanho_pagina
+            quantidade = max(0, min(tamanho_pagina, servidor.noticias - inicio))
+
+        # Corpo gravado em partes (HTTP/1.0, sem Content-Length): o corpus não fica em memória
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(b'[')
+        for posicao, noticia in enumerate(servidor.gerador.iter_articles(quantidade, inicio)):
+            if posicao:
+                self.wfile.write(b',')
+            self.wfile.write(json.dumps(noticia, ensure_ascii=False).encode('utf-8'))
+        self.wfile.write(b']')
+        servidor.count('noticias_servidas', quantidade)
+
+
+class _DeepSeekHandler(_JsonHandler):
+    server: "FakeDeepSeekServer"
+
+    def do_POST(self):
+        servidor = self.server
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+
+        dados = self._read_json()
+        servidor.count('requisicoes')
+
+        if not servidor.acquire() or servidor.draw() < servidor.taxa_429:
+            servidor.count('respostas_429')
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                            headers={'Retry-After': '1'})
+            return
+
+        time.sleep(servidor.latency())
+
+        mensagens = dados.get('messages') or []
+        prompt = '\n'.join(str(mensagem.get('content', '')) for mensagem in mensagens)
+        resposta = answer(prompt)
+        if servidor.taxa_prolixa and not resposta.startswith(('{', '[')) and servidor.draw() < servidor.taxa_prolixa:
+            servidor.count('respostas_prolixas')
+            resposta += JUSTIFICATIVA_PROLIXA
+        resposta, finish_reason = _apply_limits(resposta, dados.get('max_tokens'), dados.get('stop'))
+        prompt_tokens = max(1, len(prompt) // CARACTERES_POR_TOKEN)
+        completion_tokens = max(1, math.ceil(len(resposta) / CARACTERES_POR_TOKEN))
+        # Cache de contexto: o prefixo com as instruções (igual em todas as chamadas) é reaproveitado
+        cache_tokens = min(prompt_tokens, max(0, len(prompt) - len(_news_text(prompt))) // CARACTERES_POR_TOKEN)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'prompt_cache_hit_tokens': cache_tokens,
+            'prompt_cache_miss_tokens': prompt_tokens - cache_tokens
+        }
+        servidor.count('respostas_200')
+        identificacao = {
+            'id': f"fake-{servidor.stats['requisicoes']}",
+            'created': int(time.time()),
+            'model': dados.get('model', 'deepseek-chat')
+        }
+        if dados.get('stream'):
+            self._send_stream(identificacao, resposta, finish_reason,
+                              usage if (dados.get('stream_options') or {}).get('include_usage') else None)
+            return
+
+        # Geração da resposta completa antes do envio
+        time.sleep(servidor.ms_por_token * completion_tokens / 1000)
+        servidor.count('tokens_gerados', completion_tokens)
+        self._send_json(200, {
+            **identificacao,
+            'object': 'chat.completion',
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': resposta},
+                'finish_reason': finish_reason
+            }],
+            'usage': usage
+        })
+
+    def _send_stream(self, identificacao: Dict, resposta: str, finish_reason: str, usage: Optional[Dict]):
+        """Resposta em blocos de um token (SSE); o cliente pode fechar a conexão no meio"""
+        servidor = self.server
+        bloco = {**identificacao, 'object': 'chat.completion.chunk'}
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        try:
+            for posicao in range(0, len(resposta), CARACTERES_POR_TOKEN):
+                time.sleep(servidor.ms_por_token / 1000)
+                self._send_event({**bloco, 'choices': [{
+                    'index': 0, 'delta': {'content': resposta[posicao:posicao + CARACTERES_POR_TOKEN]},
+                    'finish_reason': None
+                }]})
+                servidor.count('tokens_gerados')
+            self._send_event({**bloco, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]})
+            if usage:
+                self._send_event({**bloco, 'choices': [], 'usage': usage})
+            self.wfile.write(b'data: [DONE]\n\n')
+        except (BrokenPipeError, ConnectionResetError):
+            servidor.count('streams_interrompidos')
+
+
+def _apply_limits(resposta: str, max_tokens: Optional[int], paradas) -> tuple:
+    """Corta a resposta na primeira sequência de parada e em max_tokens (finish_reason)"""
+    if isinstance(paradas, str):
+        paradas = [paradas]
+    for parada in paradas or []:
+        if parada and parada in resposta:
+            resposta = resposta[:resposta.index(parada)]
+    if max_tokens and len(resposta) > max_tokens * CARACTERES_POR_TOKEN:
+        return resposta[:max_tokens * CARACTERES_POR_TOKEN], 'length'
+    return resposta, 'stop'
+
+
+def _news_text(prompt: str) -> str:
+    """Trecho do prompt com a notícia (após o último marcador conhecido)"""
+    posicao = max(prompt.rfind(marcador) for marcador in MARCADORES_TEXTO)
+    return prompt[posicao:] if posicao >= 0 else prompt
+
+
+def _count_isolated(marca: str, texto: str) -> int:
+    """Ocorrências da marca fora de marcas compostas (mesma regra pedida nos prompts)"""
+    for composta in MARCAS_COMPOSTAS:
+        if composta != marca and marca in composta and not (marca == 'BBI' and composta == 'Bradesco BBI'):
+            texto = texto.replace(composta, ' ')
+    return len(re.findall(r'\b' + re.escape(marca) + r'\b', texto))
+
+
+def _level(ocorrencias: int) -> str:
+    if ocorrencias >= 5:
+        return 'Nível 1'
+    if ocorrencias >= 3:
+        return 'Nível 2'
+    if ocorrencias >= 1:
+        return 'Nível 3'
+    return 'Nenhum Nível Encontrado'
+
+
+def answer(prompt: str) -> str:
+    """
+    Resposta determinística para os prompts do sistema
+
+    - análise combinada: JSON com as marcas conhecidas no texto e o nível de cada marca pedida
+    - protagonismo de uma marca: nível pela quantidade de ocorrências isoladas
+    - extração de marcas: lista JSON das marcas conhecidas no texto
+    """
+    texto = _news_text(prompt)
+    marcas_no_texto = [marca for marca in MARCAS_CONHECIDAS if re.search(r'\b' + re.escape(marca) + r'\b', texto)]
+
+    if 'TAREFA 2' in prompt:
+        pedidas = re.search(r'cada uma destas marcas: (.+)', prompt)
+        marcas_pedidas = re.findall(r'"([^"]+)"', pedidas.group(1)) if pedidas else []
+        return json.dumps({
+            'marcas': marcas_no_texto,
+            'protagonismo': {marca: _level(_count_isolated(marca, texto)) for marca in marcas_pedidas}
+        }, ensure_ascii=False)
+
+    marca = re.search(r'nível de protagonismo da marca "([^"]+)"', prompt)
+    if marca:
+        return _level(_count_isolated(marca.group(1), texto))
+
+    return json.dumps(marcas_no_texto, ensure_ascii=False)
+
+
+class _FakeServer(ThreadingHTTPServer):
+    """Servidor em thread própria, com estatísticas e sorteios determinísticos"""
+
+    daemon_threads = True
+
+    def __init__(self, handler, host: str, porta: int, seed: int):
+        super().__init__((host, porta), handler)
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def count(self, nome: str, quantidade: int = 1):
+        with self._lock:
+            self.stats[nome] = self.stats.get(nome, 0) + quantidade
+
+    def draw(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def start(self):
+        """Atende as requisições em uma thread de fundo"""
+        self._thread = threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeClippingsServer(_FakeServer):
+    """
+    API de Clippings local
+
+    Args:
+        noticias: Tamanho do corpus servido
+        tamanho_pagina: Notícias por página quando a requisição informa "Pagina"
+        taxa_500: Fração das requisições respondidas com erro 500
+        latencia_ms: Atraso fixo de cada resposta
+    """
+
+    def __init__(self, noticias: int = 1000, host: str = '127.0.0.1', porta: int = 0, seed: int = 42,
+                 tamanho_pagina: int = 1000, taxa_500: float = 0.0, latencia_ms: float = 0.0,
+                 gerador: Optional[CorpusGenerator] = None):
+        super().__init__(_ClippingsHandler, host, porta, seed)
+        self.noticias = noticias
+        self.tamanho_pagina = tamanho_pagina
+        self.taxa_500 = taxa_500
+        self.latencia_ms = latencia_ms
+        self.gerador = gerador or CorpusGenerator(seed=seed)
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/api/Clippings/"
+
+    def page_configs(self) -> List[Dict]:
+        """Configurações da API (formato de api_marca_configs.json) com uma entrada por página"""
+        paginas = max(1, math.ceil(self.noticias / self.tamanho_pagina))
+        return [
+            {'url': self.url, 'data': {'Pagina': pagina, 'TamanhoPagina': self.tamanho_pagina}}
+            for pagina in range(paginas)
+        ]
+
+
+class FakeDeepSeekServer(_FakeServer):
+    """
+    Endpoint /v1/chat/completions local
+
+    Args:
+        latencia_mediana_ms: Mediana da latência das respostas
+        latencia_sigma: Dispersão da distribuição log-normal (0 = latência fixa)
+        limite_rps: Requisições por segundo aceitas (acima disso: 429); 0 = sem limite
+        taxa_429: Fração adicional das requisições respondidas com 429
+        taxa_travamento: Fração das requisições que ficam `travamento_s` segundos sem resposta
+        taxa_prolixa: Fração das respostas de nível seguidas de uma justificativa (divagação)
+        ms_por_token: Tempo de geração de cada token da resposta (0 = instantâneo)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', porta: int = 0, seed: int = 42,
+                 latencia_mediana_ms: float = 300.0, latencia_sigma: float = 0.5,
+                 limite_rps: float = 0.0, taxa_429: float = 0.0,
+                 taxa_travamento: float = 0.0, travamento_s: float = 120.0,
+                 taxa_prolixa: float = 0.0, ms_por_token: float = 0.0):
+        super().__init__(_DeepSeekHandler, host, porta, seed)
+        self.latencia_mediana_ms = latencia_mediana_ms
+        self.latencia_sigma = latencia_sigma
+        self.limite_rps = limite_rps
+        self.taxa_429 = taxa_429
+        self.taxa_travamento = taxa_travamento
+        self.travamento_s = travamento_s
+        self.taxa_prolixa = taxa_prolixa
+        self.ms_por_token = ms_por_token
+        # Balde de fichas do limite de taxa (capacidade de 1 segundo)
+        self._fichas = limite_rps
+        self._ultima_recarga = time.monotonic()
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/v1/chat/completions"
+
+    def acquire(self) -> bool:
+        """Consome uma ficha do limite de taxa (False = responder 429)"""
+        if not self.limite_rps:
+            return True
+        with self._lock:
+            agora = time.monotonic()
+            self._fichas = min(self.limite_rps, self._fichas + (agora - self._ultima_recarga) * self.limite_rps)
+            self._ultima_recarga = agora
+            if self._fichas >= 1:
+                self._fichas -= 1
+                return True
+            return False
+
+    def latency(self) -> float:
+        """Latência sorteada (segundos)"""
+        if self.taxa_travamento and self.draw() < self.taxa_travamento:
+            self.count('travamentos')
+            return self.travamento_s
+        if self.latencia_mediana_ms <= 0:
+            return 0.0
+        with self._lock:
+            fator = self._rng.lognormvariate(0, self.latencia_sigma) if self.latencia_sigma else 1.0
+        return self.latencia_mediana_ms / 1000 * fator
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidores locais da API de Clippings e da DeepSeek")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--apenas', choices=['clippings', 'deepseek'], help="Inicia apenas um dos servidores")
+
+    clippings = parser.add_argument_group("Clippings")
+    clippings.add_argument('--porta-clippings', type=int, default=8601)
+    clippings.add_argument('--noticias', type=int, default=1000, help="Tamanho do corpus")
+    clippings.add_argument('--paginas', type=int, default=1,
+                           help="Divide o corpus em páginas (gera um arquivo de configuração com uma entrada por página)")
+    clippings.add_argument('--taxa-500', type=float, default=0.0, help="Fração de respostas com erro 500")
+    clippings.add_argument('--latencia-clippings-ms', type=float, default=0.0)
+
+    deepseek = parser.add_argument_group("DeepSeek")
+    deepseek.add_argument('--porta-deepseek', type=int, default=8602)
+    deepseek.add_argument('--latencia-mediana-ms', type=float, default=300.0)
+    deepseek.add_argument('--latencia-sigma', type=float, default=0.5, help="Dispersão log-normal (0 = fixa)")
+    deepseek.add_argument('--limite-rps', type=float, default=0.0, help="Requisições/s aceitas (0 = sem limite)")
+    deepseek.add_argument('--taxa-429', type=float, default=0.0, help="Fração adicional de respostas 429")
+    deepseek.add_argument('--taxa-travamento', type=float, default=0.0,
+                          help="Fração de requisições sem resposta por --travamento-s segundos (testa timeouts)")
+    deepseek.add_argument('--travamento-s', type=float, default=120.0)
+    deepseek.add_argument('--taxa-prolixa', type=float, default=0.0,
+                          help="Fração das respostas de nível seguidas de uma justificativa")
+    deepseek.add_argument('--ms-por-token', type=float, default=0.0, help="Tempo de geração por token")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    servidores = []
+    variaveis = {}
+
+    if args.apenas != 'deepseek':
+        paginas = max(1, args.paginas)
+        servidor = FakeClippingsServer(
+            noticias=args.noticias, host=args.host, porta=args.porta_clippings, seed=args.seed,
+            tamanho_pagina=math.ceil(args.noticias / paginas), taxa_500=args.taxa_500,
+            latencia_ms=args.latencia_clippings_ms
+        ).start()
+        servidores.append(servidor)
+        if paginas > 1:
+            arquivo = Path(tempfile.gettempdir()) / f"api_marca_configs_teste_{servidor.server_address[1]}.json"
+            arquivo.write_text(json.dumps(servidor.page_configs(), indent=2), encoding='utf-8')
+            variaveis['API_CONFIG_FILE'] = str(arquivo)
+        else:
+            variaveis['CLIPPINGS_API_URL'] = servidor.url
+        logger.info(f"Clippings local em {servidor.url} ({args.noticias} notícias, {paginas} página(s))")
+
+    if args.apenas != 'clippings':
+        servidor = FakeDeepSeekServer(
+            host=args.host, porta=args.porta_deepseek, seed=args.seed,
+            latencia_mediana_ms=args.latencia_mediana_ms, latencia_sigma=args.latencia_sigma,
+            limite_rps=args.limite_rps, taxa_429=args.taxa_429,
+            taxa_travamento=args.taxa_travamento, travamento_s=args.travamento_s,
+            taxa_prolixa=args.taxa_prolixa, ms_por_token=args.ms_por_token
+        ).start()
+        servidores.append(servidor)
+        variaveis['DEEPSEEK_API_URL'] = servidor.url
+        logger.info(f"DeepSeek local em {servidor.url}")
+
+    print("\nVariáveis para direcionar o sistema aos servidores locais:")
+    for nome, valor in variaveis.items():
+        print(f"export {nome}={valor}")
+    print("\nCtrl+C encerra os servidores\n")
+
+    try:
+        while True:
+            time.sleep(60)
+            for servidor in servidores:
+                logger.info(f"{type(servidor).__name__}: {servidor.stats}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for servidor in servidores:
+            logger.info(f"{type(servidor).__name__}: {servidor.stats}")
+            servidor.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Benchmarks dos caminhos quentes do processamento
+Mede, sobre um corpus sintético (benchmarks/corpus.py), as funções executadas por notícia
+e as escritas de planilhas, e compara com as referências gravadas em
+benchmarks/baselines.json para evidenciar regressões.
+
+Uso:
+    python -m benchmarks.run_benchmarks                          # 1k e 10k notícias
+    python -m benchmarks.run_benchmarks --tamanhos 1000 100000 500000
+    python -m benchmarks.run_benchmarks --apenas contagem_marcas porta_vozes
+    python -m benchmarks.run_benchmarks --salvar-baseline        # atualiza as referências
+    python -m benchmarks.run_benchmarks --falhar-em-regressao     # código de saída 1 se houver regressão
+
+As referências dependem da máquina: regrave-as (--salvar-baseline) ao trocar de ambiente.
+Nenhuma chamada de rede é feita.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Adicionar a raiz do projeto ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+# A chave só é exigida pelo ConfigManager: os benchmarks não chamam a API
+os.environ.setdefault('DEEPSEEK_API_KEY', 'benchmark-sem-chamadas')
+
+import pandas as pd
+
+from benchmarks.corpus import CorpusGenerator, generate_resultados
+from src.config_manager import ConfigManager
+from src.config.channel_mappings import normalize_channel_field
+from src.data_consolidator import DataConsolidator
+from src.protagonismo_analyzer import ProtagonismoAnalyzer
+from src.utils.excel_writer import write_final_workbooks
+
+ARQUIVO_BASELINES = Path(__file__).parent / "baselines.json"
+TAMANHOS_PADRAO = [1000, 10000]
+TOLERANCIA_PADRAO = 1.3
+# Tempo mínimo somado das execuções de cada benchmark (medições de poucos ms são só ruído)
+DURACAO_MINIMA_S = 0.5
+
+
+class BenchmarkContext:
+    """Corpus e objetos compartilhados pelos benchmarks de um tamanho"""
+
+    def __init__(self, tamanho: int, pasta_saida: Path, seed: int = 42):
+        self.tamanho = tamanho
+        self.pasta_saida = pasta_saida
+        geracao = time.perf_counter()
+        self.gerador = CorpusGenerator(seed=seed)
+        self.df = self.gerador.dataframe(tamanho)
+        self.df['Canais'] = self.df['Canais'].astype(str)
+        self.textos = list(zip(self.df['Titulo'], self.df['Conteudo']))
+        self.resultados = generate_resultados(self.df, seed=seed)
+        self.geracao_s = time.perf_counter() - geracao
+
+        self.config = ConfigManager()
+        # Catálogo e pastas de dados na pasta temporária (não cria dados/ no repositório)
+        self.config.pasta_api = pasta_saida / "api"
+        self.config.pasta_marca_setor = pasta_saida / "marca_setor"
+        self.config.arq_catalogo = pasta_saida / "catalogo_artefatos.db"
+        self.config.arq_trava_pipeline = pasta_saida / ".pipeline.lock"
+        self.analyzer = ProtagonismoAnalyzer(self.config)
+        # Porta-vozes do corpus (em vez do arquivo da pasta config)
+        self.analyzer.porta_vozes_map = {
+            self.analyzer._normalize_text(nome): nome for nome in self.gerador.porta_vozes
+        }
+        self.analyzer.porta_vozes = list(self.analyzer.porta_vozes_map)
+        self.analyzer._porta_vozes_patterns = self.analyzer._compile_porta_vozes_patterns()
+        self.marcas_compostas = [
+            (marca, self.analyzer._get_marcas_compostas_para_marca_base(marca))
+            for marca in self.config.w_marcas
+        ]
+        self.consolidator = DataConsolidator(self.config)
+
+
+def bench_contagem_marcas(ctx: BenchmarkContext):
+    analyzer = ctx.analyzer
+    for titulo, conteudo in ctx.textos:
+        for marca, compostas in ctx.marcas_compostas:
+            analyzer._count_marca_occurrences_fixed(marca, titulo, conteudo, compostas)
+
+
+def bench_porta_vozes(ctx: BenchmarkContext):
+    analyzer = ctx.analyzer
+    for titulo, conteudo in ctx.textos:
+        analyzer._check_porta_voz_mentioned(titulo, conteudo)
+
+
+def bench_normalizacao_canais(ctx: BenchmarkContext):
+    for canais in ctx.df['Canais']:
+        normalize_channel_field(canais)
+
+
+def bench_consolidacao_filtros(ctx: BenchmarkContext):
+    consolidado = ctx.consolidator._consolidate_formato_largo(ctx.df, ctx.resultados)
+    ctx.consolidator._apply_final_filters(consolidado)
+
+
+def bench_xlsx_final(ctx: BenchmarkContext):
+    write_final_workbooks(
+        ctx.resultados,
+        arquivo_simples=str(ctx.pasta_saida / "final.xlsx"),
+        arquivo_hyperlinks=str(ctx.pasta_saida / "final_hyperlinks.xlsx")
+    )
+
+
+def bench_xlsx_pandas(ctx: BenchmarkContext):
+    ctx.resultados.to_excel(ctx.pasta_saida / "resultados.xlsx", index=False)
+
+
+# Nome → função (a ordem é a ordem de execução)
+BENCHMARKS: Dict[str, Callable[[BenchmarkContext], None]] = {
+    'contagem_marcas': bench_contagem_marcas,
+    'porta_vozes': bench_porta_vozes,
+    'normalizacao_canais': bench_normalizacao_canais,
+    'consolidacao_filtros': bench_consolidacao_filtros,
+    'xlsx_final': bench_xlsx_final,
+    'xlsx_pandas': bench_xlsx_pandas,
+}
+
+
+def measure(funcao: Callable, ctx: BenchmarkContext, repeticoes: int,
+            duracao_minima_s: float = DURACAO_MINIMA_S) -> Dict:
+    """
+    Executa a função ao menos `repeticoes` vezes e até somar `duracao_minima_s`
+
+    Returns:
+        Mediana, melhor tempo (usado na comparação com a referência) e execuções
+    """
+    tempos = []
+    while len(tempos) < repeticoes or sum(tempos) < duracao_minima_s:
+        inicio = time.perf_counter()
+        funcao(ctx)
+        tempos.append(time.perf_counter() - inicio)
+    mediana = statistics.median(tempos)
+    return {
+        'mediana_s': round(mediana, 4),
+        'melhor_s': round(min(tempos), 4),
+        'por_noticia_us': round(mediana / ctx.tamanho * 1e6, 2),
+        'execucoes': len(tempos)
+    }
+
+
+def load_baselines(arquivo: Path = ARQUIVO_BASELINES) -> Dict:
+    if not arquivo.exists():
+        return {}
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(resultados: Dict[str, Dict], arquivo: Path = ARQUIVO_BASELINES):
+    """Atualiza as referências medidas (mantém as dos benchmarks/tamanhos não executados)"""
+    baselines = load_baselines(arquivo)
+    baselines.setdefault('resultados', {}).update(resultados)
+    baselines['ambiente'] = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'gravado_em': datetime.now().isoformat(timespec='seconds')
+    }
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def run(tamanhos: List[int], apenas: Optional[List[str]] = None, repeticoes: int = 3,
+        tolerancia: float = TOLERANCIA_PADRAO) -> tuple:
+    """
+    Executa os benchmarks e compara o melhor tempo com o das referências (o melhor tempo é o
+    menos sensível à carga da máquina)
+
+    Returns:
+        Tupla (resultados {'nome@tamanho': medição}, lista de regressões)
+    """
+    referencias = load_baselines().get('resultados', {})
+    resultados = {}
+    regressoes = []
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks_") as pasta:
+        for tamanho in tamanhos:
+            ctx = BenchmarkContext(tamanho, Path(pasta))
+            print(f"\n📦 {tamanho} notícias (corpus gerado em {ctx.geracao_s:.2f}s)")
+            print(f"   {'benchmark':<22} {'mediana(s)':>11} {'melhor(s)':>10} {'µs/notícia':>11} "
+                  f"{'referência':>11} {'razão':>7}")
+
+            for nome, funcao in BENCHMARKS.items():
+                if apenas and nome not in apenas:
+                    continue
+                chave = f"{nome}@{tamanho}"
+                medicao = measure(funcao, ctx, repeticoes)
+                resultados[chave] = medicao
+
+                referencia = referencias.get(chave)
+                if referencia:
+                    razao = medicao['melhor_s'] / referencia['melhor_s'] if referencia['melhor_s'] else 1.0
+                    situacao = "⚠️ regressão" if razao > tolerancia else ("🚀" if razao < 1 / tolerancia else "✅")
+                    if razao > tolerancia:
+                        regressoes.append(chave)
+                    comparacao = f"{referencia['melhor_s']:>11.4f} {razao:>6.2f}x {situacao}"
+                else:
+                    comparacao = f"{'-':>11} {'-':>7}"
+                print(f"   {nome:<22} {medicao['mediana_s']:>11.4f} {medicao['melhor_s']:>10.4f} "
+                      f"{medicao['por_noticia_us']:>11.2f} {comparacao}")
+
+    return resultados, regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do processamento")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="Quantidades de notícias do corpus (ex.: 1000 10000 100000 500000)")
+    parser.add_argument('--apenas', nargs='+', choices=list(BENCHMARKS), help="Executa apenas estes benchmarks")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções mínimas de cada benchmark (repetidas até somar "
+                             f"{DURACAO_MINIMA_S}s)")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help="Razão acima da referência considerada regressão (padrão: 1.3)")
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava as medições como referência")
+    parser.add_argument('--falhar-em-regressao', action='store_true',
+                        help="Retorna código 1 se algum benchmark regredir")
+    args = parser.parse_args(argv)
+
+    # Os benchmarks medem o processamento, não o log
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    resultados, regressoes = run(args.tamanhos, args.apenas, args.repeticoes, args.tolerancia)
+
+    if args.salvar_baseline:
+        save_baselines(resultados)
+        print(f"\n💾 Referências gravadas em {ARQUIVO_BASELINES}")
+
+    if regressoes:
+        print(f"\n⚠️ Regressões (acima de {args.tolerancia}x a referência): {', '.join(regressoes)}")
+        return 1 if args.falhar_em_regressao else 0
+
+    print("\n✅ Nenhuma regressão em relação às referências")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,92 +4,72 @@ Sistema de Análise de Notícias - Programa Principal
 Orquestra as chamadas para os módulos de processamento
 """
 
-import os
 import sys
+import argparse
 from pathlib import Path
-import logging
-from datetime import datetime
-import pandas as pd
 
 # Adicionar o diretório atual ao path para importações
 sys.path.append(str(Path(__file__).parent))
 
 # Importar módulos do projeto
-from src.config_manager import ConfigManager
-from src.api_caller import APICaller
-from src.protagonismo_analyzer import ProtagonismoAnalyzer
-from src.data_consolidator import DataConsolidator
-from src.batch_processor import BatchProcessor
-from src.utils.file_utils import create_directories, setup_download_button
+from src.config_manager import ConfigManager, env_flag
+from src.pipeline import run_pipeline
+from src.utils.file_utils import setup_download_button
+from src.utils.logging_setup import setup_logging
 
-def setup_logging():
-    """Configura o sistema de logging"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('logs/app.log'),
-            logging.StreamHandler()
-        ]
+def parse_args():
+    """Lê os argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(description="Sistema de Análise de Notícias")
+    parser.add_argument(
+        '--extrair-marcas', action='store_true', default=None,
+        help="Executa também a extração de marcas (padrão: variável EXTRAIR_MARCAS)"
     )
-    return logging.getLogger(__name__)
+    parser.add_argument(
+        '--analise-combinada', action='store_true', default=None,
+        help="Com a extração de marcas, usa uma única chamada por notícia para marcas e "
+             "protagonismo (padrão: variável ANALISE_COMBINADA)"
+    )
+    parser.add_argument(
+        '--perfil', choices=['cprofile', 'pyinstrument'], default=None,
+        help="Grava também o perfil detalhado da execução (padrão: variável PERFIL_EXECUCAO)"
+    )
+    parser.add_argument(
+        '--prazo', default=None,
+        help="Horário limite para chamadas à DeepSeek no protagonismo, \"HH:MM\" ou data/hora ISO "
+             "(padrão: variável PROTAGONISMO_PRAZO)"
+    )
+    parser.add_argument(
+        '--max-chamadas', type=int, default=None,
+        help="Máximo de chamadas à DeepSeek no protagonismo (padrão: variável PROTAGONISMO_MAX_CHAMADAS)"
+    )
+    return parser.parse_args()
 
 def main():
     """Função principal do sistema"""
-    logger = setup_logging()
+    args = parse_args()
+    logger = setup_logging(calls_log=env_flag('LOG_CHAMADAS_DEEPSEEK'))
     logger.info("Iniciando Sistema de Análise de Notícias")
     
     try:
-        # Criar diretórios necessários
-        create_directories()
-        
         # Carregar configurações
         config_manager = ConfigManager()
+        if args.perfil:
+            config_manager.perfil_execucao = args.perfil
+        if args.prazo is not None:
+            config_manager.protagonismo_prazo = args.prazo
+        if args.max_chamadas is not None:
+            config_manager.protagonismo_max_chamadas = args.max_chamadas
         logger.info("Configurações carregadas com sucesso")
         
-        # Etapa 1: Chamar API e carregar dados
-        logger.info("Iniciando chamada da API...")
-        api_caller = APICaller(config_manager)
-        final_df = api_caller.fetch_data()
-        # CARREGAMENTO TEMPORÁRIO: Substituir fetch_data pelo arquivo local
-        #final_df = pd.read_excel('dados/api/Favoritos_Marcas.xlsx')
-        
-        if final_df.empty:
-            logger.error("Nenhum dado foi retornado pela API")
-            return
-        
-        logger.info(f"API retornou {len(final_df)} registros")
-        
-        # Etapa 2: Análise de protagonismo
-        logger.info("Iniciando análise de protagonismo...")
-        protagonismo_analyzer = ProtagonismoAnalyzer(config_manager)
-        df_resultados = protagonismo_analyzer.analyze_protagonismo(final_df)
-        
-        if df_resultados.empty:
-            logger.error("Análise de protagonismo não retornou resultados")
-            return
-        
-        logger.info(f"Análise de protagonismo gerou {len(df_resultados)} resultados")
-        
-        # Etapa 3: Consolidação dos dados
-        logger.info("Iniciando consolidação dos dados...")
-        consolidator = DataConsolidator(config_manager)
-        final_df_consolidado = consolidator.consolidate_data(final_df, df_resultados)
-        
-        logger.info(f"Consolidação gerou {len(final_df_consolidado)} registros")
-        
-        # Etapa 4: Processamento em lote
-        logger.info("Iniciando processamento em lote...")
-        batch_processor = BatchProcessor(config_manager)
-        arquivo_final = batch_processor.process_batch(final_df_consolidado, final_df)
+        # Executa as etapas: API, (extração de marcas), protagonismo, consolidação e processamento em lote
+        arquivo_final = run_pipeline(config_manager, extrair_marcas=args.extrair_marcas,
+                                     analise_combinada=args.analise_combinada)
         
         if arquivo_final:
-            logger.info(f"Processamento concluído. Arquivo gerado: {arquivo_final}")
-            
             # Habilitar download do arquivo
             setup_download_button(arquivo_final)
             
-        logger.info("Sistema executado com sucesso!")
+            logger.info("Sistema executado com sucesso!")
         
     except Exception as e:
         logger.error(f"Erro durante a execução: {str(e)}")
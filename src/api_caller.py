@@ -9,15 +9,22 @@ import time
 import logging
 from typing import Optional
 from src.config_manager import ConfigManager
+from src.utils.progress import ProgressCallback, notify_progress
+from src.run_profiler import profile_section
 
 class APICaller:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.logger = logging.getLogger(__name__)
+        # Sessão HTTP reaproveitada entre chamadas (mantém conexões abertas)
+        self.session = requests.Session()
     
-    def fetch_data(self) -> pd.DataFrame:
+    def fetch_data(self, progress_callback: Optional[ProgressCallback] = None) -> pd.DataFrame:
         """
         Faz as chamadas para a API e retorna um DataFrame consolidado
+        
+        Args:
+            progress_callback: Callback opcional que recebe o progresso das chamadas
         """
         try:
             # Carrega as configurações da API
@@ -28,13 +35,17 @@ class APICaller:
             all_dfs = []
             
             # Itera sobre as configurações da API
-            for config in api_configs:
+            for i, config in enumerate(api_configs, start=1):
                 url = config["url"]
                 data = config["data"]
                 
                 df_result = self._call_api_with_retry(url, data)
                 if df_result is not None:
                     all_dfs.append(df_result)
+                
+                notify_progress(progress_callback, 'api', 'andamento',
+                                processados=i, total=len(api_configs),
+                                registros=sum(len(df) for df in all_dfs))
             
             if not all_dfs:
                 self.logger.error("Nenhum DataFrame foi recuperado das chamadas da API")
@@ -63,13 +74,15 @@ class APICaller:
             self.logger.info(f"Tentativa {retry_count + 1} para {url}...")
             
             try:
-                response = requests.post(url, json=data)
+                with profile_section('api.requisicao'):
+                    response = self.session.post(url, json=data)
                 self.logger.info(f'Status da resposta: {response.status_code}')
                 
                 if response.status_code == 200:
                     # Converte a resposta em JSON e DataFrame
                     news_data = response.json()
-                    df_api = pd.json_normalize(news_data)
+                    with profile_section('api.normalizacao'):
+                        df_api = pd.json_normalize(news_data)
                     self.logger.info(f"DataFrame criado com {len(df_api)} registros")
                     return df_api
                     
@@ -101,7 +114,8 @@ class APICaller:
                 self.logger.info("Normalização do campo Canais concluída")
             
             # Salva o DataFrame completo
-            final_df.to_excel(self.config.arq_api_original, index=False)
+            with profile_section('xlsx.api'):
+                final_df.to_excel(self.config.arq_api_original, index=False)
             self.logger.info(f"Arquivo salvo: {self.config.arq_api_original} - {final_df.shape[0]} registros")
             
             # Cria versão reduzida com colunas específicas
@@ -115,7 +129,8 @@ class APICaller:
                 self.logger.warning(f"Colunas não encontradas: {missing_cols}")
                 final_df_small = pd.DataFrame(columns=required_cols_small)
             
-            final_df_small.to_excel(self.config.arq_api, index=False)
+            with profile_section('xlsx.api'):
+                final_df_small.to_excel(self.config.arq_api, index=False)
             self.logger.info(f"Arquivo salvo: {self.config.arq_api} - {final_df_small.shape[0]} registros")
             
         except Exception as e:
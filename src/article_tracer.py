@@ -0,0 +1,253 @@
+"""
+Rastreamento por notícia da análise de protagonismo
+Registra, para cada notícia, o tempo gasto em cada fase (normalização, filtro de canais,
+porta-vozes, contagem de marcas, chamadas à DeepSeek, montagem do resultado) e as chamadas
+à DeepSeek com os tokens consumidos, em um arquivo JSON Lines por execução
+(article_traces_{run_id}.jsonl). Permite encontrar as poucas notícias que concentram o
+tempo ou o custo de uma execução.
+
+Uso pela linha de comando (notícias mais lentas e mais caras):
+    python -m src.article_tracer                      # último arquivo de dados/marca_setor
+    python -m src.article_tracer arquivo.jsonl --top 20
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.config_manager import ConfigManager
+
+# Notícia em análise em cada thread (chamadas à DeepSeek são atribuídas a ela)
+_local = threading.local()
+
+
+def record_call(campos: Dict):
+    """
+    Registra uma chamada à DeepSeek na notícia em análise na thread atual (se houver)
+
+    Args:
+        campos: Campos do registro da chamada (etapa, marca, duracao_s, espera_s, tokens, status)
+    """
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.chamadas.append(campos)
+
+
+class ArticleTrace:
+    """
+    Rastro de uma notícia
+
+    As fases são medidas por marcação: mark(fase) atribui à fase o tempo decorrido desde a
+    marcação anterior (ou desde o início da notícia), sem reestruturar o código medido.
+    A duração vai até a última marcação: o rastro pode ser gravado bem depois (close())
+    """
+
+    __slots__ = ('noticia_id', 'caracteres', 'marcas', 'fases', 'chamadas', '_inicio', '_ultima_marca')
+
+    def __init__(self, noticia_id):
+        self.noticia_id = noticia_id
+        self.caracteres = 0
+        self.marcas: List[str] = []
+        self.fases: Dict[str, float] = {}
+        self.chamadas: List[Dict] = []
+        self._inicio = self._ultima_marca = time.perf_counter()
+
+    def mark(self, fase: str):
+        """Atribui à fase o tempo decorrido desde a marcação anterior"""
+        agora = time.perf_counter()
+        self.fases[fase] = self.fases.get(fase, 0.0) + (agora - self._ultima_marca)
+        self._ultima_marca = agora
+
+    def to_dict(self) -> Dict:
+        return {
+            'noticia_id': self.noticia_id,
+            'caracteres': self.caracteres,
+            'marcas': self.marcas,
+            'duracao_s': round(self._ultima_marca - self._inicio, 4),
+            'fases': {fase: round(segundos, 4) for fase, segundos in self.fases.items()},
+            'chamadas': self.chamadas,
+            'prompt_tokens': sum(chamada.get('prompt_tokens', 0) for chamada in self.chamadas),
+            'completion_tokens': sum(chamada.get('completion_tokens', 0) for chamada in self.chamadas),
+            'cached_tokens': sum(chamada.get('cached_tokens', 0) for chamada in self.chamadas)
+        }
+
+
+class _InactiveTrace:
+    """Rastro descartado (rastreamento desativado)"""
+
+    __slots__ = ('noticia_id', 'caracteres', 'marcas')
+
+    def __init__(self):
+        self.noticia_id = None
+        self.caracteres = 0
+        self.marcas: List[str] = []
+
+    def mark(self, fase: str):
+        pass
+
+
+_TRACE_INATIVO = _InactiveTrace()
+
+
+class ArticleTracer:
+    """
+    Grava os rastros das notícias de uma execução
+
+    - begin(): inicia o rastro de uma notícia (encerrando o da notícia anterior)
+    - close(): grava o último rastro e fecha o arquivo
+
+    Uma notícia pode ter mais de um registro: as chamadas adiadas (modo orçamento) e as
+    repetições da fila de falhas transitórias são rastreadas depois do fluxo principal, em
+    registros próprios; merge_traces() os agrega por notícia
+
+    Com TRACE_NOTICIAS=false, begin() retorna um rastro inativo e nada é gravado
+    """
+
+    def __init__(self, config_manager: ConfigManager, ativo: Optional[bool] = None):
+        self.config = config_manager
+        self.logger = logging.getLogger(__name__)
+        self.ativo = config_manager.trace_noticias if ativo is None else ativo
+        self.path = config_manager.pasta_marca_setor / f"article_traces_{config_manager.run_id}.jsonl"
+        self._arquivo = None
+        self._trace: Optional[ArticleTrace] = None
+        self.rastreadas = 0
+
+    def begin(self, noticia_id):
+        """Inicia o rastro de uma notícia na thread atual"""
+        if not self.ativo:
+            return _TRACE_INATIVO
+        self._finish_current()
+        self._trace = ArticleTrace(noticia_id)
+        _local.trace = self._trace
+        return self._trace
+
+    def _finish_current(self):
+        trace, self._trace = self._trace, None
+        _local.trace = None
+        if trace is None:
+            return
+        try:
+            if self._arquivo is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._arquivo = open(self.path, 'w', encoding='utf-8')
+            self._arquivo.write(json.dumps(
+                {'run_id': self.config.run_id, **trace.to_dict()}, ensure_ascii=False, default=str
+            ) + '\n')
+            self.rastreadas += 1
+        except Exception as e:
+            # Rastreamento nunca interrompe o processamento
+            self.logger.warning(f"Não foi possível gravar o rastro da notícia {trace.noticia_id}: {str(e)}")
+            self.ativo = False
+
+    def close(self) -> Optional[Path]:
+        """
+        Grava o último rastro e fecha o arquivo
+
+        Returns:
+            Caminho do arquivo de rastros ou None se nada foi gravado
+        """
+        self._finish_current()
+        if self._arquivo is None:
+            return None
+        self._arquivo.close()
+        self._arquivo = None
+        self.logger.info(f"Rastros de {self.rastreadas} notícias salvos em: {self.path}")
+        return self.path
+
+
+def load_traces(arquivo) -> List[Dict]:
+    """Lê um arquivo de rastros (linhas inválidas são ignoradas)"""
+    traces = []
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        for linha in f:
+            try:
+                traces.append(json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+    return traces
+
+
+def merge_traces(traces: List[Dict]) -> List[Dict]:
+    """
+    Agrega os registros de uma mesma notícia (fluxo principal, chamadas adiadas e repetições)
+
+    Tempos, fases, chamadas e tokens são somados; as marcas são unidas na ordem de aparição
+    """
+    por_noticia: Dict = {}
+    for trace in traces:
+        agregado = por_noticia.get(trace['noticia_id'])
+        if agregado is None:
+            por_noticia[trace['noticia_id']] = {
+                **trace,
+                'marcas': list(trace.get('marcas') or []),
+                'fases': dict(trace.get('fases') or {}),
+                'chamadas': list(trace.get('chamadas') or [])
+            }
+            continue
+        agregado['caracteres'] = max(agregado.get('caracteres', 0), trace.get('caracteres', 0))
+        agregado['marcas'] += [marca for marca in trace.get('marcas') or [] if marca not in agregado['marcas']]
+        agregado['duracao_s'] = round(agregado['duracao_s'] + trace['duracao_s'], 4)
+        for fase, segundos in (trace.get('fases') or {}).items():
+            agregado['fases'][fase] = round(agregado['fases'].get(fase, 0.0) + segundos, 4)
+        agregado['chamadas'] += trace.get('chamadas') or []
+        for chave in ('prompt_tokens', 'completion_tokens', 'cached_tokens'):
+            agregado[chave] = agregado.get(chave, 0) + trace.get(chave, 0)
+    return list(por_noticia.values())
+
+
+def _print_ranking(titulo: str, traces: List[Dict], chave, top: int):
+    print(f"\n{titulo}")
+    print(f"{'notícia':>12} {'tempo(s)':>9} {'tokens':>8} {'chamadas':>8} {'caract.':>8}  fase mais lenta")
+    for trace in sorted(traces, key=chave, reverse=True)[:top]:
+        fases = trace.get('fases') or {}
+        fase_lenta = max(fases, key=fases.get) if fases else None
+        tokens = trace.get('prompt_tokens', 0) + trace.get('completion_tokens', 0)
+        print(f"{str(trace['noticia_id']):>12} {trace['duracao_s']:>9.3f} {tokens:>8} "
+              f"{len(trace.get('chamadas', [])):>8} {trace.get('caracteres', 0):>8}  "
+              + (f"{fase_lenta} ({fases[fase_lenta]:.3f}s)" if fase_lenta else "-"))
+
+
+def main(argv: Optional[List[str]] = None):
+    """Lista as notícias mais lentas e mais caras de um arquivo de rastros"""
+    parser = argparse.ArgumentParser(description="Notícias mais lentas e mais caras de uma execução")
+    parser.add_argument('arquivo', nargs='?', help="Arquivo article_traces_*.jsonl (padrão: o mais recente)")
+    parser.add_argument('--pasta', default=str(Path(__file__).parent.parent / "dados" / "marca_setor"),
+                        help="Pasta procurada quando o arquivo não é informado")
+    parser.add_argument('--top', type=int, default=10, help="Quantidade de notícias em cada lista")
+    args = parser.parse_args(argv)
+
+    arquivo = args.arquivo
+    if arquivo is None:
+        arquivos = sorted(Path(args.pasta).glob("article_traces_*.jsonl"))
+        if not arquivos:
+            print(f"❌ Nenhum arquivo article_traces_*.jsonl em {args.pasta}")
+            return 1
+        arquivo = arquivos[-1]
+
+    traces = merge_traces(load_traces(arquivo))
+    if not traces:
+        print(f"❌ Nenhum rastro em {arquivo}")
+        return 1
+
+    tempo_total = sum(trace['duracao_s'] for trace in traces)
+    tokens_total = sum(trace.get('prompt_tokens', 0) + trace.get('completion_tokens', 0) for trace in traces)
+    fases_total: Dict[str, float] = {}
+    for trace in traces:
+        for fase, segundos in (trace.get('fases') or {}).items():
+            fases_total[fase] = fases_total.get(fase, 0.0) + segundos
+
+    print(f"📄 {arquivo}: {len(traces)} notícias | {tempo_total:.2f}s | {tokens_total} tokens")
+    for fase, segundos in sorted(fases_total.items(), key=lambda item: item[1], reverse=True):
+        print(f"   {fase:<16} {segundos:>9.3f}s ({segundos / tempo_total * 100 if tempo_total else 0:.1f}%)")
+
+    _print_ranking(f"🐢 {args.top} notícias mais lentas", traces, lambda trace: trace['duracao_s'], args.top)
+    _print_ranking(f"💰 {args.top} notícias mais caras (tokens)", traces,
+                   lambda trace: trace.get('prompt_tokens', 0) + trace.get('completion_tokens', 0), args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
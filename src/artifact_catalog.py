@@ -0,0 +1,252 @@
+"""
+Catálogo de artefatos gerados pelo sistema
+Índice SQLite dos arquivos com timestamp (run id, tamanho, data de modificação)
+com política de retenção/compactação por execução
+"""
+
+import gzip
+import logging
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.config_manager import ConfigManager
+
+# Tipos de artefatos registrados no catálogo
+TIPO_PROTAGONISMO = "protagonismo"
+TIPO_LOTE_INTERMEDIARIO = "lote_intermediario"
+TIPO_LOTE_FINAL = "lote_final"
+TIPO_LOTE_FINAL_HYPERLINKS = "lote_final_hyperlinks"
+TIPO_DOWNLOAD_LOTE_FINAL = "download_lote_final"
+TIPO_RELATORIO_EXECUCAO = "relatorio_execucao"
+TIPO_TRACE_NOTICIAS = "trace_noticias"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artefatos (
+    caminho TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    tamanho INTEGER,
+    mtime REAL,
+    compactado INTEGER NOT NULL DEFAULT 0,
+    registrado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artefatos_tipo_mtime ON artefatos (tipo, compactado, mtime DESC);
+CREATE INDEX IF NOT EXISTS idx_artefatos_run ON artefatos (run_id);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+class ArtifactCatalog:
+    def __init__(self, config_manager: ConfigManager):
+        self.config = config_manager
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(config_manager.arq_catalogo)
+        self._ensure_schema()
+
+    @contextmanager
+    def _connect(self):
+        """Abre uma conexão por operação (seguro para uso entre threads) e faz commit ao final"""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        """Cria as tabelas do catálogo se ainda não existirem"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _bump_version(self, conn):
+        """Incrementa a versão do catálogo (usada para invalidar caches da interface)"""
+        conn.execute(
+            "INSERT INTO meta (chave, valor) VALUES ('versao', '1') "
+            "ON CONFLICT(chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+        )
+
+    def version(self) -> int:
+        """Retorna a versão atual do catálogo"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT valor FROM meta WHERE chave = 'versao'").fetchone()
+        return int(row[0]) if row else 0
+
+    def register(self, caminho, tipo: str, run_id: Optional[str] = None) -> bool:
+        """
+        Registra (ou atualiza) um artefato no catálogo
+
+        Falhas no catálogo nunca interrompem o processamento - apenas são logadas
+
+        Args:
+            caminho: Caminho do arquivo gerado
+            tipo: Tipo do artefato (constantes TIPO_*)
+            run_id: Identificador da execução (padrão: run_id atual do ConfigManager)
+
+        Returns:
+            bool: True se o artefato foi registrado
+        """
+        try:
+            arquivo = Path(caminho).resolve()
+            stat = arquivo.stat()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artefatos "
+                    "(caminho, nome, tipo, run_id, tamanho, mtime, compactado, registrado_em) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+                    (str(arquivo), arquivo.name, tipo, run_id or self.config.run_id,
+                     stat.st_size, stat.st_mtime, time.time())
+                )
+                self._bump_version(conn)
+            self.logger.debug(f"Artefato registrado no catálogo: {arquivo.name} ({tipo})")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Não foi possível registrar artefato {caminho} no catálogo: {str(e)}")
+            return False
+
+    def list_recent(self, tipo: str, limit: int = 10) -> List[Dict]:
+        """
+        Lista os artefatos mais recentes de um tipo (consulta indexada, sem varrer diretórios)
+
+        Returns:
+            Lista de dicionários com caminho, nome, run_id, tamanho e mtime
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT caminho, nome, run_id, tamanho, mtime FROM artefatos "
+                "WHERE tipo = ? AND compactado = 0 ORDER BY mtime DESC LIMIT ?",
+                (tipo, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def index_existing(self, pasta, pattern: str, tipo: str) -> int:
+        """
+        Indexa arquivos já existentes em disco (executado uma única vez por tipo)
+
+        Usado para incorporar ao catálogo arquivos gerados antes da sua criação.
+        O run_id é derivado do timestamp no nome do arquivo (..._YYYYMMDD_HHMMSS.xlsx).
+
+        Returns:
+            int: Quantidade de arquivos indexados
+        """
+        chave = f"indexado_{tipo}"
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE chave = ?", (chave,)).fetchone():
+                return 0
+
+        indexados = 0
+        pasta = Path(pasta)
+        if pasta.exists():
+            for arquivo in pasta.glob(pattern):
+                partes = arquivo.stem.split('_')
+                run_id = '_'.join(partes[-2:]) if len(partes) >= 2 else arquivo.stem
+                if self.register(arquivo, tipo, run_id=run_id):
+                    indexados += 1
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, '1')", (chave,))
+
+        if indexados:
+            self.logger.info(f"Catálogo: {indexados} arquivo(s) existentes indexados como '{tipo}'")
+        return indexados
+
+    def apply_retention(self, keep_runs: Optional[int] = None,
+                        keep_compressed_runs: Optional[int] = None) -> Dict[str, int]:
+        """
+        Aplica a política de retenção por execução
+
+        - Execuções mais recentes (keep_runs): arquivos mantidos intactos
+        - Execuções seguintes (keep_compressed_runs): arquivos compactados com gzip
+        - Execuções mais antigas: arquivos removidos (se keep_compressed_runs > 0)
+
+        As execuções são ordenadas pelo run_id (timestamp YYYYMMDD_HHMMSS da execução), que não
+        muda quando os arquivos são compactados
+
+        Returns:
+            Dicionário com a quantidade de arquivos compactados e removidos
+        """
+        keep_runs = self.config.retencao_execucoes if keep_runs is None else keep_runs
+        keep_compressed_runs = (self.config.retencao_execucoes_compactadas
+                                if keep_compressed_runs is None else keep_compressed_runs)
+
+        stats = {'compactados': 0, 'removidos': 0}
+
+        with self._connect() as conn:
+            runs = [row[0] for row in conn.execute(
+                "SELECT run_id FROM artefatos GROUP BY run_id ORDER BY run_id DESC"
+            )]
+
+        runs_para_compactar = runs[keep_runs:]
+        runs_para_remover = []
+        if keep_compressed_runs > 0:
+            runs_para_compactar = runs[keep_runs:keep_runs + keep_compressed_runs]
+            runs_para_remover = runs[keep_runs + keep_compressed_runs:]
+
+        for run_id in runs_para_compactar:
+            for caminho, compactado in self._artefatos_da_execucao(run_id):
+                if not compactado and self._compactar(caminho):
+                    stats['compactados'] += 1
+
+        for run_id in runs_para_remover:
+            for caminho, _ in self._artefatos_da_execucao(run_id):
+                if self._remover(caminho):
+                    stats['removidos'] += 1
+
+        if stats['compactados'] or stats['removidos']:
+            self.logger.info(
+                f"Retenção aplicada: {stats['compactados']} arquivo(s) compactado(s), "
+                f"{stats['removidos']} removido(s)"
+            )
+        return stats
+
+    def _artefatos_da_execucao(self, run_id: str) -> List[tuple]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT caminho, compactado FROM artefatos WHERE run_id = ?", (run_id,)
+            ).fetchall()
+
+    def _compactar(self, caminho: str) -> bool:
+        """Compacta um artefato com gzip e atualiza o catálogo (mantém o mtime do arquivo original)"""
+        origem = Path(caminho)
+        destino = origem.with_name(origem.name + '.gz')
+        try:
+            if origem.exists():
+                with open(origem, 'rb') as f_in, gzip.open(destino, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                origem.unlink()
+
+            with self._connect() as conn:
+                if destino.exists():
+                    stat = destino.stat()
+                    conn.execute(
+                        "UPDATE artefatos SET caminho = ?, nome = ?, tamanho = ?, compactado = 1 "
+                        "WHERE caminho = ?",
+                        (str(destino), destino.name, stat.st_size, caminho)
+                    )
+                else:
+                    conn.execute("DELETE FROM artefatos WHERE caminho = ?", (caminho,))
+                self._bump_version(conn)
+            return destino.exists()
+        except Exception as e:
+            self.logger.warning(f"Erro ao compactar {caminho}: {str(e)}")
+            return False
+
+    def _remover(self, caminho: str) -> bool:
+        """Remove um artefato do disco e do catálogo"""
+        try:
+            Path(caminho).unlink(missing_ok=True)
+            with self._connect() as conn:
+                conn.execute("DELETE FROM artefatos WHERE caminho = ?", (caminho,))
+                self._bump_version(conn)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Erro ao remover {caminho}: {str(e)}")
+            return False
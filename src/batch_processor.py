@@ -8,11 +8,22 @@ import logging
 from datetime import datetime
 from typing import Optional, List
 from src.config_manager import ConfigManager
+from src.utils.excel_writer import write_final_workbooks
+from src.run_profiler import profile_section
+from src.protagonismo_analyzer import COLUNA_NIVEL_POR_REGRA
+from src.artifact_catalog import (
+    ArtifactCatalog,
+    TIPO_LOTE_INTERMEDIARIO,
+    TIPO_LOTE_FINAL,
+    TIPO_LOTE_FINAL_HYPERLINKS,
+    TIPO_DOWNLOAD_LOTE_FINAL
+)
 
 class BatchProcessor:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.logger = logging.getLogger(__name__)
+        self.catalog = ArtifactCatalog(config_manager)
     
     def process_batch(self, final_df_consolidado: pd.DataFrame, final_df: pd.DataFrame):
         """
@@ -52,6 +63,8 @@ class BatchProcessor:
                     self.logger.info(f"Processamento em lote concluído: {arquivo_final}")
             else:
                 self.logger.error("Falha na criação do arquivo final")
+            
+            return arquivo_final
                 
         except Exception as e:
             self.logger.error(f"Erro durante processamento em lote: {str(e)}")
@@ -69,8 +82,10 @@ class BatchProcessor:
         arquivo_intermediario = f"{self.config.pasta_marca_setor}/Tabela_atualizacao_em_lote_{timestamp}.xlsx"
         
         try:
-            df_lote.to_excel(arquivo_intermediario, index=False)
+            with profile_section('xlsx.lote'):
+                df_lote.to_excel(arquivo_intermediario, index=False)
             self.logger.info(f"Arquivo intermediário salvo: {arquivo_intermediario}")
+            self.catalog.register(arquivo_intermediario, TIPO_LOTE_INTERMEDIARIO)
         except Exception as e:
             self.logger.warning(f"Não foi possível salvar arquivo intermediário: {str(e)}")
         
@@ -253,21 +268,29 @@ class BatchProcessor:
                             if col_ocorrencias in df_lote_final.columns:
                                 colunas_finais.append(col_ocorrencias)
             
+            # Modo orçamento: marcas com nível definido por regra (sem análise da DeepSeek)
+            if COLUNA_NIVEL_POR_REGRA in df_lote_final.columns:
+                colunas_finais.append(COLUNA_NIVEL_POR_REGRA)
+            
             # Cria DataFrame final com colunas ordenadas
             df_lote_final_limpo = df_lote_final[colunas_finais].copy()
             
             # Gera timestamp e salva arquivos
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # Arquivo simples (Excel sem formatação)
+            # Arquivo simples e arquivo com hyperlinks gerados em uma única passagem (streaming)
             arquivo_simples = f"{self.config.pasta_marca_setor}/Tabela_atualizacao_em_lote_limpo_{timestamp}.xlsx"
-            df_lote_final_limpo.to_excel(arquivo_simples, index=False)
-            self.logger.info(f"Arquivo simples salvo: {arquivo_simples}")
-            
-            # Arquivo com hyperlinks (se UrlVisualizacao existe)
+            arquivo_hyperlinks = None
             if 'UrlVisualizacao' in df_lote_final_limpo.columns:
                 arquivo_hyperlinks = f"{self.config.pasta_marca_setor}/Tabela_atualizacao_em_lote_limpo_hyperlinks_{timestamp}.xlsx"
-                self._save_with_hyperlinks_largo(df_lote_final_limpo, arquivo_hyperlinks)
+            
+            with profile_section('xlsx.lote'):
+                stats_escrita = write_final_workbooks(df_lote_final_limpo, arquivo_simples, arquivo_hyperlinks)
+            self.logger.info(f"Arquivo simples salvo: {arquivo_simples} ({stats_escrita['linhas']} linhas)")
+            self.catalog.register(arquivo_simples, TIPO_LOTE_FINAL)
+            if arquivo_hyperlinks:
+                self.logger.info(f"Arquivo com hyperlinks salvo: {arquivo_hyperlinks} ({stats_escrita['urls']} links)")
+                self.catalog.register(arquivo_hyperlinks, TIPO_LOTE_FINAL_HYPERLINKS)
             
             return arquivo_simples
             
@@ -291,6 +314,7 @@ class BatchProcessor:
             if arquivo_origem.exists():
                 arquivo_destino = downloads_dir / arquivo_origem.name
                 shutil.copy2(arquivo_origem, arquivo_destino)
+                self.catalog.register(arquivo_destino, TIPO_DOWNLOAD_LOTE_FINAL)
                 
                 self.logger.info(f"Arquivo disponível para download em: {arquivo_destino}")
                 
@@ -317,37 +341,16 @@ class BatchProcessor:
     def _save_with_hyperlinks_largo(self, df: pd.DataFrame, filename: str):
         """
         Salva DataFrame com hyperlinks na coluna UrlVisualizacao
-        CORRIGIDO: Sintaxe correta do xlsxwriter
+        ATUALIZADO: Usa o escritor streaming (constant_memory) com fallback para =HYPERLINK
         """
         try:
-            with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='Sheet1', index=False)
-                
-                # Acessa workbook e worksheet corretamente
-                workbook = writer.book
-                worksheet = writer.sheets['Sheet1']
-                
-                # Cria formato para hyperlinks
-                url_format = workbook.add_format({
-                    'font_color': 'blue',
-                    'underline': 1
-                })
-                
-                # Encontra índice da coluna UrlVisualizacao
-                if 'UrlVisualizacao' in df.columns:
-                    url_col_idx = df.columns.get_loc('UrlVisualizacao')
-                    
-                    # Aplica hyperlinks
-                    for row_idx, url in enumerate(df['UrlVisualizacao'], start=1):  # start=1 pula header
-                        if pd.notna(url) and str(url).startswith('http'):
-                            worksheet.write_url(row_idx, url_col_idx, str(url), url_format, 'Link')
-                
-                self.logger.info(f"Arquivo com hyperlinks salvo: {filename}")
-                
+            with profile_section('xlsx.lote'):
+                write_final_workbooks(df, arquivo_hyperlinks=filename)
+            self.logger.info(f"Arquivo com hyperlinks salvo: {filename}")
         except Exception as e:
             self.logger.error(f"Erro ao salvar arquivo com hyperlinks: {str(e)}")
             # Fallback: salva como arquivo Excel simples
-            df.to_excel(filename.replace('_hyperlinks', '_simples'), index=False)
+            write_final_workbooks(df, arquivo_simples=filename.replace('_hyperlinks', '_simples'))
     
     # === MÉTODOS ANTIGOS MANTIDOS PARA COMPATIBILIDADE ===
     def _process_group_consolidation(self, df_lote: pd.DataFrame) -> pd.DataFrame:
@@ -15,7 +15,6 @@ Data: Novembro 2025
 import pandas as pd
 import json
 import hashlib
-import time
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -24,6 +23,8 @@ import re
 import requests
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configurar imports de forma flexível
 def setup_imports():
@@ -78,21 +79,87 @@ def setup_imports():
 
 # Carregar dependências
 ConfigManager, APICaller = setup_imports()
+from src.deepseek_client import DeepSeekClient
+from src.utils.jsonl_cache import JsonlCache
+from src.utils.gazetteer import Gazetteer, fold_text
+from src.brand_month_state import BrandMonthState
+from src.utils.progress import ProgressCallback, notify_progress
+
+# Instruções de identificação de marcas (compartilhadas com a análise combinada do protagonismo)
+INSTRUCOES_EXTRACAO_MARCAS = """INSTRUÇÕES IMPORTANTES:
+1. Identifique marcas de TODOS os setores (bancos, tecnologia, varejo, automotivo, etc.)
+2. Inclua tanto marcas principais quanto subsidiárias/divisões
+3. NÃO inclua: nomes de pessoas, cidades, países, órgãos governamentais
+4. NÃO inclua: termos genéricos como "governo", "mercado", "setor"
+5. Mantenha grafias exatas como aparecem no texto
+6. ATENÇÃO ESPECIAL para marcas do grupo Bradesco: Bradesco, Bradesco BBI, Bradesco Asset, Ágora"""
+
+# Termos genéricos descartados pelos filtros automáticos (não são marcas)
+TERMOS_GENERICOS = {
+    'brasil', 'brazil', 'sp', 'rj', 'mg', 'são paulo', 'rio de janeiro',
+    'governo', 'estado', 'união', 'federal', 'municipal', 'nacional',
+    'mercado', 'setor', 'empresa', 'companhia', 'grupo', 'holding',
+    'ltda', 'sa', 's.a.', 'inc', 'corp', 'corporation', 'banco central',
+    'tesouro nacional', 'ministério', 'receita federal'
+}
+
+# Palavras que aparecem com inicial maiúscula sem serem entidades (início de frase, datas),
+# comparadas sem acentos e em minúsculas
+PALAVRAS_COMUNS_MAIUSCULAS = {
+    'o', 'a', 'os', 'as', 'um', 'uma', 'uns', 'umas', 'de', 'do', 'da', 'dos', 'das',
+    'em', 'no', 'na', 'nos', 'nas', 'por', 'pelo', 'pela', 'para', 'com', 'sem', 'sobre',
+    'entre', 'ate', 'apos', 'desde', 'e', 'ou', 'mas', 'porem', 'contudo', 'entretanto',
+    'segundo', 'conforme', 'ainda', 'ja', 'tambem', 'alem', 'assim', 'depois', 'antes',
+    'hoje', 'ontem', 'amanha', 'agora', 'nao', 'sim', 'se', 'que', 'quando', 'onde', 'como',
+    'isso', 'isto', 'esse', 'essa', 'este', 'esta', 'esses', 'essas', 'estes', 'estas',
+    'ele', 'ela', 'eles', 'elas', 'mais', 'menos', 'muito', 'pouco', 'todos', 'todas',
+    'cada', 'outro', 'outra', 'outros', 'outras', 'nesta', 'neste', 'nessa', 'nesse',
+    'janeiro', 'fevereiro', 'marco', 'abril', 'maio', 'junho', 'julho', 'agosto',
+    'setembro', 'outubro', 'novembro', 'dezembro', 'segunda', 'terca', 'quarta', 'quinta',
+    'sexta', 'sabado', 'domingo', 'feira', 'sr', 'sra', 'dr', 'dra'
+}
+
+# Marcas que também são palavras comuns ("vale a pena", "é claro", "Oi, tudo bem"): mesmo com
+# inicial maiúscula (início de frase) podem não ser a marca - o artigo segue para a DeepSeek
+MARCAS_AMBIGUAS = {
+    'vale', 'claro', 'oi', 'inter', 'gol', 'azul', 'rede', 'via', 'agora', 'positivo',
+    'natura', 'nova', 'sol', 'ser', 'mais', 'boa vista'
+}
+
+# Palavras com inicial maiúscula (candidatas a entidades)
+PADRAO_PALAVRA = re.compile(r"\w[\w&'\-]*")
+
+# Palavras de ligação dentro de nomes compostos ("Banco do Brasil", "Caixa e Previdência")
+CONECTIVOS_NOMES = {'de', 'da', 'do', 'das', 'dos', 'e'}
+
+# Separação do conteúdo em frases (pré-seleção de trechos enviados à DeepSeek)
+PADRAO_FIM_FRASE = re.compile(r'(?<=[.!?;])\s+|\n+')
+
+# Estimativa de caracteres por token, usada para reportar a economia da pré-seleção
+CARACTERES_POR_TOKEN = 4
 
 class BrandExtractor:
     """Extrator de marcas integrado com a arquitetura do projeto"""
     
-    def __init__(self, config_manager: ConfigManager):
+    def __init__(self, config_manager: ConfigManager, deepseek_client: Optional[DeepSeekClient] = None):
         """
         Inicializa o extrator usando o ConfigManager existente
         
         Args:
             config_manager: Instância do ConfigManager do projeto
+            deepseek_client: Cliente DeepSeek compartilhado com outras etapas (opcional);
+                             as chamadas respeitam o orçamento de concorrência/taxa do cliente
         """
         self.config = config_manager
         self.logger = logging.getLogger(__name__)
         self.headers = config_manager.get_api_headers()  # CORRIGIDO: Mesmo que protagonismo_analyzer
         
+        # Chamadas concorrentes: pool limitado de threads + limites do cliente DeepSeek
+        self.max_workers = config_manager.deepseek_max_workers
+        # Orçamento de caracteres do conteúdo enviado (0 = artigo completo)
+        self.max_content_chars = config_manager.marcas_max_caracteres
+        self.deepseek_client = deepseek_client or DeepSeekClient(config_manager)
+        
         # Configurar diretórios para brand extractor
         self._setup_directories()
         
@@ -104,10 +171,18 @@ class BrandExtractor:
             "Ágora"
         ]
         
-        # Cache para evitar reprocessar
-        self.processed_cache = set()
+        # Cache de resultados {hash do conteúdo: marcas filtradas} para evitar reprocessar
+        self.cache_file = self.cache_dir / "brand_extraction_results.jsonl"
+        self.cache_log = JsonlCache(self.cache_file, key_field='hash', value_field='brands')
+        self.processed_cache: Dict[str, List[str]] = {}
         self.load_processed_cache()
         
+        # Dicionário local de marcas (frequências de meses anteriores): artigos sem entidades
+        # desconhecidas são resolvidos sem chamar a API
+        self.gazetteer: Optional[Gazetteer] = None
+        if config_manager.gazetteer_marcas:
+            self.gazetteer = self.build_gazetteer()
+        
         # Estatísticas
         self.stats = {
             "total_articles": 0,
@@ -115,8 +190,13 @@ class BrandExtractor:
             "skipped_cache": 0,
             "api_calls": 0,
             "unique_brands": 0,
-            "exclusive_articles": 0
+            "exclusive_articles": 0,
+            "combined_calls": 0,
+            "gazetteer_articles": 0,
+            "content_chars_original": 0,
+            "content_chars_sent": 0
         }
+        self._stats_lock = threading.Lock()
 
     def _setup_directories(self):
         """Configura diretórios específicos do brand extractor"""
@@ -133,37 +213,217 @@ class BrandExtractor:
         self.logger.info(f"  Cache: {self.cache_dir}")
 
     def load_processed_cache(self):
-        """Carrega cache de artigos já processados"""
-        cache_file = self.cache_dir / "brand_extraction_cache.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                    self.processed_cache = set(cache_data.get('processed_hashes', []))
-                    self.logger.info(f"Cache carregado: {len(self.processed_cache)} artigos já processados")
-            except Exception as e:
-                self.logger.warning(f"Erro ao carregar cache: {e}")
+        """
+        Carrega o cache de resultados (log JSON Lines: uma linha {"hash", "brands"} por artigo)
+        
+        O cache antigo (brand_extraction_cache.json) guardava apenas os hashes, sem as marcas;
+        esses artigos são extraídos novamente para que entrem nas contagens do mês
+        """
+        try:
+            self.processed_cache = self.cache_log.load()
+            if self.processed_cache:
+                self.logger.info(f"Cache carregado: {len(self.processed_cache)} artigos já processados")
+        except Exception as e:
+            self.logger.warning(f"Erro ao carregar cache: {e}")
+        
+        legacy_file = self.cache_dir / "brand_extraction_cache.json"
+        if legacy_file.exists() and not self.processed_cache:
+            self.logger.info(
+                f"Cache antigo {legacy_file.name} contém apenas hashes (sem marcas) e será ignorado; "
+                f"os artigos serão extraídos novamente"
+            )
 
     def save_processed_cache(self):
-        """Salva cache de artigos processados"""
-        cache_file = self.cache_dir / "brand_extraction_cache.json"
+        """
+        Grava as entradas pendentes do cache e compacta o log se necessário
+        
+        As entradas já são acrescentadas ao log durante o processamento (com fsync em lotes);
+        aqui apenas o último lote é gravado
+        """
         try:
-            cache_data = {
-                'processed_hashes': list(self.processed_cache),
-                'last_update': datetime.now().isoformat(),
-                'total_processed': len(self.processed_cache)
-            }
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            self.cache_log.close()
         except Exception as e:
             self.logger.error(f"Erro ao salvar cache: {e}")
 
+    def build_gazetteer(self) -> Gazetteer:
+        """
+        Monta o dicionário local a partir dos arquivos brands_frequency_*.json já gerados
+        
+        Variações de grafia (acentos/maiúsculas) são unificadas na grafia mais frequente;
+        as marcas do grupo Bradesco mantêm a grafia oficial. Termos genéricos são registrados
+        sem valor: cobrem o trecho do texto, mas não entram na lista de marcas.
+        """
+        frequencias: Dict[str, int] = {}
+        arquivos = sorted(self.output_dir.glob("brands_frequency_*.json"))
+        for arquivo in arquivos:
+            try:
+                with open(arquivo, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+                for marca, quantidade in dados.get("brands_frequency", {}).items():
+                    frequencias[marca] = frequencias.get(marca, 0) + int(quantidade)
+            except Exception as e:
+                self.logger.warning(f"Erro ao ler {arquivo.name}: {e}")
+        
+        gazetteer = Gazetteer()
+        for termo in TERMOS_GENERICOS:
+            gazetteer.add(termo, None)
+        
+        # Menos frequentes primeiro: a grafia mais frequente de cada termo prevalece
+        for marca, _ in sorted(frequencias.items(), key=lambda item: (item[1], item[0])):
+            marcas_filtradas = self.apply_automatic_filters([marca])
+            if marcas_filtradas:
+                gazetteer.add(marcas_filtradas[0])
+        for marca in self.bradesco_group_brands:
+            gazetteer.add(marca)
+        gazetteer.build()
+        
+        self.logger.info(
+            f"Dicionário local de marcas: {len(gazetteer)} termos de {len(arquivos)} arquivo(s) de frequência"
+        )
+        return gazetteer
+
+    def resolve_locally(self, title: str, content: str) -> Optional[List[str]]:
+        """
+        Tenta identificar as marcas do artigo apenas com o dicionário local
+        
+        O artigo é resolvido quando todas as palavras com inicial maiúscula estão cobertas por
+        termos conhecidos (marcas ou termos genéricos) ou são palavras comuns; restando alguma
+        entidade desconhecida ou uma marca que também é palavra comum (MARCAS_AMBIGUAS), o
+        artigo segue para a DeepSeek.
+        
+        Returns:
+            Marcas encontradas (na ordem do texto, sem repetição) ou None se o artigo
+            precisar da API
+        """
+        if self.gazetteer is None:
+            return None
+        
+        marcas = []
+        for texto in (title, content):
+            normalizado = fold_text(texto)
+            ocorrencias = self.gazetteer.find(texto, normalizado)
+            if self._has_unknown_entities(texto, normalizado, ocorrencias):
+                return None
+            if any(marca is not None and normalizado[inicio:fim] in MARCAS_AMBIGUAS
+                   for inicio, fim, marca in ocorrencias):
+                return None
+            for _, _, marca in ocorrencias:
+                if marca is not None and marca not in marcas:
+                    marcas.append(marca)
+        return marcas
+
+    def _has_unknown_entities(self, texto: str, normalizado: str, ocorrencias) -> bool:
+        """Verifica se há palavras com inicial maiúscula fora dos termos encontrados"""
+        ocorrencias = iter(ocorrencias)
+        atual = next(ocorrencias, None)
+        for match in PADRAO_PALAVRA.finditer(texto):
+            inicio, fim = match.span()
+            # Avança até a ocorrência que pode cobrir esta palavra
+            while atual is not None and atual[1] <= inicio:
+                atual = next(ocorrencias, None)
+            if atual is not None and atual[0] <= inicio and fim <= atual[1]:
+                continue
+            
+            palavra = match.group()
+            if not palavra[0].isupper() or len(palavra) < 3 or palavra.isdigit():
+                continue
+            if normalizado[inicio:fim] in PALAVRAS_COMUNS_MAIUSCULAS:
+                continue
+            return True
+        return False
+
+    def select_candidate_text(self, content: str) -> str:
+        """
+        Pré-seleção de trechos: mantém apenas as frases do conteúdo com candidatas a marca
+        
+        Uma frase é mantida quando contém marca conhecida do dicionário local, sigla ou nome
+        composto (duas ou mais palavras seguidas com inicial maiúscula). A primeira palavra da
+        frase não conta para o nome composto (toda frase começa com maiúscula).
+        As frases selecionadas mantêm a ordem original e respeitam o orçamento de caracteres
+        (frases que não cabem são puladas).
+        
+        Args:
+            content: Conteúdo completo do artigo
+            
+        Returns:
+            Texto com as frases selecionadas (o conteúdo completo se a pré-seleção estiver desativada)
+        """
+        if not self.max_content_chars or not content:
+            return content
+        
+        selecionadas = []
+        tamanho = 0
+        for frase in PADRAO_FIM_FRASE.split(content):
+            frase = frase.strip()
+            if not frase or not self._has_brand_candidates(frase):
+                continue
+            if tamanho + len(frase) > self.max_content_chars:
+                continue
+            selecionadas.append(frase)
+            tamanho += len(frase) + 1
+        return ' '.join(selecionadas)
+
+    def _has_brand_candidates(self, texto: str) -> bool:
+        """Verifica se a frase contém marca conhecida, sigla ou nome composto"""
+        normalizado = fold_text(texto)
+        if self.gazetteer is not None and any(
+                marca is not None for _, _, marca in self.gazetteer.find(texto, normalizado)):
+            return True
+        
+        sequencia = 0
+        for posicao, match in enumerate(PADRAO_PALAVRA.finditer(texto)):
+            palavra = match.group()
+            # Sigla (BTG, XP, B3)
+            if len(palavra) >= 2 and palavra.isupper():
+                return True
+            if (posicao == 0 or not palavra[0].isupper()
+                    or normalizado[match.start():match.end()] in PALAVRAS_COMUNS_MAIUSCULAS):
+                if not (sequencia and palavra in CONECTIVOS_NOMES):
+                    sequencia = 0
+                continue
+            sequencia += 1
+            if sequencia >= 2:
+                return True
+        return False
+
+    def estimated_tokens_saved(self) -> int:
+        """Estimativa de tokens economizados pela pré-seleção de trechos nesta execução"""
+        economia = self.stats["content_chars_original"] - self.stats["content_chars_sent"]
+        return economia // CARACTERES_POR_TOKEN
+
+    def _increment_stat(self, nome: str, quantidade: int = 1):
+        """Atualiza uma estatística de forma segura entre threads"""
+        with self._stats_lock:
+            self.stats[nome] += quantidade
+
     def get_content_hash(self, title: str, content: str) -> str:
         """Gera hash único para o conteúdo do artigo"""
         combined = f"{title}\n{content}"
         return hashlib.md5(combined.encode('utf-8')).hexdigest()
 
-    def extract_brands_with_deepseek(self, title: str, content: str) -> List[str]:
+    def article_hash(self, title, content) -> str:
+        """Hash do artigo a partir dos campos brutos (mesma normalização de process_articles)"""
+        return self.get_content_hash(str(title).strip(), str(content).strip())
+
+    def needs_extraction(self, title, content) -> bool:
+        """Indica se o artigo ainda não tem marcas no cache de resultados"""
+        return self.article_hash(title, content) not in self.processed_cache
+
+    def record_brands(self, title, content, brands: List[str]):
+        """
+        Registra no cache as marcas obtidas por outra chamada (análise combinada do protagonismo)
+        
+        As marcas passam pelos mesmos filtros automáticos da extração; o artigo é depois
+        reaproveitado do cache por process_articles, sem nova chamada à API
+        """
+        content_hash = self.article_hash(title, content)
+        filtered_brands = self.apply_automatic_filters(brands)
+        self.processed_cache[content_hash] = filtered_brands
+        self.cache_log.append(content_hash, filtered_brands)
+        self._increment_stat("combined_calls")
+
+    def extract_brands_with_deepseek(self, title: str, content: str,
+                                     article_id: Optional[str] = None) -> Optional[List[str]]:
         """
         Extrai marcas usando DeepSeek API com configurações do projeto
         CORRIGIDO: Usa mesmo formato do protagonismo_analyzer.py
@@ -171,22 +431,21 @@ class BrandExtractor:
         Args:
             title: Título da notícia
             content: Conteúdo da notícia
+            article_id: ID do artigo (registro estruturado da chamada)
             
         Returns:
-            Lista de marcas detectadas
+            Lista de marcas detectadas, ou None em caso de falha (resultado não vai para o cache)
         """
-        text = f"Título: {title}\n\nConteúdo: {content}"
+        # Envia o título e apenas as frases com candidatas a marca
+        trechos = self.select_candidate_text(content)
+        self._increment_stat("content_chars_original", len(content))
+        self._increment_stat("content_chars_sent", len(trechos))
+        text = f"Título: {title}\n\nConteúdo: {trechos}"
         
         prompt = f"""
 Analise o texto a seguir e identifique TODAS as marcas/empresas mencionadas.
 
-INSTRUÇÕES IMPORTANTES:
-1. Identifique marcas de TODOS os setores (bancos, tecnologia, varejo, automotivo, etc.)
-2. Inclua tanto marcas principais quanto subsidiárias/divisões
-3. NÃO inclua: nomes de pessoas, cidades, países, órgãos governamentais
-4. NÃO inclua: termos genéricos como "governo", "mercado", "setor"
-5. Mantenha grafias exatas como aparecem no texto
-6. ATENÇÃO ESPECIAL para marcas do grupo Bradesco: Bradesco, Bradesco BBI, Bradesco Asset, Ágora
+{INSTRUCOES_EXTRACAO_MARCAS}
 
 FORMATO DE RESPOSTA:
 Responda APENAS com uma lista JSON de strings, sem explicações:
@@ -200,30 +459,25 @@ TEXTO:
 
         try:
             # CORRIGIDO: Usar EXATAMENTE o mesmo formato do protagonismo_analyzer.py
-            payload = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "Você é um analista especializado em identificar marcas/empresas mencionadas em textos. Identifique TODAS as marcas, exceto órgãos governamentais e termos genéricos."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.1
-            }
-            
-            response = requests.post(self.config.api_url, headers=self.headers, json=payload)
-            response.raise_for_status()  # CORRIGIDO: Mesmo tratamento de erro
-            
-            result = response.json()
-            brands_text = result['choices'][0]['message']['content'].strip()
+            messages = [
+                {
+                    "role": "system", 
+                    "content": "Você é um analista especializado em identificar marcas/empresas mencionadas em textos. Identifique TODAS as marcas, exceto órgãos governamentais e termos genéricos."
+                },
+                {"role": "user", "content": prompt}
+            ]
+            
+            resposta = self.deepseek_client.chat(
+                messages, temperature=0.1, contexto={'etapa': 'marcas', 'noticia_id': article_id}
+            )
+            brands_text = resposta['content']
             
             # Parse JSON response
             try:
                 brands = json.loads(brands_text)
                 if isinstance(brands, list):
-                    self.stats["api_calls"] += 1
-                    self.logger.debug(f"DeepSeek retornou: {brands}")
+                    self._increment_stat("api_calls")
+                    self.logger.debug("DeepSeek retornou: %s", brands)
                     return brands
             except json.JSONDecodeError:
                 self.logger.warning(f"Resposta não é JSON válido: {brands_text}")
@@ -233,7 +487,7 @@ TEXTO:
         except Exception as e:
             self.logger.error(f"Erro inesperado ao chamar DeepSeek: {str(e)}")
             
-        return []
+        return None
 
     def apply_automatic_filters(self, brands: List[str]) -> List[str]:
         """
@@ -266,15 +520,7 @@ TEXTO:
                 continue
                 
             # Filtro: termos muito genéricos
-            generic_terms = {
-                'brasil', 'brazil', 'sp', 'rj', 'mg', 'são paulo', 'rio de janeiro',
-                'governo', 'estado', 'união', 'federal', 'municipal', 'nacional',
-                'mercado', 'setor', 'empresa', 'companhia', 'grupo', 'holding',
-                'ltda', 'sa', 's.a.', 'inc', 'corp', 'corporation', 'banco central',
-                'tesouro nacional', 'ministério', 'receita federal'
-            }
-            
-            if brand.lower() in generic_terms:
+            if brand.lower() in TERMOS_GENERICOS:
                 continue
                 
             # Filtro: apenas caracteres especiais
@@ -310,7 +556,7 @@ TEXTO:
         if len(bradesco_brands_found) == 1 and len(brands) == 1:
             exclusive_brand = bradesco_brands_found[0]
             self.logger.info(f"EXCLUSIVA DETECTADA - Artigo {article_id}: '{exclusive_brand}' | Título: {title[:50]}...")
-            self.stats["exclusive_articles"] += 1
+            self._increment_stat("exclusive_articles")
             return exclusive_brand
             
         return None
@@ -366,108 +612,177 @@ TEXTO:
         
         raise ValueError("Não foi possível carregar dados de nenhuma fonte")
 
-    def process_articles(self, df: pd.DataFrame, month_year: str) -> Dict:
+    def _extract_article(self, article_id: str, title: str, content: str) -> List[str]:
+        """
+        Extrai e filtra as marcas de um artigo (executado nas threads do pool)
+        
+        Returns:
+            Lista de marcas filtradas (vazia se nenhuma marca for encontrada) ou None em caso de falha
+        """
+        self.logger.info("Processando artigo %s: %.50s...", article_id, title)
+        brands = self.extract_brands_with_deepseek(title, content, article_id=article_id)
+        if brands is None:
+            return None
+        return self.apply_automatic_filters(brands) if brands else []
+
+    def process_articles(self, df: pd.DataFrame, month_year: str,
+                         progress_callback: Optional[ProgressCallback] = None) -> Dict:
         """
         Processa artigos do DataFrame
         
+        A extração roda em um pool limitado de threads (DEEPSEEK_MAX_WORKERS) com limite de
+        taxa compartilhado; os resultados são consolidados na ordem original dos artigos,
+        de forma que a saída independe da ordem de conclusão das chamadas.
+        Artigos presentes no cache de resultados ou resolvidos pelo dicionário local de marcas
+        não chamam a API, mas entram normalmente nas frequências e na análise de exclusividade.
+        Os resultados do dicionário local não vão para o cache: são recalculados a cada execução,
+        acompanhando o vocabulário das frequências mais recentes.
+        
+        Os artigos da execução são incorporados ao estado do mês (BrandMonthState), e os
+        resultados retornados são os do mês inteiro; os números desta execução ficam em
+        results["run"].
+        
         Args:
             df: DataFrame com artigos
             month_year: String no formato 'YYYY_MM'
+            progress_callback: Callback opcional que recebe o progresso (etapa 'marcas')
             
         Returns:
-            Dicionário com resultados da extração
+            Dicionário com resultados da extração (agregados do mês)
         """
         self.logger.info(f"Iniciando extração de marcas para {month_year}")
         self.logger.info(f"Total de artigos: {len(df)}")
         
         self.stats["total_articles"] = len(df)
         
-        # Estrutura de dados para resultados
-        results = {
-            "month_year": month_year,
-            "extraction_date": datetime.now().isoformat(),
-            "total_articles": len(df),
-            "processed_articles": 0,
-            "exclusive_articles": [],
-            "all_brands_frequency": {},
-            "unique_brands": [],
-            "statistics": {}
-        }
-        
         all_brands_set = set()
         
-        for index, row in df.iterrows():
-            try:
-                article_id = str(row['Id'])
-                title = str(row.get('Titulo', '')).strip()
-                content = str(row.get('Conteudo', '')).strip()
-                
-                if not title and not content:
-                    continue
-                
-                # Verificar cache
-                content_hash = self.get_content_hash(title, content)
-                if content_hash in self.processed_cache:
-                    self.stats["skipped_cache"] += 1
-                    continue
-                
-                # Extrair marcas com DeepSeek
-                self.logger.info(f"Processando artigo {article_id}: {title[:50]}...")
-                brands = self.extract_brands_with_deepseek(title, content)
-                
-                if brands:
-                    # Aplicar filtros
-                    filtered_brands = self.apply_automatic_filters(brands)
-                    
-                    if filtered_brands:
-                        # Verificar exclusividade
-                        exclusive_brand = self.check_exclusivity(filtered_brands, article_id, title)
-                        
-                        if exclusive_brand:
-                            results["exclusive_articles"].append({
-                                "article_id": article_id,
-                                "title": title,
-                                "exclusive_brand": exclusive_brand,
-                                "all_brands": filtered_brands,
-                                "content_preview": content[:200] + "..." if len(content) > 200 else content
-                            })
-                        
-                        # Atualizar frequência de marcas
-                        for brand in filtered_brands:
-                            all_brands_set.add(brand)
-                            if brand in results["all_brands_frequency"]:
-                                results["all_brands_frequency"][brand] += 1
-                            else:
-                                results["all_brands_frequency"][brand] = 1
-                
-                # Adicionar ao cache
-                self.processed_cache.add(content_hash)
-                self.stats["processed_articles"] += 1
+        # Seleciona os artigos (ignorando vazios); apenas os ausentes do cache e não resolvidos
+        # pelo dicionário local vão para a API
+        artigos = []
+        pendentes = []
+        hashes_pendentes = set()
+        resolvidos_localmente: Dict[str, List[str]] = {}
+        for row in df.itertuples(index=False):
+            article_id = str(getattr(row, 'Id'))
+            title = str(getattr(row, 'Titulo', '')).strip()
+            content = str(getattr(row, 'Conteudo', '')).strip()
+            
+            if not title and not content:
+                continue
+            
+            content_hash = self.get_content_hash(title, content)
+            artigos.append((article_id, title, content, content_hash))
+            
+            # Verificar cache (inclui artigos repetidos nesta mesma execução)
+            if content_hash in self.processed_cache or content_hash in hashes_pendentes:
+                self._increment_stat("skipped_cache")
+                continue
+            
+            if content_hash in resolvidos_localmente:
+                continue
+            marcas_locais = self.resolve_locally(title, content)
+            if marcas_locais is not None:
+                resolvidos_localmente[content_hash] = marcas_locais
+                self._increment_stat("gazetteer_articles")
+                continue
+            
+            hashes_pendentes.add(content_hash)
+            pendentes.append((article_id, title, content, content_hash))
+        
+        if resolvidos_localmente:
+            self.logger.info(f"{len(resolvidos_localmente)} artigos resolvidos pelo dicionário local de marcas")
+        self.logger.info(
+            f"{len(pendentes)} artigos para extração ({self.max_workers} threads, "
+            f"até {self.config.deepseek_requisicoes_por_segundo} requisições/s)"
+        )
+        
+        # Extrair marcas com DeepSeek em paralelo
+        marcas_por_artigo: List[Optional[List[str]]] = [None] * len(pendentes)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="brand-extractor") as executor:
+            futures = {
+                executor.submit(self._extract_article, article_id, title, content): posicao
+                for posicao, (article_id, title, content, _) in enumerate(pendentes)
+            }
+            
+            for concluidos, future in enumerate(as_completed(futures), start=1):
+                posicao = futures[future]
+                try:
+                    marcas_por_artigo[posicao] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Erro ao processar artigo {pendentes[posicao][0]}: {e}")
                 
-                # Pausa para não sobrecarregar API
-                time.sleep(0.5)
+                # Adicionar ao cache assim que concluída (falhas serão tentadas novamente);
+                # o log é gravado em disco em lotes, preservando o progresso em caso de interrupção
+                if marcas_por_artigo[posicao] is not None:
+                    content_hash = pendentes[posicao][3]
+                    self.processed_cache[content_hash] = marcas_por_artigo[posicao]
+                    self.cache_log.append(content_hash, marcas_por_artigo[posicao])
+                    self._increment_stat("processed_articles")
                 
                 # Log de progresso
-                if (index + 1) % 10 == 0:
-                    self.logger.info(f"Progresso: {index + 1}/{len(df)} artigos")
-                    
-            except Exception as e:
-                self.logger.error(f"Erro ao processar artigo {article_id}: {e}")
-                continue
-        
-        # Finalizar resultados
-        results["processed_articles"] = self.stats["processed_articles"]
-        results["unique_brands"] = sorted(list(all_brands_set))
-        results["statistics"] = self.stats.copy()
+                notify_progress(progress_callback, 'marcas', 'andamento',
+                                processados=concluidos, total=len(pendentes))
+                if concluidos % 10 == 0:
+                    self.logger.info(f"Progresso: {concluidos}/{len(pendentes)} artigos")
+        
+        self.cache_log.flush()
+        
+        # Incorporar os artigos da execução (novos e do cache) ao estado do mês, na ordem original
+        month_state = BrandMonthState(self.output_dir, month_year)
+        month_state.load()
+        
+        artigos_consolidados = 0
+        artigos_atualizados = 0
+        for article_id, title, content, content_hash in artigos:
+            filtered_brands = self.processed_cache.get(content_hash)
+            if filtered_brands is None:
+                filtered_brands = resolvidos_localmente.get(content_hash)
+            if filtered_brands is None:
+                # Falha na extração: não substitui uma contribuição já registrada no mês
+                if content_hash in month_state:
+                    continue
+            else:
+                artigos_consolidados += 1
+                all_brands_set.update(filtered_brands)
+            
+            exclusive_brand = None
+            if filtered_brands:
+                exclusive_brand = self.check_exclusivity(filtered_brands, article_id, title)
+            
+            contribution = {
+                "article_id": article_id,
+                "title": title,
+                "brands": filtered_brands,
+                "exclusive_brand": exclusive_brand,
+                "content_preview": content[:200] + "..." if len(content) > 200 else content
+            }
+            if month_state.update(content_hash, contribution):
+                artigos_atualizados += 1
         
+        month_state.close()
         self.stats["unique_brands"] = len(all_brands_set)
         
+        results = month_state.to_results(datetime.now().isoformat(), statistics=self.stats.copy())
+        results["run"] = {
+            "total_articles": len(df),
+            "processed_articles": artigos_consolidados,
+            "updated_articles": artigos_atualizados
+        }
+        self.logger.info(
+            f"Mês {month_year}: {artigos_atualizados} artigos novos/atualizados, "
+            f"{results['total_articles']} artigos no total"
+        )
+        
         return results
 
     def save_results(self, results: Dict, month_year: str):
         """
         Salva resultados em arquivos JSON na estrutura do projeto
         
+        Os arquivos do mês são regenerados a partir do estado mensal (results já contém os
+        agregados do mês inteiro, não apenas os artigos da execução)
+        
         Args:
             results: Dicionário com resultados
             month_year: String no formato 'YYYY_MM'
@@ -534,38 +849,65 @@ TEXTO:
             # Carregar dados
             df = self.load_data_from_api()
             
-            # Validar colunas necessárias
-            required_columns = ['Id', 'Titulo', 'Conteudo']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"Colunas obrigatórias ausentes: {missing_columns}")
-            
-            # Processar artigos
-            results = self.process_articles(df, month_year)
-            
-            # Salvar resultados
-            self.save_results(results, month_year)
-            self.save_processed_cache()
-            
-            # Log final
-            self.logger.info("=" * 60)
-            self.logger.info("EXTRAÇÃO DE MARCAS CONCLUÍDA")
-            self.logger.info("=" * 60)
-            self.logger.info(f"Período: {month_year}")
-            self.logger.info(f"Total de artigos: {self.stats['total_articles']}")
-            self.logger.info(f"Processados: {self.stats['processed_articles']}")
-            self.logger.info(f"Pulados (cache): {self.stats['skipped_cache']}")
-            self.logger.info(f"Chamadas API DeepSeek: {self.stats['api_calls']}")
-            self.logger.info(f"Marcas únicas encontradas: {self.stats['unique_brands']}")
-            self.logger.info(f"Artigos exclusivos detectados: {self.stats['exclusive_articles']}")
-            self.logger.info(f"Arquivos gerados em: {self.output_dir}")
-            
-            return results
+            return self.extract_from_dataframe(df, month_year)
             
         except Exception as e:
             self.logger.error(f"Erro durante extração: {e}")
             raise
 
+    def extract_from_dataframe(self, df: pd.DataFrame, month_year: Optional[str] = None,
+                               progress_callback: Optional[ProgressCallback] = None) -> Dict:
+        """
+        Executa a extração sobre um DataFrame já carregado (ex.: final_df da execução do pipeline),
+        sem nova chamada à API de clippings nem leitura de Excel
+        
+        Args:
+            df: DataFrame com as colunas Id, Titulo e Conteudo
+            month_year: String no formato 'YYYY_MM' (opcional, usa mês atual)
+            progress_callback: Callback opcional que recebe o progresso (etapa 'marcas')
+            
+        Returns:
+            Dicionário com resultados da extração
+        """
+        if not month_year:
+            month_year = datetime.now().strftime("%Y_%m")
+        
+        # Validar colunas necessárias
+        required_columns = ['Id', 'Titulo', 'Conteudo']
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"Colunas obrigatórias ausentes: {missing_columns}")
+        
+        # Processar artigos
+        results = self.process_articles(df, month_year, progress_callback=progress_callback)
+        
+        # Salvar resultados
+        self.save_results(results, month_year)
+        self.save_processed_cache()
+        
+        # Log final
+        self.logger.info("=" * 60)
+        self.logger.info("EXTRAÇÃO DE MARCAS CONCLUÍDA")
+        self.logger.info("=" * 60)
+        self.logger.info(f"Período: {month_year}")
+        self.logger.info(f"Total de artigos: {self.stats['total_articles']}")
+        self.logger.info(f"Processados via API: {self.stats['processed_articles']}")
+        self.logger.info(f"Reaproveitados do cache: {self.stats['skipped_cache']}")
+        self.logger.info(f"Resolvidos pelo dicionário local: {self.stats['gazetteer_articles']}")
+        self.logger.info(f"Chamadas API DeepSeek: {self.stats['api_calls']}")
+        if self.stats['content_chars_original']:
+            reducao = 1 - self.stats['content_chars_sent'] / self.stats['content_chars_original']
+            self.logger.info(
+                f"Pré-seleção de trechos: {self.stats['content_chars_original']} → "
+                f"{self.stats['content_chars_sent']} caracteres ({reducao:.0%} menos, "
+                f"~{self.estimated_tokens_saved()} tokens economizados)"
+            )
+        self.logger.info(f"Marcas únicas encontradas: {self.stats['unique_brands']}")
+        self.logger.info(f"Artigos exclusivos detectados: {self.stats['exclusive_articles']}")
+        self.logger.info(f"Arquivos gerados em: {self.output_dir}")
+        
+        return results
+
 def main():
     """Função para execução standalone do brand_extractor"""
     
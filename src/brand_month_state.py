@@ -0,0 +1,265 @@
+"""
+Estado mensal da extração de marcas
+Agregados do mês (frequências, totais e artigos exclusivos) mantidos como contribuições por
+artigo, indexadas pelo hash do conteúdo, em um log append-only, e como um snapshot dos
+agregados que registra até onde o log já foi incorporado. Cada execução lê o snapshot e
+apenas o final do log gravado depois dele, e aplica as diferenças dos seus artigos; os
+arquivos JSON do mês são regenerados a partir do estado completo.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.utils.jsonl_cache import JsonlCache
+
+# Prefixo das entradas vindas de um brands_month_{YYYY_MM}.json gerado sem estado mensal
+# (sem hash do conteúdo: identificadas pelo article_id)
+PREFIXO_LEGADO = 'legado:'
+
+
+def _digest(article: Dict) -> str:
+    """Resumo da contribuição (detecta reprocessamentos que não mudam nada)"""
+    conteudo = json.dumps(article, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()[:16]
+
+
+class BrandMonthState:
+    """
+    Contribuições dos artigos de um mês e agregados (frequências, totais, exclusivos)
+
+    Contribuição de um artigo: article_id, title, brands (None se a extração falhou),
+    exclusive_brand e content_preview. Reprocessar um artigo substitui a contribuição
+    anterior (os agregados são ajustados pela diferença), de forma que execuções repetidas
+    ou sobrepostas não contam o mesmo artigo duas vezes.
+
+    - .brands_state_{YYYY_MM}.jsonl: log append-only das contribuições
+    - .brands_state_{YYYY_MM}.snapshot.json: agregados, índice compacto por hash (marcas e
+      resumo da contribuição) e a posição do log já incorporada; gravado em close()
+
+    Sem snapshot, o log é lido inteiro uma única vez (estado anterior ao snapshot). Sem log
+    nem snapshot, um brands_month_{YYYY_MM}.json existente semeia os agregados do mês.
+    """
+
+    def __init__(self, output_dir: Path, month_year: str):
+        self.month_year = month_year
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / f".brands_state_{month_year}.jsonl"
+        self.snapshot_path = self.output_dir / f".brands_state_{month_year}.snapshot.json"
+        self._log = JsonlCache(self.path, key_field='hash', value_field='article')
+        self._reset()
+
+    def _reset(self):
+        # {hash: {'brands': [...] | None, 'digest': ...}}
+        self.index: Dict[str, Dict] = {}
+        # {hash: artigo exclusivo no formato de exclusive_articles}, na ordem de entrada
+        self.exclusives: Dict[str, Dict] = {}
+        self.brands_frequency: Dict[str, int] = {}
+        self.processed_articles = 0
+        # Artigos do brands_month semeado que não são identificáveis individualmente
+        self.legacy_articles = 0
+        self.legacy_processed = 0
+        self._legacy_ids: Dict[str, str] = {}
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.index
+
+    @property
+    def total_articles(self) -> int:
+        return len(self.index) + self.legacy_articles
+
+    def load(self):
+        """Carrega o snapshot e incorpora as contribuições gravadas no log depois dele"""
+        self._reset()
+        posicao = self._load_snapshot()
+        tamanho_log = self.path.stat().st_size if self.path.exists() else 0
+
+        if posicao is None:
+            posicao = 0
+            if not tamanho_log:
+                self._seed_from_month_file()
+        elif posicao > tamanho_log:
+            self.logger.warning(f"Log do estado do mês {self.month_year} menor que o registrado no "
+                                f"snapshot; agregados recalculados a partir do log")
+            self._reset()
+            posicao = 0
+
+        incorporadas = self._apply_log_tail(posicao)
+        if self.total_articles:
+            self.logger.info(f"Estado do mês {self.month_year}: {self.total_articles} artigos já agregados "
+                             f"({incorporadas} contribuições lidas do log)")
+
+    def _load_snapshot(self) -> Optional[int]:
+        """Agregados do snapshot; retorna a posição do log já incorporada (None sem snapshot)"""
+        if not self.snapshot_path.exists():
+            return None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.index = snapshot['index']
+            self.exclusives = snapshot['exclusives']
+            self.brands_frequency = snapshot['brands_frequency']
+            self.processed_articles = snapshot['processed_articles']
+            self.legacy_articles = snapshot.get('legacy_articles', 0)
+            self.legacy_processed = snapshot.get('legacy_processed', 0)
+            self._legacy_ids = {chave[len(PREFIXO_LEGADO):]: chave for chave in self.index
+                                if chave.startswith(PREFIXO_LEGADO)}
+            return snapshot['log_offset']
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Snapshot {self.snapshot_path.name} inválido ({e}); "
+                                f"agregados recalculados a partir do log")
+            self._reset()
+            return None
+
+    def _apply_log_tail(self, posicao: int) -> int:
+        """
+        Aplica as contribuições gravadas a partir de `posicao` (em bytes)
+
+        Uma linha final incompleta, deixada por uma interrupção no meio da gravação, é
+        descartada do arquivo para que a próxima gravação comece em uma linha nova
+        """
+        if not self.path.exists():
+            return 0
+        aplicadas = 0
+        with open(self.path, 'rb+') as f:
+            f.seek(posicao)
+            for linha in f:
+                if not linha.endswith(b'\n'):
+                    f.truncate(f.tell() - len(linha))
+                    break
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                    self._apply(registro['hash'], registro['article'])
+                    aplicadas += 1
+                except (ValueError, KeyError, TypeError):
+                    self.logger.warning(f"Linha inválida ignorada em {self.path.name}")
+        return aplicadas
+
+    def _seed_from_month_file(self):
+        """Semeia os agregados com um brands_month_{YYYY_MM}.json gerado sem estado mensal"""
+        arquivo = self.output_dir / f"brands_month_{self.month_year}.json"
+        if not arquivo.exists():
+            return
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                resultados = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Não foi possível ler {arquivo.name} para semear o estado do mês: {e}")
+            return
+
+        self.brands_frequency = {marca: quantidade for marca, quantidade
+                                 in (resultados.get('all_brands_frequency') or {}).items() if quantidade > 0}
+        for artigo in resultados.get('exclusive_articles') or []:
+            chave = f"{PREFIXO_LEGADO}{artigo['article_id']}"
+            self.index[chave] = {'brands': artigo.get('all_brands'), 'digest': None}
+            self.exclusives[chave] = artigo
+            self._legacy_ids[str(artigo['article_id'])] = chave
+        self.processed_articles = sum(1 for entrada in self.index.values() if entrada['brands'] is not None)
+        self.legacy_articles = max(resultados.get('total_articles', 0) - len(self.index), 0)
+        self.legacy_processed = max(resultados.get('processed_articles', 0) - self.processed_articles, 0)
+        self.logger.warning(
+            f"{arquivo.name} foi gerado sem estado mensal: agregados do mês semeados a partir dele "
+            f"({self.total_articles} artigos); apenas os artigos exclusivos são identificáveis para "
+            f"substituição em reprocessamentos"
+        )
+
+    def update(self, content_hash: str, article: Dict) -> bool:
+        """
+        Registra (ou substitui) a contribuição de um artigo
+
+        Returns:
+            True se o estado mudou
+        """
+        if not self._apply(content_hash, article):
+            return False
+        self._log.append(content_hash, article)
+        return True
+
+    def _apply(self, content_hash: str, article: Dict) -> bool:
+        """Ajusta os agregados pela diferença entre a contribuição anterior e a nova"""
+        digest = _digest(article)
+        anterior = self.index.get(content_hash)
+        if anterior is not None and anterior['digest'] == digest:
+            return False
+        if anterior is not None:
+            self._remove(content_hash)
+        else:
+            chave_legado = self._legacy_ids.pop(str(article.get('article_id')), None)
+            if chave_legado is not None:
+                self._remove(chave_legado)
+
+        self.index[content_hash] = {'brands': article.get('brands'), 'digest': digest}
+        self._count(article.get('brands'), 1)
+        if article.get('brands') is not None:
+            self.processed_articles += 1
+        if article.get('exclusive_brand'):
+            self.exclusives[content_hash] = {
+                "article_id": article['article_id'],
+                "title": article['title'],
+                "exclusive_brand": article['exclusive_brand'],
+                "all_brands": article['brands'],
+                "content_preview": article['content_preview']
+            }
+        else:
+            self.exclusives.pop(content_hash, None)
+        return True
+
+    def _remove(self, chave: str):
+        entrada = self.index.pop(chave)
+        self._count(entrada['brands'], -1)
+        if entrada['brands'] is not None:
+            self.processed_articles -= 1
+        if chave.startswith(PREFIXO_LEGADO):
+            self.exclusives.pop(chave, None)
+
+    def _count(self, brands: Optional[List[str]], sinal: int):
+        for brand in brands or []:
+            quantidade = self.brands_frequency.get(brand, 0) + sinal
+            if quantidade > 0:
+                self.brands_frequency[brand] = quantidade
+            else:
+                self.brands_frequency.pop(brand, None)
+
+    def exclusive_articles(self) -> List[Dict]:
+        """Artigos exclusivos do mês, na ordem em que entraram no estado"""
+        return list(self.exclusives.values())
+
+    def to_results(self, extraction_date: str, statistics: Optional[Dict] = None) -> Dict:
+        """Resultados do mês no formato de brands_month_{YYYY_MM}.json"""
+        return {
+            "month_year": self.month_year,
+            "extraction_date": extraction_date,
+            "total_articles": self.total_articles,
+            "processed_articles": self.processed_articles + self.legacy_processed,
+            "exclusive_articles": self.exclusive_articles(),
+            "all_brands_frequency": dict(self.brands_frequency),
+            "unique_brands": sorted(self.brands_frequency),
+            "statistics": statistics or {}
+        }
+
+    def close(self):
+        """Grava as contribuições pendentes e o snapshot dos agregados (troca atômica)"""
+        # Sem compactação: o JsonlCache conhece apenas as contribuições desta execução
+        self._log.close(compact=False)
+        snapshot = {
+            'month_year': self.month_year,
+            'log_offset': self.path.stat().st_size if self.path.exists() else 0,
+            'brands_frequency': self.brands_frequency,
+            'processed_articles': self.processed_articles,
+            'legacy_articles': self.legacy_articles,
+            'legacy_processed': self.legacy_processed,
+            'index': self.index,
+            'exclusives': self.exclusives
+        }
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.snapshot_path)
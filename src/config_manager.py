@@ -5,9 +5,17 @@ Centraliza todas as configurações e variáveis globais do sistema
 
 import os
 import json
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+def env_flag(nome: str, padrao: bool = False) -> bool:
+    """Lê uma variável de ambiente booleana (1/true/sim/yes)"""
+    valor = os.getenv(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'sim', 'yes')
+
 class ConfigManager:
     def __init__(self):
         self.base_path = Path(__file__).parent.parent
@@ -15,6 +23,7 @@ class ConfigManager:
         self._setup_variables()
         self._load_api_key()
         self._load_channel_mappings()
+        self.new_run_id()
     
     def _setup_paths(self):
         """Define todos os caminhos de diretórios"""
@@ -23,9 +32,11 @@ class ConfigManager:
         self.pasta_marca_setor = self.base_path / "dados" / "marca_setor"
         self.pasta_config = self.base_path / "config"
         self.pasta_logs = self.base_path / "logs"
+        self.pasta_downloads = self.base_path / "downloads"
         
         # Arquivos de configuração
-        self.config_file = self.pasta_config / "api_marca_configs.json"
+        # API_CONFIG_FILE: configurações da API alternativas (ex.: páginas do servidor de teste)
+        self.config_file = Path(os.getenv('API_CONFIG_FILE') or self.pasta_config / "api_marca_configs.json")
         self.arq_protagonismo = self.pasta_config / "nivel_protagonismo_claude_bradesco.xlsx"
         
         # Arquivos de dados da API
@@ -50,6 +61,12 @@ class ConfigManager:
         
         self.lote_final_limpo = "Tabela_atualizacao_em_lote_limpo.xlsx"
         self.arq_lote_final_limpo = self.pasta_marca_setor / self.lote_final_limpo
+        
+        # Catálogo de artefatos gerados (índice SQLite dos arquivos com timestamp)
+        self.arq_catalogo = self.base_path / "dados" / "catalogo_artefatos.db"
+        
+        # Trava que garante um único processamento por vez (entre processos)
+        self.arq_trava_pipeline = self.base_path / "dados" / ".pipeline.lock"
     
     def _setup_variables(self):
         """Define variáveis globais do sistema"""
@@ -58,7 +75,10 @@ class ConfigManager:
         self.w_marcas = ['Bradesco', 'Itaú', 'Santander', 'Ágora', 'Bradesco Asset', 'BBI']
         
         # Configurações da API DeepSeek
-        self.api_url = "https://api.deepseek.com/v1/chat/completions"
+        # DEEPSEEK_API_URL: endpoint compatível com OpenAI alternativo (ex.: servidor de teste local)
+        self.api_url = os.getenv('DEEPSEEK_API_URL') or "https://api.deepseek.com/v1/chat/completions"
+        # CLIPPINGS_API_URL: substitui a URL de todas as configurações da API de Clippings
+        self.clippings_api_url = os.getenv('CLIPPINGS_API_URL') or None
         
         # Colunas de interesse para o arquivo final
         self.colunas_interesse = [
@@ -80,6 +100,70 @@ class ConfigManager:
             'Bradesco Asset_nivel_protagonismo': 'Nivel de Protagonismo Bradesco Asset',
             'BBI_nivel_protagonismo': 'Nivel de Protagonismo BBI'
         }
+        
+        # Política de retenção dos arquivos com timestamp (por execução)
+        # - mantém intactos os arquivos das últimas N execuções
+        # - compacta (gzip) os arquivos das execuções seguintes
+        # - remove execuções além de N + M (0 = nunca remove)
+        self.retencao_execucoes = int(os.getenv('RETENCAO_EXECUCOES', '10'))
+        self.retencao_execucoes_compactadas = int(os.getenv('RETENCAO_EXECUCOES_COMPACTADAS', '30'))
+        
+        # Chamadas concorrentes à DeepSeek
+        # - DEEPSEEK_MAX_WORKERS: requisições simultâneas (threads)
+        # - DEEPSEEK_REQUISICOES_POR_SEGUNDO: limite de taxa compartilhado entre as threads
+        self.deepseek_max_workers = max(1, int(os.getenv('DEEPSEEK_MAX_WORKERS', '4')))
+        self.deepseek_requisicoes_por_segundo = float(os.getenv('DEEPSEEK_REQUISICOES_POR_SEGUNDO', '2'))
+        # Timeouts por requisição (segundos): conexão e leitura (intervalo máximo sem receber dados)
+        self.deepseek_timeout_conexao = float(os.getenv('DEEPSEEK_TIMEOUT_CONEXAO', '10'))
+        self.deepseek_timeout_leitura = float(os.getenv('DEEPSEEK_TIMEOUT_LEITURA', '60'))
+        # Requisições duplicadas (hedge): sem resposta após o percentil DEEPSEEK_HEDGE_PERCENTIL das
+        # latências observadas, uma cópia da requisição é enviada e vale a primeira resposta
+        # - DEEPSEEK_HEDGE_PERCENTIL: 0 = desativado (ex.: 95)
+        # - DEEPSEEK_HEDGE_MAX_FRACAO: máximo de duplicadas em relação às chamadas (limita o gasto extra)
+        # - DEEPSEEK_HEDGE_MIN_AMOSTRAS: latências observadas antes de duplicar
+        self.deepseek_hedge_percentil = float(os.getenv('DEEPSEEK_HEDGE_PERCENTIL', '0'))
+        self.deepseek_hedge_max_fracao = float(os.getenv('DEEPSEEK_HEDGE_MAX_FRACAO', '0.05'))
+        self.deepseek_hedge_min_amostras = max(1, int(os.getenv('DEEPSEEK_HEDGE_MIN_AMOSTRAS', '20')))
+        # Repetição, ao final da análise, das chamadas com falha transitória (timeout, conexão, 429, 5xx)
+        # - DEEPSEEK_REPETICOES: rodadas de repetição (0 = desativada)
+        # - DEEPSEEK_REPETICAO_ESPERA_S / _MAX_S: espera exponencial entre rodadas (base e máximo)
+        self.deepseek_repeticoes = max(0, int(os.getenv('DEEPSEEK_REPETICOES', '3')))
+        self.deepseek_repeticao_espera_s = float(os.getenv('DEEPSEEK_REPETICAO_ESPERA_S', '2'))
+        self.deepseek_repeticao_espera_max_s = float(os.getenv('DEEPSEEK_REPETICAO_ESPERA_MAX_S', '30'))
+        # Classificação do nível por marca: resposta curta ("Nível N"/"Nenhum Nível Encontrado")
+        # - PROTAGONISMO_MAX_TOKENS: limite de tokens da resposta (0 = sem limite)
+        # - DEEPSEEK_STREAM: resposta em stream, encerrada assim que o nível é reconhecido
+        self.protagonismo_max_tokens = max(0, int(os.getenv('PROTAGONISMO_MAX_TOKENS', '16')))
+        self.deepseek_stream = env_flag('DEEPSEEK_STREAM')
+        
+        # Extração de marcas como etapa opcional do pipeline (em paralelo com o protagonismo)
+        self.extrair_marcas = env_flag('EXTRAIR_MARCAS')
+        # Com a extração ativa: uma única chamada por notícia para marcas + protagonismo
+        self.analise_combinada = env_flag('ANALISE_COMBINADA')
+        # Dicionário local de marcas (frequências anteriores) antes da chamada à DeepSeek
+        self.gazetteer_marcas = env_flag('GAZETTEER_MARCAS', True)
+        # Caracteres do conteúdo enviados na extração de marcas (frases com candidatas a marca; 0 = tudo)
+        self.marcas_max_caracteres = max(0, int(os.getenv('MARCAS_MAX_CARACTERES', '4000')))
+        
+        # Perfil de desempenho das execuções (relatório run_report_{run_id}.json sempre gravado)
+        # - PERFIL_EXECUCAO: captura detalhada opcional (cprofile ou pyinstrument)
+        # - PERFIL_TRACEMALLOC: pico de memória alocada por etapa (tracemalloc, com custo extra)
+        self.perfil_execucao = os.getenv('PERFIL_EXECUCAO', '').strip().lower()
+        self.perfil_tracemalloc = env_flag('PERFIL_TRACEMALLOC')
+        # Rastro por notícia da análise de protagonismo (article_traces_{run_id}.jsonl)
+        self.trace_noticias = env_flag('TRACE_NOTICIAS', True)
+        # Orçamento da análise de protagonismo (0/vazio = sem limite)
+        # - PROTAGONISMO_PRAZO: horário limite para chamadas à DeepSeek ("HH:MM" de hoje ou data/hora ISO)
+        # - PROTAGONISMO_MAX_CHAMADAS: máximo de chamadas à DeepSeek
+        # Esgotado o orçamento, os pares notícia/marca restantes recebem o nível por regra
+        self.protagonismo_prazo = os.getenv('PROTAGONISMO_PRAZO', '').strip()
+        self.protagonismo_max_chamadas = max(0, int(os.getenv('PROTAGONISMO_MAX_CHAMADAS', '0')))
+        # Preços da DeepSeek (USD por milhão de tokens) para o custo estimado no relatório da execução
+        self.deepseek_precos = {
+            'entrada': float(os.getenv('DEEPSEEK_PRECO_ENTRADA', '0.28')),
+            'entrada_cache': float(os.getenv('DEEPSEEK_PRECO_ENTRADA_CACHE', '0.028')),
+            'saida': float(os.getenv('DEEPSEEK_PRECO_SAIDA', '0.42'))
+        }
     
     def _load_api_key(self):
         """Carrega a chave da API de forma segura"""
@@ -125,6 +209,11 @@ class ConfigManager:
             self.get_specific_content_terms = lambda: {}
             self.check_specific_content_requirements = lambda x, y: {'found_specific_terms': [], 'should_be_minimum_citation': False}
     
+    def new_run_id(self) -> str:
+        """Gera um novo identificador de execução (usado no catálogo de artefatos)"""
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return self.run_id
+    
     def get_api_headers(self) -> Dict[str, str]:
         """Retorna os headers para a API"""
         return {
@@ -138,7 +227,11 @@ class ConfigManager:
             raise FileNotFoundError(f"Arquivo de configuração não encontrado: {self.config_file}")
         
         with open(self.config_file, "r", encoding='utf-8') as f:
-            return json.load(f)
+            configs = json.load(f)
+        
+        if self.clippings_api_url:
+            configs = [{**config, 'url': self.clippings_api_url} for config in configs]
+        return configs
     
     def get_paths_dict(self) -> Dict[str, Path]:
         """Retorna um dicionário com todos os caminhos"""
@@ -153,5 +246,7 @@ class ConfigManager:
             'arq_consolidado': self.arq_consolidado,
             'arq_lote': self.arq_lote,
             'arq_lote_final': self.arq_lote_final,
-            'arq_lote_final_limpo': self.arq_lote_final_limpo
+            'arq_lote_final_limpo': self.arq_lote_final_limpo,
+            'pasta_downloads': self.pasta_downloads,
+            'arq_catalogo': self.arq_catalogo
         }
\ No newline at end of file
@@ -7,6 +7,7 @@ import pandas as pd
 import logging
 from typing import List, Dict
 from src.config_manager import ConfigManager
+from src.run_profiler import profile_section
 
 class DataConsolidator:
     def __init__(self, config_manager: ConfigManager):
@@ -257,7 +258,8 @@ class DataConsolidator:
             self.logger.info(f"Colunas: {list(final_df_consolidado.columns)}")
             
             # Salva usando o caminho correto do ConfigManager
-            final_df_consolidado.to_excel(self.config.arq_consolidado, index=False)
+            with profile_section('xlsx.consolidacao'):
+                final_df_consolidado.to_excel(self.config.arq_consolidado, index=False)
             self.logger.info(f"Dados consolidados salvos: {self.config.arq_consolidado}")
             
             # Cria também uma cópia na pasta downloads para facilitar acesso
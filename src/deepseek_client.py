@@ -0,0 +1,296 @@
+"""
+Cliente da API DeepSeek compartilhado entre as etapas do pipeline
+Concentra sessão HTTP, limite de requisições simultâneas e limite de taxa, de forma que
+análise de protagonismo e extração de marcas dividam o mesmo orçamento de chamadas.
+Cada requisição tem timeouts de conexão e leitura; opcionalmente, requisições lentas são
+duplicadas (hedge) para cortar a cauda de latência. Respostas em stream podem ser encerradas
+assim que o conteúdo recebido já basta.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config_manager import ConfigManager
+from src.utils.rate_limiter import RateLimiter
+from src.utils.logging_setup import CALLS_LOGGER_NAME
+from src.run_profiler import profile_section, add_section_time
+from src.article_tracer import record_call
+
+# Stream encerrado antes do bloco 'usage': tokens estimados localmente, contabilizados à parte
+# dos informados pela API (prompt pelos caracteres das mensagens, completion pelos blocos recebidos)
+CARACTERES_POR_TOKEN = 4
+TOKENS_ESTIMADOS = ('prompt_tokens_estimados', 'completion_tokens_estimados')
+
+
+def estimate_tokens(texto: str) -> int:
+    """Estimativa de tokens de um texto (sem o tokenizador do modelo)"""
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+class DeepSeekClient:
+    def __init__(self, config_manager: ConfigManager):
+        self.config = config_manager
+        self.logger = logging.getLogger(__name__)
+        # Registro estruturado por chamada (deepseek_calls.jsonl, se LOG_CHAMADAS_DEEPSEEK)
+        self.calls_logger = logging.getLogger(CALLS_LOGGER_NAME)
+        self.headers = config_manager.get_api_headers()
+
+        # Orçamento compartilhado: requisições simultâneas + requisições por segundo
+        self.max_concurrent = config_manager.deepseek_max_workers
+        self._semaforo = threading.BoundedSemaphore(self.max_concurrent)
+        self.rate_limiter = RateLimiter(config_manager.deepseek_requisicoes_por_segundo)
+
+        # Sessão HTTP com conexões suficientes para todas as requisições simultâneas
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.timeout = (config_manager.deepseek_timeout_conexao, config_manager.deepseek_timeout_leitura)
+
+        # Hedge: latências recentes (s) das requisições bem-sucedidas definem o tempo de espera
+        self.hedge_percentil = config_manager.deepseek_hedge_percentil
+        self.hedge_max_fracao = config_manager.deepseek_hedge_max_fracao
+        self.hedge_min_amostras = config_manager.deepseek_hedge_min_amostras
+        self._latencias = deque(maxlen=500)
+        self._hedge_executor = None
+        if self.hedge_percentil > 0:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=2 * self.max_concurrent,
+                                                      thread_name_prefix="deepseek_hedge")
+
+        self.stats = {'chamadas': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0,
+                      'prompt_tokens_estimados': 0, 'completion_tokens_estimados': 0,
+                      'timeouts': 0, 'hedges': 0, 'hedges_vencedores': 0, 'streams_interrompidos': 0}
+        self._stats_lock = threading.Lock()
+
+    def _send(self, payload: Dict) -> requests.Response:
+        """Uma requisição HTTP (com timeouts); a latência das bem-sucedidas alimenta o hedge"""
+        inicio = time.monotonic()
+        with profile_section('deepseek.requisicao'):
+            response = self.session.post(self.config.api_url, headers=self.headers, json=payload,
+                                         timeout=self.timeout, stream=bool(payload.get('stream')))
+        if response.ok:
+            with self._stats_lock:
+                self._latencias.append(time.monotonic() - inicio)
+        return response
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Espera antes de duplicar a requisição (percentil das latências) ou None se não há hedge"""
+        if self._hedge_executor is None:
+            return None
+        with self._stats_lock:
+            if len(self._latencias) < self.hedge_min_amostras:
+                return None
+            latencias = sorted(self._latencias)
+        return latencias[max(0, math.ceil(self.hedge_percentil / 100 * len(latencias)) - 1)]
+
+    def _reserve_hedge(self) -> bool:
+        """Contabiliza uma requisição duplicada, se ainda couber no limite"""
+        with self._stats_lock:
+            if self.stats['hedges'] >= self.hedge_max_fracao * max(self.stats['chamadas'], 1):
+                return False
+            self.stats['hedges'] += 1
+            return True
+
+    def _discard_response(self, futuro):
+        """Resposta perdedora do hedge: os tokens consumidos entram nas estatísticas"""
+        try:
+            response = futuro.result()
+        except Exception:
+            return
+        try:
+            # Em stream, a conexão é fechada antes da geração terminar (uso não informado)
+            if response.ok and not response.headers.get('Content-Type', '').startswith('text/event-stream'):
+                usage = response.json().get('usage') or {}
+                with self._stats_lock:
+                    self.stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+                    self.stats['completion_tokens'] += usage.get('completion_tokens', 0)
+                    self.stats['cached_tokens'] += usage.get('prompt_cache_hit_tokens', 0)
+        except Exception:
+            pass
+        finally:
+            response.close()
+
+    def _post(self, payload: Dict) -> requests.Response:
+        """
+        Envia a requisição, duplicando-a se não houver resposta no tempo do percentil configurado
+
+        Vale a primeira resposta bem-sucedida; se as duas falharem, prevalece a última falha
+        """
+        espera_hedge = self._hedge_delay()
+        if espera_hedge is None:
+            return self._send(payload)
+
+        primaria = self._hedge_executor.submit(self._send, payload)
+        try:
+            return primaria.result(timeout=espera_hedge)
+        except FuturesTimeoutError:
+            pass
+        if not self._reserve_hedge():
+            return primaria.result()
+
+        self.rate_limiter.acquire()
+        duplicada = self._hedge_executor.submit(self._send, payload)
+        pendentes = {primaria, duplicada}
+        falha = None
+        while pendentes:
+            concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidas:
+                try:
+                    response = futuro.result()
+                except requests.exceptions.RequestException as e:
+                    falha = e
+                    continue
+                if not response.ok:
+                    falha = response
+                    continue
+                for perdedor in pendentes:
+                    perdedor.add_done_callback(self._discard_response)
+                if futuro is duplicada:
+                    with self._stats_lock:
+                        self.stats['hedges_vencedores'] += 1
+                return response
+        if isinstance(falha, requests.Response):
+            return falha
+        raise falha
+
+    def _read_stream(self, response: requests.Response,
+                     encerrar_quando: Optional[Callable[[str], object]] = None) -> tuple:
+        """
+        Lê uma resposta em stream (server-sent events) e fecha a conexão
+
+        Args:
+            encerrar_quando: Recebe o conteúdo acumulado; satisfeita a condição, a conexão é
+                             fechada imediatamente (os tokens restantes deixam de ser gerados)
+
+        Returns:
+            Tupla (conteúdo, usage, interrompido). Um stream interrompido não recebe o bloco
+            'usage': completion_tokens_estimados é a quantidade de blocos recebidos
+        """
+        partes = []
+        usage = {}
+        try:
+            for linha in response.iter_lines():
+                if not linha.startswith(b'data:'):
+                    continue
+                dados = linha[5:].strip()
+                if dados == b'[DONE]':
+                    break
+                evento = json.loads(dados)
+                usage = evento.get('usage') or usage
+                for escolha in evento.get('choices') or []:
+                    conteudo = (escolha.get('delta') or {}).get('content')
+                    if not conteudo:
+                        continue
+                    partes.append(conteudo)
+                    if encerrar_quando is not None and encerrar_quando(''.join(partes)):
+                        # Conteúdo suficiente: encerra sem esperar o restante da geração
+                        return ''.join(partes), {'completion_tokens_estimados': len(partes)}, True
+        finally:
+            response.close()
+        return ''.join(partes), usage, False
+
+    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.1,
+             model: str = "deepseek-chat", contexto: Optional[Dict] = None,
+             encerrar_quando: Optional[Callable[[str], object]] = None, **params) -> Dict:
+        """
+        Envia uma conversa para o endpoint de chat completions
+
+        Aguarda uma vaga no orçamento de requisições simultâneas e no limite de taxa.
+        Erros HTTP/rede são propagados (requests.exceptions.RequestException) para que
+        cada etapa mantenha o seu tratamento de erro.
+
+        Args:
+            messages: Mensagens no formato [{"role": ..., "content": ...}]
+            temperature: Temperatura da geração
+            model: Modelo utilizado
+            contexto: Campos incluídos no registro estruturado da chamada (etapa, notícia, marca)
+            encerrar_quando: Com stream=True, fecha a conexão assim que o conteúdo acumulado
+                             satisfaz a condição (ex.: resposta já contém um valor válido);
+                             os tokens da chamada vão para prompt/completion_tokens_estimados
+            **params: Parâmetros adicionais do payload (max_tokens, stop, stream...)
+
+        Returns:
+            Dicionário com 'content' (texto da resposta) e 'usage' (tokens consumidos)
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            **params
+        }
+        if payload.get('stream'):
+            # Uso de tokens no último bloco do stream
+            payload.setdefault('stream_options', {'include_usage': True})
+
+        campos = dict(contexto or {})
+        campos['modelo'] = model
+        inicio = time.monotonic()
+        try:
+            # Espera por vaga no orçamento (requisições simultâneas + limite de taxa)
+            with self._semaforo:
+                self.rate_limiter.acquire()
+                espera = time.monotonic() - inicio
+                response = self._post(payload)
+            campos['espera_s'] = round(espera, 3)
+            add_section_time('deepseek.espera', espera)
+            campos['http_status'] = response.status_code
+
+            response.raise_for_status()
+            if payload.get('stream'):
+                with profile_section('deepseek.stream'):
+                    content, usage, interrompido = self._read_stream(response, encerrar_quando)
+                content = content.strip()
+                campos['stream_interrompido'] = interrompido
+                if interrompido:
+                    usage['prompt_tokens_estimados'] = sum(
+                        estimate_tokens(mensagem.get('content') or '') for mensagem in messages
+                    )
+            else:
+                result = response.json()
+                content = result['choices'][0]['message']['content'].strip()
+                usage = result.get('usage') or {}
+        except Exception as e:
+            if isinstance(e, requests.exceptions.Timeout):
+                with self._stats_lock:
+                    self.stats['timeouts'] += 1
+            campos.update(status='erro', erro=str(e), duracao_s=round(time.monotonic() - inicio, 3))
+            record_call(campos)
+            if self.calls_logger.isEnabledFor(logging.INFO):
+                self.calls_logger.info("chamada", extra={'campos': campos})
+            raise
+
+        with self._stats_lock:
+            self.stats['chamadas'] += 1
+            self.stats['streams_interrompidos'] += bool(campos.get('stream_interrompido'))
+            self.stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+            self.stats['completion_tokens'] += usage.get('completion_tokens', 0)
+            self.stats['cached_tokens'] += usage.get('prompt_cache_hit_tokens', 0)
+            for nome in TOKENS_ESTIMADOS:
+                self.stats[nome] += usage.get(nome, 0)
+
+        campos.update(
+            status='ok',
+            duracao_s=round(time.monotonic() - inicio, 3),
+            prompt_tokens=usage.get('prompt_tokens', 0),
+            completion_tokens=usage.get('completion_tokens', 0),
+            cached_tokens=usage.get('prompt_cache_hit_tokens', 0)
+        )
+        campos.update({nome: usage[nome] for nome in TOKENS_ESTIMADOS if nome in usage})
+        # Rastro da notícia em análise nesta thread (sem o texto da resposta)
+        record_call(dict(campos))
+        if self.calls_logger.isEnabledFor(logging.INFO):
+            campos['resposta'] = content[:500]
+            self.calls_logger.info("chamada", extra={'campos': campos})
+
+        return {'content': content, 'usage': usage}
@@ -0,0 +1,220 @@
+"""
+Execução do pipeline em segundo plano
+Os processamentos entram em uma fila única do processo e são executados um de cada vez
+por uma thread trabalhadora, independente das execuções do script Streamlit; a interface
+apenas consulta o estado publicado. Pedidos idênticos a um job na fila ou em execução
+são anexados a ele (single-flight) em vez de iniciar um novo processamento.
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from src.utils.progress import ProgressCallback
+
+# Status possíveis de um job
+STATUS_NA_FILA = "na_fila"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+
+class PipelineJob:
+    """Estado de um processamento em segundo plano (atualizado pelo callback de progresso)"""
+
+    def __init__(self, job_id: str, chave: Optional[str] = None):
+        self.job_id = job_id
+        self.chave = chave
+        self.status = STATUS_NA_FILA
+        self.criado_em = time.time()
+        self.inicio = self.criado_em
+        self.anexos = 0
+        self.fim: Optional[float] = None
+        self.etapa: Optional[str] = None
+        self.inicio_etapas: Dict[str, float] = {}
+        self.etapas: Dict[str, Dict] = {}
+        self.resultado: Optional[str] = None
+        self.erro: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def update_progress(self, evento: Dict):
+        """
+        Callback de progresso: registra o último evento de cada etapa
+
+        Etapas podem rodar em paralelo (ex.: extração de marcas junto com o protagonismo);
+        cada uma guarda o seu horário de início, e a etapa corrente é a última iniciada
+        """
+        with self._lock:
+            etapa = evento.get('etapa')
+            if evento.get('status') == 'iniciada' or etapa not in self.inicio_etapas:
+                self.inicio_etapas[etapa] = time.time()
+                self.etapa = etapa
+            self.etapas[etapa] = dict(evento)
+
+    def start(self):
+        """Marca o início efetivo da execução (saída da fila)"""
+        with self._lock:
+            self.status = STATUS_EXECUTANDO
+            self.inicio = time.time()
+
+    def attach(self):
+        """Registra um pedido idêntico anexado a este job"""
+        with self._lock:
+            self.anexos += 1
+
+    def finish(self, resultado: Optional[str] = None, erro: Optional[str] = None):
+        """Marca o job como finalizado"""
+        with self._lock:
+            self.resultado = resultado
+            self.erro = erro
+            self.status = STATUS_ERRO if erro else STATUS_CONCLUIDO
+            self.fim = time.time()
+
+    @property
+    def ativo(self) -> bool:
+        return self.status in (STATUS_NA_FILA, STATUS_EXECUTANDO)
+
+    def snapshot(self) -> Dict:
+        """
+        Retorna uma cópia do estado atual (leitura barata para a interface)
+
+        Inclui a estimativa de término (ETA, em segundos) de cada etapa em andamento,
+        calculada pela taxa de itens processados desde o início da etapa
+        """
+        with self._lock:
+            etapa_atual = dict(self.etapas.get(self.etapa, {})) if self.etapa else {}
+            eta_etapas = {}
+            if self.status == STATUS_EXECUTANDO:
+                agora = time.time()
+                for nome, evento in self.etapas.items():
+                    processados = evento.get('processados')
+                    total = evento.get('total')
+                    if evento.get('status') == 'andamento' and processados and total:
+                        decorrido = agora - self.inicio_etapas[nome]
+                        eta_etapas[nome] = decorrido / processados * (total - processados)
+
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'anexos': self.anexos,
+                'etapa': self.etapa,
+                'progresso': etapa_atual,
+                'etapas': {nome: dict(evento) for nome, evento in self.etapas.items()},
+                'eta_segundos': max(eta_etapas.values()) if eta_etapas else None,
+                'eta_etapas': eta_etapas,
+                'decorrido_segundos': (self.fim or time.time()) - self.inicio,
+                'resultado': self.resultado,
+                'erro': self.erro
+            }
+
+
+class JobRunner:
+    """
+    Fila de jobs do processo (compartilhada entre sessões e execuções do Streamlit)
+
+    Os jobs são executados sequencialmente por uma única thread trabalhadora. O dicionário
+    `cache` é repassado a todos os jobs, permitindo que execuções seguintes reaproveitem
+    objetos já inicializados pela anterior (configurações, porta-vozes, sessões HTTP).
+    """
+
+    # Quantidade de jobs finalizados mantidos para consulta
+    MAX_JOBS_FINALIZADOS = 20
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._jobs: Dict[str, PipelineJob] = {}
+        self._lock = threading.Lock()
+        self._fila: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.cache: Dict[str, Any] = {}
+
+    def submit(self, target: Callable[[ProgressCallback, Dict[str, Any]], Optional[str]],
+               chave: Optional[str] = None) -> str:
+        """
+        Enfileira um job (ou anexa o pedido a um job idêntico já na fila/em execução)
+
+        Args:
+            target: Função que executa o processamento; recebe o callback de progresso e o
+                    cache compartilhado entre jobs, e retorna o caminho do arquivo final
+            chave: Identificador do pedido; pedidos com a mesma chave são coalescidos
+
+        Returns:
+            str: Identificador do job
+        """
+        with self._lock:
+            if chave is not None:
+                for job in self._jobs.values():
+                    if job.ativo and job.chave == chave:
+                        job.attach()
+                        self.logger.info(f"Pedido anexado ao job {job.job_id} já em andamento")
+                        return job.job_id
+
+            job = PipelineJob(uuid.uuid4().hex[:12], chave=chave)
+            self._jobs[job.job_id] = job
+            self._prune_finished()
+            self._fila.put((job, target))
+
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="pipeline-worker", daemon=True)
+                self._worker.start()
+
+        self.logger.info(f"Job {job.job_id} enfileirado ({self._fila.qsize()} na fila)")
+        return job.job_id
+
+    def _work(self):
+        """Thread trabalhadora: executa os jobs da fila um de cada vez"""
+        while True:
+            job, target = self._fila.get()
+            try:
+                self._run(job, target)
+            finally:
+                self._fila.task_done()
+
+    def _run(self, job: PipelineJob, target: Callable[[ProgressCallback, Dict[str, Any]], Optional[str]]):
+        job.start()
+        threading.current_thread().name = f"pipeline-{job.job_id}"
+        self.logger.info(f"Job {job.job_id} iniciado em segundo plano")
+        try:
+            resultado = target(job.update_progress, self.cache)
+            job.finish(resultado=resultado, erro=None if resultado else "Processamento não gerou arquivo final")
+            self.logger.info(f"Job {job.job_id} finalizado: {job.status}")
+        except Exception as e:
+            self.logger.error(f"Erro no job {job.job_id}: {str(e)}", exc_info=True)
+            job.finish(erro=str(e))
+        finally:
+            threading.current_thread().name = "pipeline-worker"
+
+    def _prune_finished(self):
+        """Descarta os jobs finalizados mais antigos (chamado com self._lock adquirido)"""
+        finalizados = sorted((job for job in self._jobs.values() if not job.ativo),
+                             key=lambda job: job.criado_em)
+        for job in finalizados[:-self.MAX_JOBS_FINALIZADOS]:
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: Optional[str]) -> Optional[PipelineJob]:
+        """Retorna o job pelo identificador"""
+        if not job_id:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_job(self) -> Optional[PipelineJob]:
+        """Retorna o job ativo mais antigo - o que está em execução (para reanexar após recarregar a página)"""
+        with self._lock:
+            ativos = [job for job in self._jobs.values() if job.ativo]
+        return min(ativos, key=lambda job: job.criado_em) if ativos else None
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Retorna o JobRunner único do processo"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,306 @@
+"""
+Orquestração das etapas de processamento
+Executa coleta, análise de protagonismo, consolidação e processamento em lote,
+publicando o progresso de cada etapa através de um callback opcional
+"""
+
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional
+from src.config_manager import ConfigManager
+from src.api_caller import APICaller
+from src.protagonismo_analyzer import ProtagonismoAnalyzer
+from src.data_consolidator import DataConsolidator
+from src.batch_processor import BatchProcessor
+from src.brand_extractor import BrandExtractor
+from src.deepseek_client import DeepSeekClient
+from src.artifact_catalog import ArtifactCatalog, TIPO_RELATORIO_EXECUCAO
+from src.run_profiler import RunProfiler
+from src.utils.file_utils import create_directories
+from src.utils.file_lock import FileLock
+from src.utils.progress import ProgressCallback, notify_progress
+from src.utils.usage_accounting import UsageAccounting
+from src.utils.call_budget import parse_deadline
+
+# Etapas do pipeline, na ordem de execução ('marcas' é opcional e roda junto com 'protagonismo')
+ETAPAS = ['api', 'marcas', 'protagonismo', 'consolidacao', 'lote']
+
+
+def request_key(config_manager: ConfigManager, extrair_marcas: Optional[bool] = None,
+                analise_combinada: Optional[bool] = None) -> str:
+    """
+    Identifica um pedido de processamento pelos parâmetros que determinam o resultado
+    (configurações da API de clippings, marcas analisadas e etapas opcionais)
+
+    Pedidos com a mesma chave produzem o mesmo arquivo e podem ser coalescidos em um único job
+    """
+    parametros = {
+        'api_configs': config_manager.load_api_configs(),
+        'marcas': config_manager.w_marcas,
+        'extrair_marcas': config_manager.extrair_marcas if extrair_marcas is None else extrair_marcas,
+        'analise_combinada': config_manager.analise_combinada if analise_combinada is None else analise_combinada
+    }
+    conteudo = json.dumps(parametros, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def run_pipeline(config_manager: ConfigManager,
+                 progress_callback: Optional[ProgressCallback] = None,
+                 protagonismo_analyzer: Optional[ProtagonismoAnalyzer] = None,
+                 api_caller: Optional[APICaller] = None,
+                 extrair_marcas: Optional[bool] = None,
+                 analise_combinada: Optional[bool] = None) -> Optional[str]:
+    """
+    Executa o processamento completo do sistema
+
+    Apenas um processamento roda por vez, mesmo entre processos diferentes (Streamlit e
+    linha de comando): a execução aguarda a trava de arquivo arq_trava_pipeline
+
+    Args:
+        config_manager: Configurações do sistema
+        progress_callback: Callback que recebe eventos de progresso das etapas
+        protagonismo_analyzer: Analisador já inicializado (opcional, reaproveita porta-vozes carregados)
+        api_caller: Cliente da API de clippings já inicializado (opcional, reaproveita conexões)
+        extrair_marcas: Executa a extração de marcas sobre os dados da execução
+                        (padrão: config_manager.extrair_marcas / EXTRAIR_MARCAS)
+        analise_combinada: Com a extração de marcas ativa, usa uma única chamada por notícia
+                           para marcas e protagonismo (padrão: ANALISE_COMBINADA)
+
+    Returns:
+        Caminho do arquivo final gerado ou None se o processamento não gerou arquivo
+    """
+    logger = logging.getLogger(__name__)
+
+    # Criar diretórios necessários
+    create_directories()
+
+    trava = FileLock(config_manager.arq_trava_pipeline)
+    if not trava.acquire(blocking=False):
+        logger.info("Outro processamento em andamento; aguardando liberação...")
+        notify_progress(progress_callback, 'fila', 'andamento', aguardando_trava=True)
+        trava.acquire()
+
+    try:
+        if extrair_marcas is None:
+            extrair_marcas = config_manager.extrair_marcas
+        if analise_combinada is None:
+            analise_combinada = config_manager.analise_combinada
+        return _run_stages(config_manager, progress_callback, protagonismo_analyzer, api_caller,
+                           extrair_marcas, analise_combinada)
+    finally:
+        trava.release()
+
+
+def _run_stages(config_manager: ConfigManager,
+                progress_callback: Optional[ProgressCallback],
+                protagonismo_analyzer: Optional[ProtagonismoAnalyzer],
+                api_caller: Optional[APICaller],
+                extrair_marcas: bool,
+                analise_combinada: bool) -> Optional[str]:
+    """
+    Executa as etapas do pipeline (com a trava de processamento adquirida)
+
+    Cada execução grava um relatório de desempenho (run_report_{run_id}.json) com tempo,
+    CPU, memória e linhas de cada etapa, registrado no catálogo de artefatos
+    """
+    logger = logging.getLogger(__name__)
+
+    config_manager.new_run_id()
+    logger.info(f"Execução {config_manager.run_id} iniciada")
+
+    profiler = RunProfiler(config_manager)
+    profiler.extras['parametros'] = {'extrair_marcas': extrair_marcas, 'analise_combinada': analise_combinada}
+    profiler.start()
+    arquivo_final = None
+    erro = None
+    try:
+        arquivo_final = _execute_stages(config_manager, progress_callback, protagonismo_analyzer, api_caller,
+                                        extrair_marcas, analise_combinada, profiler)
+        return arquivo_final
+    except Exception as e:
+        erro = str(e)
+        raise
+    finally:
+        relatorio = profiler.finish(arquivo_final=arquivo_final, erro=erro)
+        if relatorio:
+            ArtifactCatalog(config_manager).register(relatorio, TIPO_RELATORIO_EXECUCAO)
+
+
+def _execute_stages(config_manager: ConfigManager,
+                    progress_callback: Optional[ProgressCallback],
+                    protagonismo_analyzer: Optional[ProtagonismoAnalyzer],
+                    api_caller: Optional[APICaller],
+                    extrair_marcas: bool,
+                    analise_combinada: bool,
+                    profiler: RunProfiler) -> Optional[str]:
+    """Sequência das etapas, cada uma medida pelo profiler da execução"""
+    logger = logging.getLogger(__name__)
+
+    # Prazo do modo orçamento validado antes da coleta ("HH:MM" refere-se ao dia da execução)
+    prazo = parse_deadline(config_manager.protagonismo_prazo)
+
+    # Etapa 1: Chamar API e carregar dados
+    logger.info("Iniciando chamada da API...")
+    notify_progress(progress_callback, 'api', 'iniciada')
+    with profiler.stage('api') as etapa:
+        if api_caller is None:
+            api_caller = APICaller(config_manager)
+        final_df = api_caller.fetch_data(progress_callback=progress_callback)
+        etapa['linhas_saida'] = len(final_df)
+
+    if final_df.empty:
+        logger.error("Nenhum dado foi retornado pela API")
+        return None
+
+    logger.info(f"API retornou {len(final_df)} registros")
+    notify_progress(progress_callback, 'api', 'concluida', registros=len(final_df))
+
+    if protagonismo_analyzer is None:
+        protagonismo_analyzer = ProtagonismoAnalyzer(config_manager)
+    deepseek_client = protagonismo_analyzer.deepseek_client
+    # O cliente pode ser reaproveitado entre execuções: o relatório registra a diferença
+    stats_deepseek_iniciais = dict(deepseek_client.stats)
+    try:
+        return _execute_analysis_stages(config_manager, progress_callback, protagonismo_analyzer, final_df,
+                                        extrair_marcas, analise_combinada, profiler, prazo)
+    finally:
+        uso_deepseek = {
+            nome: valor - stats_deepseek_iniciais.get(nome, 0) for nome, valor in deepseek_client.stats.items()
+        }
+        # Custo estimado de todas as chamadas da execução (protagonismo + extração de marcas)
+        uso_deepseek['custo_usd'] = round(UsageAccounting(config_manager.deepseek_precos).cost(uso_deepseek), 6)
+        profiler.extras['deepseek'] = uso_deepseek
+
+
+def _execute_analysis_stages(config_manager: ConfigManager,
+                             progress_callback: Optional[ProgressCallback],
+                             protagonismo_analyzer: ProtagonismoAnalyzer,
+                             final_df,
+                             extrair_marcas: bool,
+                             analise_combinada: bool,
+                             profiler: RunProfiler,
+                             prazo: Optional[datetime] = None) -> Optional[str]:
+    """
+    Etapas sobre os dados coletados: marcas, protagonismo, consolidação e lote
+
+    Com prazo ou PROTAGONISMO_MAX_CHAMADAS, o protagonismo roda no modo orçamento
+    """
+    logger = logging.getLogger(__name__)
+
+    # Etapa opcional: extração de marcas sobre o mesmo final_df, dividindo o mesmo orçamento
+    # de chamadas DeepSeek (cliente do analisador)
+    # - análise combinada: o protagonismo registra as marcas de cada notícia analisada no cache
+    #   do extrator; a extração roda depois e só chama a API para as notícias restantes
+    # - análise separada: a extração roda em paralelo com o protagonismo
+    deepseek_client = protagonismo_analyzer.deepseek_client
+    brand_extractor = None
+    executor_marcas = None
+    if extrair_marcas and analise_combinada:
+        brand_extractor = BrandExtractor(config_manager, deepseek_client=deepseek_client)
+    elif extrair_marcas:
+        executor_marcas = ThreadPoolExecutor(max_workers=1, thread_name_prefix="marcas")
+        executor_marcas.submit(_run_brand_extraction, config_manager, final_df,
+                               deepseek_client, progress_callback, profiler=profiler)
+
+    try:
+        # Etapa 2: Análise de protagonismo
+        logger.info("Iniciando análise de protagonismo...")
+        notify_progress(progress_callback, 'protagonismo', 'iniciada', total=len(final_df))
+        with profiler.stage('protagonismo', linhas_entrada=len(final_df)) as etapa_protagonismo:
+            df_resultados = protagonismo_analyzer.analyze_protagonismo(
+                final_df, progress_callback=progress_callback, brand_extractor=brand_extractor,
+                prazo=prazo, max_chamadas=config_manager.protagonismo_max_chamadas
+            )
+            etapa_protagonismo['linhas_saida'] = len(df_resultados)
+        # Decisões, requisições e tokens por marca e caminho (regra, cache, llm, fallback)
+        profiler.extras['tokens_protagonismo'] = protagonismo_analyzer.accounting.to_dict()
+        if protagonismo_analyzer.budget.ativo:
+            profiler.extras['orcamento'] = protagonismo_analyzer.budget.to_dict()
+        if protagonismo_analyzer.retry_queue.enfileirados:
+            profiler.extras['repeticoes_deepseek'] = protagonismo_analyzer.retry_queue.to_dict()
+    finally:
+        # Aguarda a extração de marcas (os arquivos do mês são gravados por ela)
+        if executor_marcas is not None:
+            executor_marcas.shutdown(wait=True)
+
+    # Tempo do protagonismo dividido entre chamadas à DeepSeek e regras locais
+    tempo_deepseek = profiler.section_time('protagonismo.deepseek')
+    etapa_protagonismo['deepseek_s'] = round(tempo_deepseek, 3)
+    etapa_protagonismo['regras_s'] = round(max(etapa_protagonismo['duracao_s'] - tempo_deepseek, 0.0), 3)
+
+    if brand_extractor is not None:
+        _run_brand_extraction(config_manager, final_df, deepseek_client, progress_callback,
+                              brand_extractor=brand_extractor, profiler=profiler)
+
+    if df_resultados.empty:
+        logger.error("Análise de protagonismo não retornou resultados")
+        return None
+
+    logger.info(f"Análise de protagonismo gerou {len(df_resultados)} resultados")
+    notify_progress(progress_callback, 'protagonismo', 'concluida', registros=len(df_resultados))
+
+    # Etapa 3: Consolidação dos dados
+    logger.info("Iniciando consolidação dos dados...")
+    notify_progress(progress_callback, 'consolidacao', 'iniciada', total=len(df_resultados))
+    with profiler.stage('consolidacao', linhas_entrada=len(df_resultados)) as etapa:
+        consolidator = DataConsolidator(config_manager)
+        final_df_consolidado = consolidator.consolidate_data(final_df, df_resultados)
+        etapa['linhas_saida'] = len(final_df_consolidado)
+
+    logger.info(f"Consolidação gerou {len(final_df_consolidado)} registros")
+    notify_progress(progress_callback, 'consolidacao', 'concluida', registros=len(final_df_consolidado))
+
+    # Etapa 4: Processamento em lote
+    logger.info("Iniciando processamento em lote...")
+    notify_progress(progress_callback, 'lote', 'iniciada', total=len(final_df_consolidado))
+    with profiler.stage('lote', linhas_entrada=len(final_df_consolidado)):
+        batch_processor = BatchProcessor(config_manager)
+        arquivo_final = batch_processor.process_batch(final_df_consolidado, final_df)
+
+    if arquivo_final:
+        logger.info(f"Processamento concluído. Arquivo gerado: {arquivo_final}")
+    else:
+        logger.error("Erro ao gerar arquivo final")
+    notify_progress(progress_callback, 'lote', 'concluida', arquivo=arquivo_final)
+
+    # Aplica a política de retenção aos arquivos com timestamp
+    ArtifactCatalog(config_manager).apply_retention()
+
+    return arquivo_final
+
+
+def _run_brand_extraction(config_manager: ConfigManager, final_df, deepseek_client: DeepSeekClient,
+                          progress_callback: Optional[ProgressCallback],
+                          brand_extractor: Optional[BrandExtractor] = None,
+                          profiler: Optional[RunProfiler] = None):
+    """
+    Executa a extração de marcas do mês sobre o final_df da execução
+
+    Falhas são apenas logadas: a extração é complementar e não interrompe o pipeline
+
+    Args:
+        brand_extractor: Extrator já usado na análise combinada (cache com as marcas registradas)
+        profiler: Profiler da execução (mede a etapa 'marcas')
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Iniciando extração de marcas...")
+    notify_progress(progress_callback, 'marcas', 'iniciada', total=len(final_df))
+    try:
+        etapa_marcas = profiler.stage('marcas', linhas_entrada=len(final_df)) if profiler else nullcontext({})
+        with etapa_marcas as etapa:
+            extractor = brand_extractor or BrandExtractor(config_manager, deepseek_client=deepseek_client)
+            results = extractor.extract_from_dataframe(
+                final_df, datetime.now().strftime("%Y_%m"), progress_callback=progress_callback
+            )
+            etapa['linhas_saida'] = results['run']['processed_articles']
+        notify_progress(progress_callback, 'marcas', 'concluida',
+                        registros=results['run']['processed_articles'],
+                        exclusivas=len(results['exclusive_articles']),
+                        tokens_economizados=extractor.estimated_tokens_saved())
+    except Exception as e:
+        logger.error(f"Erro na extração de marcas: {str(e)}", exc_info=True)
+        notify_progress(progress_callback, 'marcas', 'erro', erro=str(e))
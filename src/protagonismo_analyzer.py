@@ -27,21 +27,116 @@ import pandas as pd
 import requests
 import time
 import re
+import json
 import logging
 import unicodedata
 from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 from src.config_manager import ConfigManager
+from src.artifact_catalog import ArtifactCatalog, TIPO_PROTAGONISMO, TIPO_TRACE_NOTICIAS
+from src.deepseek_client import DeepSeekClient
+from src.brand_extractor import BrandExtractor, INSTRUCOES_EXTRACAO_MARCAS
+from src.utils.progress import ProgressCallback, notify_progress
+from src.run_profiler import profile_section
+from src.article_tracer import ArticleTracer
+from src.utils.call_budget import CallBudget
+from src.utils.retry_queue import RetryQueue, is_transient_error
+from src.utils.usage_accounting import (
+    UsageAccounting, CAMINHO_REGRA, CAMINHO_CACHE, CAMINHO_LLM, CAMINHO_FALLBACK
+)
+
+# Critérios dos níveis de protagonismo (usados na análise por marca e na análise combinada)
+CRITERIOS_NIVEIS_PROTAGONISMO = """        **Nível 1 - Dedicada:**
+        - A marca é o foco principal da matéria
+        - Destacada no título, subtítulo ou lead
+        - Exemplo: "Bradesco revoluciona o mercado financeiro com nova tecnologia"
+
+        **Nível 2 - Conteúdo:**
+        - Menção significativa da marca, mas sem ser o foco ou referência primária
+        - A marca tem papel relevante mas não é o protagonista principal da notícia
+        
+        a) **Comparação equilibrada com concorrentes:**
+        - A marca é mencionada em matérias onde recebe o mesmo peso e importância dos concorrentes
+        - Ambas as marcas são tratadas de forma equilibrada na narrativa
+        - A marca não é secundária ou tangencial, mas co-protagonista da matéria
+        - Exemplo: "Goldman Sachs eleva recomendação de Bradesco a neutra; corta Santander Brasil para venda"
+        - Exemplo: "O Santander saiu na frente no dia 30 de abril, com um resultado dentro do esperado. Agora, os holofotes se voltam para Bradesco e Itaú."
+
+        **Nível 3 - Citação:**
+        Este nível abrange três situações distintas:
+        
+        a) **Comparação com concorrentes (marca claramente secundária):**
+        - A marca é mencionada em matérias claramente focadas em outro concorrente
+        - A marca tem papel evidentemente secundário na narrativa
+        - A matéria é sobre o concorrente, apenas citando a marca para comparação
+        - Exemplo: Matéria sobre "Resultados do Itaú superam expectativas" que apenas menciona Bradesco para comparar estratégias
+        
+        b) **Referência setorial:**
+        - A marca ou seus porta-vozes são citados como referência no setor ou sobre tema específico
+        - Através de declarações ou dados fornecidos pela empresa
+        - Exemplo: "Segundo o Bradesco, o número de empréstimos em São Paulo cresceu 20% no último ano"
+        
+        c) **Menção tangencial:**
+        - Menção onde a presença da marca não é crucial para a matéria
+        - Exemplo: "Empresas inovadoras como iFood, Nubank, Bradesco, e outras..."
+
+"""
+
+# Respostas de nível aceitas
+NIVEIS_VALIDOS = ('Nível 1', 'Nível 2', 'Nível 3', 'Nenhum Nível Encontrado')
+
+# Nível válido dentro de uma resposta (inclusive incompleta, durante o stream)
+_PADRAO_NIVEL = re.compile(r'Nenhum N[íi]vel Encontrado|N[íi]vel\s*:?\s*([123])\b', re.IGNORECASE)
+
+# Sequências de parada da classificação por marca: a resposta termina na primeira linha em branco
+PARADAS_NIVEL = ['\n\n']
+
+
+def extract_level(resposta: str) -> Optional[str]:
+    """Primeiro nível válido mencionado na resposta ou None"""
+    encontrado = _PADRAO_NIVEL.search(resposta)
+    if encontrado is None:
+        return None
+    return f"Nível {encontrado.group(1)}" if encontrado.group(1) else 'Nenhum Nível Encontrado'
+
+# Modo orçamento: marcas da notícia cujo nível foi definido por regra (orçamento esgotado)
+COLUNA_NIVEL_POR_REGRA = 'Marcas com Nivel por Regra'
+
+# Marcas com porta-vozes cadastrados: Citação com porta-voz na notícia sobe para Conteúdo
+MARCAS_COM_PORTA_VOZES = ['Bradesco', 'Ágora', 'Bradesco Asset', 'BBI']
+
+# Marcador de falha da chamada (permanente, após as repetições) e resposta interna de falha
+# transitória, que vai para a fila de repetição e nunca chega aos resultados
+ERRO_API = 'Erro na API'
+_ERRO_API_TRANSITORIO = 'Erro na API (transitório)'
 
 class ProtagonismoAnalyzer:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.logger = logging.getLogger(__name__)
         self.headers = config_manager.get_api_headers()
+        self.catalog = ArtifactCatalog(config_manager)
+        # Callback de progresso da execução corrente (definido em analyze_protagonismo)
+        self.progress_callback: Optional[ProgressCallback] = None
+        self._ultimo_progresso = 0.0
+        # Extrator de marcas da análise combinada (definido em analyze_protagonismo)
+        self.brand_extractor: Optional[BrandExtractor] = None
+        # Rastro por notícia da execução corrente (criado em analyze_protagonismo)
+        self.tracer = ArticleTracer(config_manager, ativo=False)
+        # Tokens e decisões por marca e caminho da última análise (recriado em analyze_protagonismo)
+        self.accounting = UsageAccounting(config_manager.deepseek_precos)
+        # Prazo/máximo de chamadas da análise corrente (definido em analyze_protagonismo)
+        self.budget = CallBudget()
+        # Pares notícia/marca com falha transitória, repetidos ao final da análise
+        self.retry_queue = RetryQueue(0)
         # Carrega porta-vozes: dicionário {normalizado: original} e lista de normalizados
         # ATUALIZADO: Usado para Bradesco, Ágora, Bradesco Asset e BBI
+        self._porta_vozes_assinatura = self._porta_vozes_signature()
         self.porta_vozes_map, self.porta_vozes = self._load_porta_vozes()
+        self._porta_vozes_patterns = self._compile_porta_vozes_patterns()
+        # Cliente DeepSeek (sessão HTTP + limites de concorrência/taxa, compartilhável entre etapas)
+        self.deepseek_client = DeepSeekClient(config_manager)
     
     def _normalize_text(self, text: str) -> str:
         """
@@ -130,7 +225,7 @@ class ProtagonismoAnalyzer:
                     porta_vozes_list.append(nome_normalizado)
             
             self.logger.info(f"Carregados {len(porta_vozes_list)} porta-vozes (Bradesco e Ágora)")
-            self.logger.debug(f"Primeiros 5 porta-vozes: {list(porta_vozes_map.values())[:5]}...")
+            self.logger.debug("Primeiros 5 porta-vozes: %s...", list(porta_vozes_map.values())[:5])
             
             return porta_vozes_map, porta_vozes_list
             
@@ -138,6 +233,43 @@ class ProtagonismoAnalyzer:
             self.logger.error(f"Erro ao carregar arquivo de porta-vozes: {str(e)}")
             return {}, []
     
+    def _porta_vozes_signature(self) -> Optional[tuple]:
+        """Identifica o arquivo de porta-vozes mais recente (nome e data de modificação)"""
+        arquivos_porta_vozes = sorted(Path("config").glob("porta_vozes_*.xlsx"), reverse=True)
+        if not arquivos_porta_vozes:
+            return None
+        return arquivos_porta_vozes[0].name, arquivos_porta_vozes[0].stat().st_mtime
+    
+    def refresh_porta_vozes(self) -> bool:
+        """
+        Recarrega os porta-vozes apenas se o arquivo mais recente mudou
+        Permite reaproveitar o analisador entre execuções sem usar uma lista desatualizada
+        
+        Returns:
+            bool: True se a lista foi recarregada
+        """
+        assinatura = self._porta_vozes_signature()
+        if assinatura == self._porta_vozes_assinatura:
+            return False
+        
+        self._porta_vozes_assinatura = assinatura
+        self.porta_vozes_map, self.porta_vozes = self._load_porta_vozes()
+        self._porta_vozes_patterns = self._compile_porta_vozes_patterns()
+        return True
+    
+    def _compile_porta_vozes_patterns(self) -> List[tuple]:
+        """
+        Pré-compila os padrões de busca dos porta-vozes (uma vez por carga da lista)
+        
+        Returns:
+            Lista de tuplas (padrão compilado, nome normalizado), na ordem da lista de porta-vozes
+        """
+        # Usa word boundary para evitar matches parciais
+        return [
+            (re.compile(r'\b' + re.escape(porta_voz_normalizado) + r'\b'), porta_voz_normalizado)
+            for porta_voz_normalizado in self.porta_vozes
+        ]
+    
     def _check_porta_voz_mentioned(self, titulo: str, conteudo: str) -> List[str]:
         """
         Verifica se algum porta-voz (Bradesco ou Ágora) é mencionado no texto
@@ -159,11 +291,9 @@ class ProtagonismoAnalyzer:
         # Lista para armazenar porta-vozes encontrados (com capitalização original)
         porta_vozes_encontrados = []
         
-        # Busca cada porta-voz no texto
-        for porta_voz_normalizado in self.porta_vozes:
-            # Usa word boundary para evitar matches parciais
-            pattern = r'\b' + re.escape(porta_voz_normalizado) + r'\b'
-            if re.search(pattern, texto_normalizado):
+        # Busca cada porta-voz no texto (padrões pré-compilados)
+        for pattern, porta_voz_normalizado in self._porta_vozes_patterns:
+            if pattern.search(texto_normalizado):
                 # Adiciona o nome ORIGINAL (com capitalização) à lista
                 nome_original = self.porta_vozes_map.get(porta_voz_normalizado, porta_voz_normalizado)
                 porta_vozes_encontrados.append(nome_original)
@@ -244,8 +374,8 @@ class ProtagonismoAnalyzer:
         for marca_composta in marcas_compostas:
             if marca_composta.lower() in titulo_lower:
                 self.logger.debug(
-                    f"Marca '{marca}' encontrada no título, mas faz parte de '{marca_composta}' - "
-                    f"não será classificada automaticamente como Dedicada"
+                    "Marca '%s' encontrada no título, mas faz parte de '%s' - "
+                    "não será classificada automaticamente como Dedicada", marca, marca_composta
                 )
                 return False
         
@@ -254,8 +384,7 @@ class ProtagonismoAnalyzer:
         pattern = r'\b' + re.escape(marca_lower) + r'\b'
         if re.search(pattern, titulo_lower):
             self.logger.debug(
-                f"Marca '{marca}' encontrada ISOLADA no título - "
-                f"Classificação automática: Dedicada"
+                "Marca '%s' encontrada ISOLADA no título - Classificação automática: Dedicada", marca
             )
             return True
         
@@ -297,8 +426,7 @@ class ProtagonismoAnalyzer:
         pattern = r'\b' + re.escape(marca_lower) + r'\b'
         if re.search(pattern, titulo_lower):
             self.logger.debug(
-                f"Marca '{marca}' encontrada no título - "
-                f"Classificação automática: Dedicada"
+                "Marca '%s' encontrada no título - Classificação automática: Dedicada", marca
             )
             return True
         
@@ -353,8 +481,8 @@ class ProtagonismoAnalyzer:
         # Log para debug
         if contagem > 0:
             self.logger.debug(
-                f"Marca '{marca}' encontrada {contagem} vez(es) ISOLADA no texto "
-                f"(excluindo ocorrências em: {marcas_compostas})"
+                "Marca '%s' encontrada %d vez(es) ISOLADA no texto (excluindo ocorrências em: %s)",
+                marca, contagem, marcas_compostas
             )
         
         return contagem
@@ -363,11 +491,36 @@ class ProtagonismoAnalyzer:
     # FIM DOS NOVOS MÉTODOS PARA CORREÇÃO
     # ═══════════════════════════════════════════════════════════════════════════
     
-    def analyze_protagonismo(self, final_df: pd.DataFrame) -> pd.DataFrame:
+    def analyze_protagonismo(self, final_df: pd.DataFrame,
+                             progress_callback: Optional[ProgressCallback] = None,
+                             brand_extractor: Optional[BrandExtractor] = None,
+                             salvar: bool = True,
+                             prazo: Optional[datetime] = None,
+                             max_chamadas: Optional[int] = None) -> pd.DataFrame:
         """
         Analisa o nível de protagonismo para cada notícia e marca
         ATUALIZADO: Inclui contagem de ocorrências no formato largo
+        
+        Args:
+            final_df: DataFrame com as notícias
+            progress_callback: Callback opcional que recebe o progresso (notícias e chamadas DeepSeek)
+            brand_extractor: Ativa a análise combinada - uma única chamada por notícia retorna as
+                             marcas mencionadas (registradas no cache do extrator) e os níveis das marcas
+            salvar: Grava as planilhas de resultados (False apenas compara/mede a análise)
+            prazo: Horário limite para chamadas à DeepSeek (modo orçamento)
+            max_chamadas: Máximo de chamadas à DeepSeek (modo orçamento)
+            
+        No modo orçamento (prazo e/ou máximo de chamadas), as chamadas à DeepSeek são feitas
+        depois das regras, por prioridade; esgotado o orçamento, os pares restantes recebem o
+        nível por regra, sinalizado na coluna COLUNA_NIVEL_POR_REGRA
         """
+        self.progress_callback = progress_callback
+        self.brand_extractor = brand_extractor
+        self.tracer = ArticleTracer(self.config)
+        self.accounting = UsageAccounting(self.config.deepseek_precos)
+        self.budget = CallBudget(prazo, max_chamadas)
+        self.retry_queue = RetryQueue(self.config.deepseek_repeticoes, self.config.deepseek_repeticao_espera_s,
+                                      self.config.deepseek_repeticao_espera_max_s)
         try:
             # Carrega a tabela de protagonismo
             df_protagonismo = self._load_protagonismo_table()
@@ -389,13 +542,49 @@ class ProtagonismoAnalyzer:
                 df_resultados = self._apply_nivel_substitutions_largo(df_resultados)
                 
                 # Salva resultados
-                self._save_results_largo(df_resultados)
+                if salvar:
+                    self._save_results_largo(df_resultados)
             
             return df_resultados
             
         except Exception as e:
             self.logger.error(f"Erro durante análise de protagonismo: {str(e)}")
             raise
+        finally:
+            self.progress_callback = None
+            self.brand_extractor = None
+            self._close_tracer()
+    
+    def _close_tracer(self):
+        """Grava os rastros das notícias e registra o arquivo no catálogo"""
+        arquivo_traces = self.tracer.close()
+        if arquivo_traces:
+            self.catalog.register(arquivo_traces, TIPO_TRACE_NOTICIAS)
+    
+    def _notify_article_progress(self, processados: int, total: int, chamadas_deepseek: int,
+                                 classificacoes_automaticas: int, force: bool = False):
+        """
+        Publica o progresso da análise (no máximo a cada 0,5s, exceto quando forçado)
+        
+        As chamadas pendentes são estimadas pela taxa de chamadas por notícia já observada
+        """
+        if self.progress_callback is None:
+            return
+        
+        agora = time.monotonic()
+        if not force and agora - self._ultimo_progresso < 0.5:
+            return
+        self._ultimo_progresso = agora
+        
+        taxa_chamadas = chamadas_deepseek / processados if processados else 0
+        notify_progress(
+            self.progress_callback, 'protagonismo', 'andamento',
+            processados=processados,
+            total=total,
+            chamadas_deepseek=chamadas_deepseek,
+            chamadas_pendentes_estimadas=int(round(taxa_chamadas * (total - processados))),
+            classificacoes_automaticas=classificacoes_automaticas
+        )
     
     def _load_protagonismo_table(self) -> pd.DataFrame:
         """
@@ -498,7 +687,7 @@ class ProtagonismoAnalyzer:
             resultado_df[f'Ocorrencias {marca}'] = 0
             
             # ATUALIZADO: Porta-vozes para Bradesco, Ágora, Bradesco Asset e BBI
-            if marca in ['Bradesco', 'Ágora', 'Bradesco Asset', 'BBI']:
+            if marca in MARCAS_COM_PORTA_VOZES:
                 resultado_df[f'Porta-Voz {marca}'] = None
         
         self.logger.info("Avaliando nível de protagonismo para cada notícia e marca...")
@@ -511,8 +700,19 @@ class ProtagonismoAnalyzer:
         upgrades_por_porta_voz = 0
         chamadas_deepseek = 0
         
-        for index, row in final_df.iterrows():
+        # Resultados da análise combinada por notícia (uma chamada, feita na primeira marca que precisar)
+        analises_combinadas = {}
+        # Modo orçamento: pares notícia/marca que dependem da DeepSeek, executados após as regras
+        pendentes = []
+        niveis_por_regra = 0
+        if self.budget.ativo:
+            resultado_df[COLUNA_NIVEL_POR_REGRA] = None
+        
+        for posicao, (index, row) in enumerate(final_df.iterrows()):
+            self._notify_article_progress(posicao, total_noticias, chamadas_deepseek, classificacoes_automaticas)
+            
             noticia_id = row['Id']
+            trace = self.tracer.begin(noticia_id)
             titulo_noticia = str(row['Titulo']).strip()
             conteudo_noticia = str(row['Conteudo']).strip()
             canais_noticia = str(row['Canais']).strip()
@@ -522,9 +722,11 @@ class ProtagonismoAnalyzer:
             
             # Combina título e conteúdo
             texto_completo_noticia = f"Título: {titulo_noticia}\n\nConteúdo: {conteudo_noticia}"
+            trace.caracteres = len(texto_completo_noticia)
+            trace.mark('normalizacao')
             
             if not texto_completo_noticia.strip():
-                self.logger.warning(f"Pulando notícia ID {noticia_id}: Título e Conteúdo vazios")
+                self.logger.warning("Pulando notícia ID %s: Título e Conteúdo vazios", noticia_id)
                 continue
             
             # FILTRO: Verifica se pelo menos uma das marcas está presente no campo Canais
@@ -532,27 +734,29 @@ class ProtagonismoAnalyzer:
             for marca in self.config.w_marcas:
                 if re.search(r'\b' + re.escape(marca.lower()) + r'\b', canais_noticia.lower()):
                     marcas_no_canal.append(marca)
+            trace.marcas = marcas_no_canal
+            trace.mark('filtro_canal')
             
             # Se nenhuma marca foi encontrada no campo Canais, pula a notícia
             if not marcas_no_canal:
                 noticias_filtradas += 1
-                self.logger.debug(f"Notícia ID {noticia_id} filtrada - nenhuma marca encontrada no campo Canais: {canais_noticia}")
+                self.logger.debug("Notícia ID %s filtrada - nenhuma marca encontrada no campo Canais: %s",
+                                  noticia_id, canais_noticia)
                 continue
             
             noticias_processadas += 1
-            self.logger.debug(f"Processando notícia ID {noticia_id} - Marcas encontradas no canal: {marcas_no_canal}")
+            self.logger.debug("Processando notícia ID %s - Marcas encontradas no canal: %s", noticia_id, marcas_no_canal)
             
             # ═══ NOVO: Detectar porta-vozes UMA VEZ por notícia ═══
             porta_vozes_noticia = self._check_porta_voz_mentioned(titulo_noticia, conteudo_noticia)
-            marcas_com_porta_vozes = ['Bradesco', 'Ágora', 'Bradesco Asset', 'BBI']
+            trace.mark('porta_vozes')
             
             if porta_vozes_noticia:
-                self.logger.debug(f"Porta-vozes detectados na notícia ID {noticia_id}: {', '.join(porta_vozes_noticia)}")
+                self.logger.debug("Porta-vozes detectados na notícia ID %s: %s", noticia_id, porta_vozes_noticia)
             
             # Processa apenas as marcas encontradas no campo Canais
             for marca in marcas_no_canal:
-                self.logger.debug(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - "
-                                f"Avaliando notícia ID {noticia_id} para a marca: {marca}")
+                self.logger.debug("Avaliando notícia ID %s para a marca: %s", noticia_id, marca)
                 
                 # Inicializar variáveis no início de CADA iteração
                 nivel_detectado = None
@@ -574,11 +778,13 @@ class ProtagonismoAnalyzer:
                 # Para marcas com lógica restritiva, usar contagem específica
                 if marca in marcas_com_preprocessamento_restritivo:
                     contagem_usada = contagem  # Já calculada com _count_marca_occurrences_fixed
-                    self.logger.debug(f"🔧 DEBUG: Marca '{marca}' (restritiva) - contagem_fixed={contagem}, contagem_usada={contagem_usada}")
+                    self.logger.debug("🔧 DEBUG: Marca '%s' (restritiva) - contagem_fixed=%d, contagem_usada=%d",
+                                      marca, contagem, contagem_usada)
                 else:
                     # Para Santander/Itaú, usar contagem normal (word boundary simples)
                     contagem_usada = self._count_marca_occurrences_simple(marca, titulo_noticia, conteudo_noticia)
-                    self.logger.debug(f"🔧 DEBUG: Marca '{marca}' (normal) - contagem_fixed={contagem}, contagem_simple={contagem_usada}")
+                    self.logger.debug("🔧 DEBUG: Marca '%s' (normal) - contagem_fixed=%d, contagem_simple=%d",
+                                      marca, contagem, contagem_usada)
                 
                 # Aplicar classificação automática para TODAS as marcas
                 # CRÍTICO: Não pula quando contagem é 0 - deixa ir para DeepSeek
@@ -588,25 +794,25 @@ class ProtagonismoAnalyzer:
                 if contagem_usada >= 5:
                     nivel_detectado = 'Nível 1'  # Dedicada
                     classificacao_automatica = True
-                    self.logger.debug(f"Marca '{marca}' com {contagem_usada} ocorrências - Classificação automática: Dedicada")
+                    self.logger.debug("Marca '%s' com %d ocorrências - Classificação automática: Dedicada", marca, contagem_usada)
                     classificacoes_automaticas += 1
                 
                 # Regra 2: 3-4 ocorrências = Conteúdo
                 elif contagem_usada >= 3:
                     nivel_detectado = 'Nível 2'  # Conteúdo
                     classificacao_automatica = True
-                    self.logger.debug(f"Marca '{marca}' com {contagem_usada} ocorrências - Classificação automática: Conteúdo")
+                    self.logger.debug("Marca '%s' com %d ocorrências - Classificação automática: Conteúdo", marca, contagem_usada)
                     classificacoes_automaticas += 1
                 
                 # Regra 3: 1-2 ocorrências = Citação (verifica porta-voz para upgrade)
                 elif contagem_usada >= 1:
                     nivel_detectado = 'Nível 3'  # Citação
                     classificacao_automatica = True
-                    self.logger.debug(f"Marca '{marca}' com {contagem_usada} ocorrências - Classificação automática: Citação")
+                    self.logger.debug("Marca '%s' com %d ocorrências - Classificação automática: Citação", marca, contagem_usada)
                     classificacoes_automaticas += 1
                 
                 # NOVA LÓGICA: Verificação de porta-vozes para TODAS as marcas com classificação automática
-                if classificacao_automatica and marca in marcas_com_porta_vozes and porta_vozes_noticia:
+                if classificacao_automatica and marca in MARCAS_COM_PORTA_VOZES and porta_vozes_noticia:
                     # Aplica porta-vozes independentemente do nível de classificação
                     mask = resultado_df['Id'] == noticia_id
                     porta_vozes_str = ', '.join(porta_vozes_noticia)
@@ -616,10 +822,12 @@ class ProtagonismoAnalyzer:
                     if contagem_usada >= 1 and contagem_usada <= 2:
                         nivel_detectado = 'Nível 2'  # Upgrade para Conteúdo
                         upgrades_por_porta_voz += 1
-                        self.logger.debug(f"Marca '{marca}' com {contagem_usada} ocorrências + porta-vozes: {', '.join(porta_vozes_noticia)} - Upgrade para Conteúdo")
+                        self.logger.debug("Marca '%s' com %d ocorrências + porta-vozes: %s - Upgrade para Conteúdo",
+                                          marca, contagem_usada, porta_vozes_noticia)
                     else:
                         # Para 3+ ocorrências, mantém o nível mas aplica porta-vozes
-                        self.logger.debug(f"Marca '{marca}' ({contagem_usada} ocorrências) + porta-vozes: {', '.join(porta_vozes_noticia)} - Mantém {nivel_detectado}")
+                        self.logger.debug("Marca '%s' (%d ocorrências) + porta-vozes: %s - Mantém %s",
+                                          marca, contagem_usada, porta_vozes_noticia, nivel_detectado)
                 
                 # ═══ VERIFICAR SE MARCA APARECE ISOLADA NO TÍTULO ═══
                 # APLICAR PARA TODAS AS MARCAS (conforme especificação correta)
@@ -636,12 +844,13 @@ class ProtagonismoAnalyzer:
                     marca_isolada_no_titulo = self._verificar_marca_isolada_no_titulo_simples(
                         marca, titulo_noticia
                     )
+                trace.mark('contagem_marcas')
                 
                 if marca_isolada_no_titulo:
                     # Marca isolada no título sempre é Dedicada (sobrescreve classificação por contagem)
                     nivel_detectado = 'Nível 1'  # Dedicada
                     classificacao_automatica = True
-                    self.logger.debug(f"Marca '{marca}' encontrada ISOLADA no título - Dedicada (sobrescreve contagem)")
+                    self.logger.debug("Marca '%s' encontrada ISOLADA no título - Dedicada (sobrescreve contagem)", marca)
                     if contagem_usada < 5:  # Só conta se não foi contado antes
                         classificacoes_automaticas += 1
                 
@@ -651,11 +860,13 @@ class ProtagonismoAnalyzer:
                     contagem_previa = self._count_marca_occurrences_fixed(
                         marca, titulo_noticia, conteudo_noticia, marcas_compostas
                     )
+                    trace.mark('contagem_marcas')
                     
                     if contagem_previa == 0:
                         # Marca não aparece isolada no texto - não enviar para DeepSeek
                         nivel_detectado = 'Nenhum Nível Encontrado'
-                        self.logger.debug(f"Marca '{marca}' não encontrada no texto - Nenhum Nível (sem chamar DeepSeek)")
+                        self.accounting.record_decision(marca, CAMINHO_REGRA)
+                        self.logger.debug("Marca '%s' não encontrada no texto - Nenhum Nível (sem chamar DeepSeek)", marca)
                     else:
                         # Marca aparece no texto - prosseguir com DeepSeek
                         # Verifica regras específicas de conteúdo
@@ -674,28 +885,39 @@ class ProtagonismoAnalyzer:
                                 # Só aplicar se Bradesco aparece isolado
                                 specific_terms_info = content_check['found_specific_terms']
                                 self.logger.debug(
-                                    f"Citação mínima aplicada para Bradesco (marca encontrada isolada): "
-                                    f"{[t['content_term'] for t in specific_terms_info]}"
+                                    "Citação mínima aplicada para Bradesco (marca encontrada isolada): %s",
+                                    [t['content_term'] for t in specific_terms_info]
                                 )
                             else:
                                 # Criar novo content_check com citação mínima anulada
                                 self.logger.debug(
-                                    f"Citação mínima anulada para Bradesco: marca não encontrada isolada "
-                                    f"(só aparece em marcas compostas)"
+                                    "Citação mínima anulada para Bradesco: marca não encontrada isolada "
+                                    "(só aparece em marcas compostas)"
                                 )
                                 # Criar cópia do content_check com should_be_minimum_citation = False
                                 content_check = content_check.copy()
                                 content_check['should_be_minimum_citation'] = False
                         
-                        # Faz análise completa com DeepSeek
-                        nivel_detectado = self._analyze_single_news_marca(
-                            texto_completo_noticia, marca, df_protagonismo, noticia_id, 
-                            canais_noticia, content_check, porta_vozes_noticia
-                        )
-                        
-                        chamadas_deepseek += 1
-                        # Pausa para evitar sobrecarregar a API
-                        time.sleep(1)
+                        trace.mark('contagem_marcas')
+                        pendente = {
+                            'posicao': posicao, 'noticia_id': noticia_id, 'marca': marca,
+                            'titulo': titulo_noticia, 'conteudo': conteudo_noticia,
+                            'texto': texto_completo_noticia, 'canais': canais_noticia,
+                            'content_check': content_check, 'porta_vozes': porta_vozes_noticia,
+                            'marcas_no_canal': marcas_no_canal, 'contagem': contagem_previa
+                        }
+                        if self.budget.ativo:
+                            # Modo orçamento: chamada adiada e executada por prioridade após as regras
+                            pendentes.append(pendente)
+                            nivel_detectado = None
+                        else:
+                            nivel_detectado, chamadas = self._resolve_with_deepseek(
+                                pendente, df_protagonismo, analises_combinadas, trace
+                            )
+                            # O intervalo entre chamadas é controlado pelo limite de taxa do DeepSeekClient
+                            chamadas_deepseek += chamadas
+                else:
+                    self.accounting.record_decision(marca, CAMINHO_REGRA)
                 
                 # Limitar ocorrências a no máximo 10
                 contagem = min(contagem, 10)
@@ -704,11 +926,24 @@ class ProtagonismoAnalyzer:
                 mask = resultado_df['Id'] == noticia_id
                 resultado_df.loc[mask, f'Nivel de Protagonismo {marca}'] = nivel_detectado
                 resultado_df.loc[mask, f'Ocorrencias {marca}'] = contagem
+                trace.mark('montagem')
                 
-                self.logger.debug(
-                    f"Notícia ID {noticia_id}, Marca {marca}: "
-                    f"Nível='{nivel_detectado}', Ocorrências={contagem}"
-                )
+                self.logger.debug("Notícia ID %s, Marca %s: Nível='%s', Ocorrências=%s",
+                                  noticia_id, marca, nivel_detectado, contagem)
+        
+        if pendentes:
+            self._notify_article_progress(total_noticias, total_noticias, chamadas_deepseek,
+                                          classificacoes_automaticas, force=True)
+            chamadas, niveis_por_regra = self._run_pending_by_priority(
+                pendentes, resultado_df, df_protagonismo, analises_combinadas
+            )
+            chamadas_deepseek += chamadas
+        
+        if len(self.retry_queue):
+            chamadas_deepseek += self._retry_failed_calls(resultado_df, df_protagonismo, analises_combinadas)
+        
+        self._notify_article_progress(total_noticias, total_noticias, chamadas_deepseek,
+                                      classificacoes_automaticas, force=True)
         
         # Log de estatísticas finais
         self.logger.info(f"Estatísticas do processamento:")
@@ -718,13 +953,227 @@ class ProtagonismoAnalyzer:
         self.logger.info(f"- Classificações automáticas (por contagem/título): {classificacoes_automaticas}")
         self.logger.info(f"- Upgrades por porta-voz (Citação→Conteúdo): {upgrades_por_porta_voz}")
         self.logger.info(f"- Chamadas enviadas ao DeepSeek: {chamadas_deepseek}")
-        
-        if noticias_processadas > 0:
-            economia_percentual = (classificacoes_automaticas / noticias_processadas) * 100
-            self.logger.info(f"- Economia de chamadas API: {economia_percentual:.1f}%")
+        if self.budget.ativo:
+            self.logger.info(f"- Orçamento: {len(pendentes)} análises pela DeepSeek priorizadas, "
+                             f"{niveis_por_regra} com nível por regra (esgotado por: {self.budget.esgotado_por or '-'})")
+        if self.retry_queue.enfileirados:
+            repeticoes = self.retry_queue.to_dict()
+            self.logger.info(f"- Repetições: {repeticoes['enfileirados']} pares com falha transitória, "
+                             f"{repeticoes['repeticoes']} repetições em {repeticoes['rodadas']} rodada(s), "
+                             f"{repeticoes['permanentes']} falha(s) permanente(s)")
+        
+        contabilidade = self.accounting.to_dict()
+        decisoes = contabilidade['total']['decisoes']
+        if decisoes > 0:
+            sem_chamada = sum(contabilidade['por_caminho'][caminho]['decisoes']
+                              for caminho in (CAMINHO_REGRA, CAMINHO_CACHE))
+            self.logger.info(f"- Níveis decididos sem chamada à API: {sem_chamada}/{decisoes} "
+                             f"({sem_chamada / decisoes * 100:.1f}%)")
+            self.logger.info("- Decisões por caminho: " + ", ".join(
+                f"{caminho}={valores['decisoes']}" for caminho, valores in contabilidade['por_caminho'].items()
+            ))
+        total = contabilidade['total']
+        self.logger.info(f"- Tokens: prompt={total['prompt_tokens']} (cache={total['cached_tokens']}), "
+                         f"completion={total['completion_tokens']}, estimados (streams interrompidos): "
+                         f"prompt={total['prompt_tokens_estimados']}, completion={total['completion_tokens_estimados']} "
+                         f"| custo estimado: US$ {total['custo_usd']:.4f}")
         
         return resultado_df
     
+    def _resolve_with_deepseek(self, pendente: Dict, df_protagonismo: pd.DataFrame,
+                               analises_combinadas: Dict, trace, enfileirar: bool = True) -> tuple:
+        """
+        Nível de uma marca em uma notícia pela DeepSeek (análise combinada ou por marca)
+        
+        Args:
+            pendente: Notícia/marca (textos, canais, content_check, porta-vozes, marcas do canal)
+            analises_combinadas: Respostas da análise combinada por posição da notícia
+            trace: Rastro da notícia
+            enfileirar: Falha transitória vai para a fila de repetição (nível provisório 'Erro na API');
+                        False retorna _ERRO_API_TRANSITORIO para quem está repetindo a chamada
+        
+        Returns:
+            Tupla (nível detectado, chamadas feitas)
+        """
+        marca = pendente['marca']
+        posicao = pendente['posicao']
+        nivel_detectado = None
+        chamadas = 0
+        caminho = CAMINHO_CACHE
+        
+        # Análise combinada: níveis de todas as marcas do canal + marcas mencionadas
+        if self.brand_extractor is not None:
+            if posicao not in analises_combinadas:
+                with profile_section('protagonismo.deepseek'):
+                    analises_combinadas[posicao] = self._analyze_combined(
+                        pendente['titulo'], pendente['conteudo'], pendente['texto'],
+                        pendente['marcas_no_canal'], pendente['noticia_id'], pendente['content_check'],
+                        marca_origem=marca
+                    ) or False
+                trace.mark('deepseek')
+                chamadas += 1
+                caminho = CAMINHO_LLM
+            analise_combinada = analises_combinadas[posicao]
+            if analise_combinada:
+                nivel_detectado = analise_combinada['niveis'].get(marca)
+                if nivel_detectado is not None:
+                    self.accounting.record_decision(marca, caminho)
+        
+        # Faz análise completa com DeepSeek (ou marca ausente da resposta combinada)
+        if nivel_detectado is None:
+            with profile_section('protagonismo.deepseek'):
+                nivel_detectado = self._analyze_single_news_marca(
+                    pendente['texto'], marca, df_protagonismo, pendente['noticia_id'],
+                    pendente['canais'], pendente['content_check'], pendente['porta_vozes']
+                )
+            trace.mark('deepseek')
+            chamadas += 1
+            if nivel_detectado == _ERRO_API_TRANSITORIO:
+                # Decisão registrada quando a repetição for concluída
+                if enfileirar:
+                    self.retry_queue.add(pendente)
+                    nivel_detectado = ERRO_API
+                return nivel_detectado, chamadas
+            self.accounting.record_decision(
+                marca, CAMINHO_LLM if nivel_detectado in NIVEIS_VALIDOS else CAMINHO_FALLBACK
+            )
+        
+        return nivel_detectado, chamadas
+    
+    def _needs_call(self, pendente: Dict, analises_combinadas: Dict) -> bool:
+        """Indica se o nível ainda depende de uma chamada (e não da análise combinada já feita)"""
+        analise_combinada = analises_combinadas.get(pendente['posicao'])
+        return not (self.brand_extractor is not None and analise_combinada
+                    and pendente['marca'] in analise_combinada['niveis'])
+    
+    def _rule_based_level(self, pendente: Dict) -> str:
+        """
+        Nível determinístico por contagem de ocorrências (orçamento esgotado)
+        Mesmas faixas da classificação automática, inclusive o upgrade de Citação (1-2
+        ocorrências) para Conteúdo quando a notícia cita porta-voz da marca; a marca presente
+        no texto é no mínimo Citação
+        """
+        contagem = pendente['contagem']
+        if contagem >= 5:
+            return 'Nível 1'
+        if contagem >= 3:
+            return 'Nível 2'
+        if contagem >= 1 and pendente['marca'] in MARCAS_COM_PORTA_VOZES and pendente['porta_vozes']:
+            return 'Nível 2'
+        if contagem >= 1 or (pendente['content_check'] or {}).get('should_be_minimum_citation'):
+            return 'Nível 3'
+        return 'Nenhum Nível Encontrado'
+    
+    def _run_pending_by_priority(self, pendentes: List[Dict], resultado_df: pd.DataFrame,
+                                 df_protagonismo: pd.DataFrame, analises_combinadas: Dict) -> tuple:
+        """
+        Executa as análises pela DeepSeek adiadas no modo orçamento
+        
+        Prioridade: marca no título, depois mais ocorrências da marca, depois a ordem das notícias.
+        Esgotado o prazo ou o máximo de chamadas, os pares restantes recebem o nível por regra,
+        sinalizado na coluna COLUNA_NIVEL_POR_REGRA. Cada par gera um rastro próprio da notícia.
+        
+        Returns:
+            Tupla (chamadas feitas, níveis por regra)
+        """
+        pendentes.sort(key=lambda pendente: (
+            not re.search(r'\b' + re.escape(pendente['marca']) + r'\b', pendente['titulo'], re.IGNORECASE),
+            -pendente['contagem'],
+            pendente['posicao']
+        ))
+        self.logger.info(f"Modo orçamento: {len(pendentes)} análises pela DeepSeek por prioridade "
+                         f"(orçamento: {self.budget.to_dict()})")
+        
+        chamadas = 0
+        niveis_por_regra = 0
+        for pendente in pendentes:
+            marca = pendente['marca']
+            trace = self.tracer.begin(pendente['noticia_id'])
+            trace.marcas = [marca]
+            mask = resultado_df['Id'] == pendente['noticia_id']
+            
+            if self._needs_call(pendente, analises_combinadas) and not self.budget.allows():
+                nivel_detectado = self._apply_rule_level(pendente, resultado_df, mask)
+                niveis_por_regra += 1
+                self.logger.debug("Orçamento esgotado (%s) - Notícia ID %s, Marca %s: nível por regra %s",
+                                  self.budget.esgotado_por, pendente['noticia_id'], marca, nivel_detectado)
+            else:
+                nivel_detectado, feitas = self._resolve_with_deepseek(
+                    pendente, df_protagonismo, analises_combinadas, trace
+                )
+                self.budget.consume(feitas)
+                chamadas += feitas
+            
+            resultado_df.loc[mask, f'Nivel de Protagonismo {marca}'] = nivel_detectado
+            trace.mark('montagem')
+        
+        if niveis_por_regra:
+            self.logger.warning(f"Orçamento esgotado ({self.budget.esgotado_por}): {niveis_por_regra} "
+                                f"nível(is) definido(s) por regra (coluna '{COLUNA_NIVEL_POR_REGRA}')")
+        return chamadas, niveis_por_regra
+    
+    def _apply_rule_level(self, pendente: Dict, resultado_df: pd.DataFrame, mask) -> str:
+        """
+        Nível por regra de um par sem orçamento, sinalizado na coluna COLUNA_NIVEL_POR_REGRA
+        Como na classificação automática, preenche a coluna 'Porta-Voz {marca}'
+        """
+        marca = pendente['marca']
+        self.accounting.record_decision(marca, CAMINHO_FALLBACK)
+        marcas_por_regra = resultado_df.loc[mask, COLUNA_NIVEL_POR_REGRA].iloc[0]
+        resultado_df.loc[mask, COLUNA_NIVEL_POR_REGRA] = (
+            f"{marcas_por_regra}, {marca}" if marcas_por_regra else marca
+        )
+        if marca in MARCAS_COM_PORTA_VOZES and pendente['porta_vozes']:
+            resultado_df.loc[mask, f'Porta-Voz {marca}'] = ', '.join(pendente['porta_vozes'])
+        return self._rule_based_level(pendente)
+    
+    def _retry_failed_calls(self, resultado_df: pd.DataFrame, df_protagonismo: pd.DataFrame,
+                            analises_combinadas: Dict) -> int:
+        """
+        Repete as chamadas que falharam por erro transitório (timeout, conexão, 429, 5xx)
+        
+        A fila é drenada depois de todas as notícias, em rodadas com espera exponencial, sem
+        atrasar o fluxo principal. Apenas os pares que falham em todas as tentativas (ou com
+        erro não transitório) ficam com 'Erro na API'; no modo orçamento, esgotado o orçamento,
+        recebem o nível por regra.
+        
+        Returns:
+            Chamadas feitas
+        """
+        self.logger.warning(f"Repetindo {len(self.retry_queue)} chamada(s) com falha transitória "
+                            f"(até {self.retry_queue.max_tentativas} rodada(s) com espera exponencial)")
+        chamadas = 0
+        
+        def tentar(pendente: Dict) -> bool:
+            nonlocal chamadas
+            marca = pendente['marca']
+            trace = self.tracer.begin(pendente['noticia_id'])
+            trace.marcas = [marca]
+            mask = resultado_df['Id'] == pendente['noticia_id']
+            
+            if self.budget.ativo and not self.budget.allows():
+                nivel_detectado = self._apply_rule_level(pendente, resultado_df, mask)
+            else:
+                nivel_detectado, feitas = self._resolve_with_deepseek(
+                    pendente, df_protagonismo, analises_combinadas, trace, enfileirar=False
+                )
+                self.budget.consume(feitas)
+                chamadas += feitas
+                if nivel_detectado == _ERRO_API_TRANSITORIO:
+                    trace.mark('montagem')
+                    return False
+            
+            resultado_df.loc[mask, f'Nivel de Protagonismo {marca}'] = nivel_detectado
+            trace.mark('montagem')
+            return True
+        
+        for pendente in self.retry_queue.drain(tentar):
+            self.accounting.record_decision(pendente['marca'], CAMINHO_FALLBACK)
+            self.logger.error(f"Falha permanente na chamada para notícia ID {pendente['noticia_id']}, "
+                              f"marca {pendente['marca']}: {ERRO_API}")
+
+        return chamadas
+    
     def _build_specific_requirements(self, content_check: dict, marca: str) -> str:
         """
         Constrói os requisitos específicos baseado no content_check ATUAL
@@ -752,41 +1201,7 @@ class ProtagonismoAnalyzer:
 
         NÍVEIS DE PROTAGONISMO:
 
-        **Nível 1 - Dedicada:**
-        - A marca é o foco principal da matéria
-        - Destacada no título, subtítulo ou lead
-        - Exemplo: "Bradesco revoluciona o mercado financeiro com nova tecnologia"
-
-        **Nível 2 - Conteúdo:**
-        - Menção significativa da marca, mas sem ser o foco ou referência primária
-        - A marca tem papel relevante mas não é o protagonista principal da notícia
-        
-        a) **Comparação equilibrada com concorrentes:**
-        - A marca é mencionada em matérias onde recebe o mesmo peso e importância dos concorrentes
-        - Ambas as marcas são tratadas de forma equilibrada na narrativa
-        - A marca não é secundária ou tangencial, mas co-protagonista da matéria
-        - Exemplo: "Goldman Sachs eleva recomendação de Bradesco a neutra; corta Santander Brasil para venda"
-        - Exemplo: "O Santander saiu na frente no dia 30 de abril, com um resultado dentro do esperado. Agora, os holofotes se voltam para Bradesco e Itaú."
-
-        **Nível 3 - Citação:**
-        Este nível abrange três situações distintas:
-        
-        a) **Comparação com concorrentes (marca claramente secundária):**
-        - A marca é mencionada em matérias claramente focadas em outro concorrente
-        - A marca tem papel evidentemente secundário na narrativa
-        - A matéria é sobre o concorrente, apenas citando a marca para comparação
-        - Exemplo: Matéria sobre "Resultados do Itaú superam expectativas" que apenas menciona Bradesco para comparar estratégias
-        
-        b) **Referência setorial:**
-        - A marca ou seus porta-vozes são citados como referência no setor ou sobre tema específico
-        - Através de declarações ou dados fornecidos pela empresa
-        - Exemplo: "Segundo o Bradesco, o número de empréstimos em São Paulo cresceu 20% no último ano"
-        
-        c) **Menção tangencial:**
-        - Menção onde a presença da marca não é crucial para a matéria
-        - Exemplo: "Empresas inovadoras como iFood, Nubank, Bradesco, e outras..."
-
-        ATENÇÃO - REGRAS ESPECIAIS PARA MARCAS COMPOSTAS:
+{CRITERIOS_NIVEIS_PROTAGONISMO}        ATENÇÃO - REGRAS ESPECIAIS PARA MARCAS COMPOSTAS:
         
         - Se analisando "Bradesco": APENAS conte "Bradesco" quando aparecer ISOLADO. NÃO conte "Bradesco BBI", "Bradesco Asset", ou outras variações compostas.
         - Se analisando "BBI": conte "BBI" isolado E "Bradesco BBI".  
@@ -823,37 +1238,157 @@ class ProtagonismoAnalyzer:
         """
 
         try:
-            payload = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "Você é um analista especializado em classificar o nível de protagonismo de marcas em notícias. Use os critérios fornecidos de forma rigorosa mas inclusiva - qualquer menção da marca deve ser pelo menos Nível 3 (Citação). Considere verificações específicas quando informadas."
-                    },
-                    {"role": "user", "content": prompt_texto}
-                ],
-                "temperature": 0.1
-            }
-            
-            response = requests.post(self.config.api_url, headers=self.headers, json=payload)
-            response.raise_for_status()
+            messages = [
+                {
+                    "role": "system", 
+                    "content": "Você é um analista especializado em classificar o nível de protagonismo de marcas em notícias. Use os critérios fornecidos de forma rigorosa mas inclusiva - qualquer menção da marca deve ser pelo menos Nível 3 (Citação). Considere verificações específicas quando informadas."
+                },
+                {"role": "user", "content": prompt_texto}
+            ]
             
-            nivel_detectado = response.json()['choices'][0]['message']['content'].strip()
+            # Resposta curta: limite de tokens, parada na linha em branco e, em stream,
+            # conexão encerrada assim que o nível é reconhecido
+            params = {'stop': PARADAS_NIVEL}
+            if self.config.protagonismo_max_tokens:
+                params['max_tokens'] = self.config.protagonismo_max_tokens
+            if self.config.deepseek_stream:
+                params['stream'] = True
+            resposta = self.deepseek_client.chat(
+                messages, temperature=0.1,
+                contexto={'etapa': 'protagonismo', 'noticia_id': noticia_id, 'marca': marca},
+                encerrar_quando=extract_level, **params
+            )
+            nivel_detectado = resposta['content']
             nivel_detectado_limpo = nivel_detectado.replace(":", "").strip()
+            if nivel_detectado_limpo not in NIVEIS_VALIDOS:
+                # Resposta com texto além do nível (ou cortada pelo limite de tokens)
+                nivel_detectado_limpo = extract_level(nivel_detectado) or nivel_detectado_limpo
+            self.accounting.record_request(marca, CAMINHO_LLM, resposta['usage'])
             
-            # LOG ESPECÍFICO para controle de chamadas DeepSeek
-            self.logger.info(f"DeepSeek API → ID: {noticia_id} | Marca: {marca} | Resultado: {nivel_detectado_limpo}")
+            # LOG ESPECÍFICO para controle de chamadas DeepSeek (campos estruturados em deepseek_calls.jsonl)
+            self.logger.info("DeepSeek API → ID: %s | Marca: %s | Resultado: %s", noticia_id, marca, nivel_detectado_limpo)
             
             return nivel_detectado_limpo
             
         except requests.exceptions.RequestException as e:
+            self.accounting.record_request(marca, CAMINHO_FALLBACK)
+            if is_transient_error(e):
+                self.logger.warning(f"Falha transitória na requisição para notícia ID {noticia_id}, "
+                                    f"marca {marca} (será repetida): {str(e)}")
+                return _ERRO_API_TRANSITORIO
             self.logger.error(f"Erro na requisição para notícia ID {noticia_id}, marca {marca}: {str(e)}")
-            return 'Erro na API'
+            return ERRO_API
         except Exception as e:
             self.logger.error(f"Erro inesperado ao processar notícia ID {noticia_id}, marca {marca}: {str(e)}")
             return 'Erro de Processamento'
     
     
+    def _analyze_combined(self, titulo: str, conteudo: str, texto_noticia: str,
+                          marcas: List[str], noticia_id, content_check: dict = None,
+                          marca_origem: Optional[str] = None) -> Optional[Dict]:
+        """
+        Análise combinada: uma única chamada retorna as marcas mencionadas na notícia e o nível
+        de protagonismo de cada marca informada
+        
+        As marcas mencionadas são registradas no cache do extrator de marcas, de forma que a
+        extração do mês reaproveite a resposta sem nova chamada
+        
+        Args:
+            marca_origem: Marca que motivou a chamada (recebe os tokens na contabilidade)
+        
+        Returns:
+            Dicionário {'marcas': [...], 'niveis': {marca: nível}} ou None em caso de falha
+            (as marcas são então analisadas individualmente)
+        """
+        marca_origem = marca_origem or marcas[0]
+        # Citação mínima para Bradesco só se a marca aparece isolada (mesma regra da análise por marca)
+        requisitos_especificos = ""
+        if 'Bradesco' in marcas and self._count_marca_occurrences_fixed(
+                'Bradesco', titulo, conteudo, self._get_marcas_compostas_para_marca_base('Bradesco')) > 0:
+            requisitos_especificos = self._build_specific_requirements(content_check, 'Bradesco')
+        
+        lista_marcas = ', '.join(f'"{marca}"' for marca in marcas)
+        prompt_texto = f"""
+        Analise o texto de notícia a seguir e realize DUAS tarefas.
+
+        TAREFA 1 - MARCAS MENCIONADAS
+        Identifique TODAS as marcas/empresas mencionadas no texto.
+
+{INSTRUCOES_EXTRACAO_MARCAS}
+
+        TAREFA 2 - NÍVEL DE PROTAGONISMO
+        Determine o nível de protagonismo de cada uma destas marcas: {lista_marcas}
+
+        NÍVEIS DE PROTAGONISMO:
+
+{CRITERIOS_NIVEIS_PROTAGONISMO}
+        REGRAS ESPECIAIS PARA MARCAS COMPOSTAS (prioridade absoluta):
+        - "Bradesco": conte APENAS quando aparecer ISOLADO. NÃO conte "Bradesco BBI", "Bradesco Asset" ou outras variações.
+        - "BBI": conte "BBI" isolado E "Bradesco BBI".
+        - "Bradesco Asset": conte APENAS "Bradesco Asset" completo.
+        - "Ágora": conte "Ágora" isolado.
+        - "Itaú": conte APENAS quando aparecer ISOLADO. NÃO conte "Itaú Unibanco" ou outras variações.
+        - Se uma marca aparecer APENAS como parte de marcas compostas, o nível dela é "Nenhum Nível Encontrado".
+        - Comparações equilibradas (ex.: "eleva X e corta Y", ambas as marcas no título com ações equivalentes) = "Nível 2".
+        {requisitos_especificos}
+        FORMATO DE RESPOSTA:
+        Responda APENAS com um objeto JSON, sem explicações:
+        {{"marcas": ["Marca1", "Marca2"], "protagonismo": {{"Marca": "Nível 1"}}}}
+        Em "protagonismo", use para cada marca informada SOMENTE: "Nível 1", "Nível 2", "Nível 3" ou "Nenhum Nível Encontrado".
+
+        Texto da Notícia:
+        {texto_noticia}
+        """
+        
+        try:
+            messages = [
+                {
+                    "role": "system",
+                    "content": "Você é um analista especializado em identificar marcas/empresas mencionadas em notícias e classificar o nível de protagonismo de marcas. Use os critérios fornecidos de forma rigorosa mas inclusiva - qualquer menção da marca deve ser pelo menos Nível 3 (Citação). Responda sempre em JSON."
+                },
+                {"role": "user", "content": prompt_texto}
+            ]
+            
+            resposta = self.deepseek_client.chat(
+                messages, temperature=0.1,
+                contexto={'etapa': 'combinada', 'noticia_id': noticia_id, 'marcas': marcas}
+            )
+            conteudo_resposta = resposta['content']
+            # Tokens contados mesmo que a resposta seja inválida (consumidos de qualquer forma)
+            self.accounting.record_request(marca_origem, CAMINHO_LLM, resposta['usage'])
+            
+            # Remove bloco de código markdown, se presente
+            if conteudo_resposta.startswith('```'):
+                conteudo_resposta = conteudo_resposta.strip('`')
+                if conteudo_resposta.startswith('json'):
+                    conteudo_resposta = conteudo_resposta[4:]
+            
+            resultado = json.loads(conteudo_resposta)
+            marcas_mencionadas = resultado.get('marcas')
+            niveis = resultado.get('protagonismo')
+            if not isinstance(marcas_mencionadas, list) or not isinstance(niveis, dict):
+                raise ValueError("Resposta sem as chaves 'marcas' e 'protagonismo'")
+            
+            # Mantém apenas níveis válidos das marcas solicitadas
+            niveis_validos = {}
+            for marca in marcas:
+                nivel = str(niveis.get(marca, '')).replace(":", "").strip()
+                if nivel in NIVEIS_VALIDOS:
+                    niveis_validos[marca] = nivel
+            
+            self.brand_extractor.record_brands(titulo, conteudo, marcas_mencionadas)
+            
+            self.logger.info("DeepSeek API (combinada) → ID: %s | Níveis: %s | Marcas mencionadas: %d",
+                             noticia_id, niveis_validos, len(marcas_mencionadas))
+            return {'marcas': marcas_mencionadas, 'niveis': niveis_validos}
+            
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Erro na requisição combinada para notícia ID {noticia_id}: {str(e)}")
+            self.accounting.record_request(marca_origem, CAMINHO_FALLBACK)
+        except Exception as e:
+            self.logger.warning(f"Resposta combinada inválida para notícia ID {noticia_id}: {str(e)}")
+        return None
+    
     def _correct_missing_classifications_largo(self, df_resultados: pd.DataFrame, final_df: pd.DataFrame) -> pd.DataFrame:
         """
         Corrige classificações faltantes ou incorretas baseado na contagem de ocorrências
@@ -935,8 +1470,8 @@ class ProtagonismoAnalyzer:
                             df_resultados.loc[index, ocorrencias_col] = contagem
                             correcoes_realizadas += 1
                         else:
-                            self.logger.debug(f"Mantendo classificação - Notícia ID {noticia_id}, Marca {marca}: "
-                                            f"marca não encontrada no texto")
+                            self.logger.debug("Mantendo classificação - Notícia ID %s, Marca %s: "
+                                              "marca não encontrada no texto", noticia_id, marca)
                         
                         # ═══ APLICAR PORTA-VOZES (apenas para marcas COM classificação válida) ═══
                         if marca in ['Bradesco', 'Ágora', 'Bradesco Asset', 'BBI']:
@@ -954,14 +1489,16 @@ class ProtagonismoAnalyzer:
                                     if portavoz_col in df_resultados.columns:
                                         porta_vozes_str = ', '.join(porta_vozes_noticia)
                                         df_resultados.loc[index, portavoz_col] = porta_vozes_str
-                                        self.logger.info(f"Porta-vozes aplicados para {marca} (classificação: {nivel_atual}): {porta_vozes_str}")
+                                        self.logger.info("Porta-vozes aplicados para %s (classificação: %s): %s",
+                                                         marca, nivel_atual, porta_vozes_str)
                                     
                                     # Upgrade para Conteúdo só se for Citação por contagem 
                                     if 'contagem' in locals() and contagem >= 1 and contagem <= 2:
                                         df_resultados.loc[index, nivel_col] = 'Nível 2'  # Upgrade para Conteúdo
-                                        self.logger.info(f"Upgrade para Conteúdo por porta-voz: {marca}")
+                                        self.logger.info("Upgrade para Conteúdo por porta-voz: %s", marca)
                             else:
-                                self.logger.debug(f"Porta-voz NÃO aplicado para {marca}: sem classificação válida (nível atual: {nivel_atual})")
+                                self.logger.debug("Porta-voz NÃO aplicado para %s: sem classificação válida (nível atual: %s)",
+                                                  marca, nivel_atual)
             else:
                 self.logger.warning(f"Texto não encontrado para notícia ID {noticia_id}")
         
@@ -1041,11 +1578,14 @@ class ProtagonismoAnalyzer:
             base_path = str(self.config.arq_protagonismo_result).replace('.xlsx', f'_{timestamp}.xlsx')
             
             # Salva arquivo com timestamp
-            df_resultados.to_excel(base_path, index=False)
+            with profile_section('xlsx.protagonismo'):
+                df_resultados.to_excel(base_path, index=False)
             self.logger.info(f"Resultados de protagonismo salvos: {base_path}")
+            self.catalog.register(base_path, TIPO_PROTAGONISMO)
             
             # Também salva arquivo padrão para compatibilidade com outras etapas
-            df_resultados.to_excel(self.config.arq_protagonismo_result, index=False)
+            with profile_section('xlsx.protagonismo'):
+                df_resultados.to_excel(self.config.arq_protagonismo_result, index=False)
             self.logger.info(f"Arquivo padrão salvo: {self.config.arq_protagonismo_result}")
             
             # Log final da estrutura salva
@@ -0,0 +1,260 @@
+"""
+Perfil de desempenho das execuções do pipeline
+Mede tempo de relógio e de CPU, memória e linhas de entrada/saída de cada etapa, acumula
+o tempo de seções internas (requisições, normalização, escrita de planilhas, chamadas à
+DeepSeek) e grava um relatório JSON por execução (run_report_{run_id}.json), permitindo
+comparar execuções e identificar regressões.
+
+Captura opcional de perfil detalhado (PERFIL_EXECUCAO):
+- cprofile: estatísticas do cProfile da thread do pipeline (run_profile_{run_id}.prof)
+- pyinstrument: perfil amostral (run_profile_{run_id}.html), se o pacote estiver instalado
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.config_manager import ConfigManager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Profiler da execução em andamento (as execuções do pipeline são serializadas pela trava)
+_ativo: Optional["RunProfiler"] = None
+
+
+def _pico_rss_mb() -> Optional[float]:
+    """Pico de memória residente do processo (MB), se disponível na plataforma"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(pico / divisor, 1)
+
+
+def add_section_time(nome: str, segundos: float):
+    """Soma um tempo já medido a uma seção do profiler da execução em andamento (se houver)"""
+    profiler = _ativo
+    if profiler is not None:
+        profiler.add_section_time(nome, segundos)
+
+
+@contextmanager
+def profile_section(nome: str):
+    """
+    Acumula o tempo de uma seção interna no profiler da execução em andamento
+
+    Sem execução em andamento (ex.: módulos usados isoladamente), apenas executa o bloco
+    """
+    profiler = _ativo
+    if profiler is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add_section_time(nome, time.perf_counter() - inicio)
+
+
+class RunProfiler:
+    """
+    Coleta de métricas de uma execução do pipeline
+
+    - stage(): context manager de uma etapa (pode rodar em paralelo com outras etapas);
+      o dicionário retornado recebe 'linhas_saida' e métricas extras da etapa
+    - add_section_time(): tempo acumulado de seções internas (somado entre threads)
+    - finish(): grava o relatório JSON e, se ativo, o perfil detalhado
+    """
+
+    def __init__(self, config_manager: ConfigManager, modo_perfil: Optional[str] = None,
+                 tracemalloc_ativo: Optional[bool] = None):
+        self.config = config_manager
+        self.logger = logging.getLogger(__name__)
+        self.run_id = config_manager.run_id
+        self.modo_perfil = (config_manager.perfil_execucao if modo_perfil is None else modo_perfil) or None
+        self.tracemalloc_ativo = (config_manager.perfil_tracemalloc
+                                  if tracemalloc_ativo is None else tracemalloc_ativo)
+
+        self.etapas: List[Dict] = []
+        self.secoes: Dict[str, Dict] = {}
+        self.extras: Dict = {}
+        self._lock = threading.Lock()
+        self._inicio: Optional[float] = None
+        self._inicio_cpu: Optional[float] = None
+        self._iniciado_em: Optional[str] = None
+        self._perfilador = None
+        self._iniciou_tracemalloc = False
+
+    def start(self):
+        """Inicia a coleta (e o perfil detalhado, se configurado) e ativa profile_section"""
+        global _ativo
+        self._iniciado_em = datetime.now().isoformat()
+        self._inicio = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+
+        if self.tracemalloc_ativo and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+
+        if self.modo_perfil == 'cprofile':
+            import cProfile
+            self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+        elif self.modo_perfil == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._perfilador = Profiler()
+                self._perfilador.start()
+            except ImportError:
+                self.logger.warning("PERFIL_EXECUCAO=pyinstrument, mas o pacote pyinstrument não está instalado")
+                self.modo_perfil = None
+        elif self.modo_perfil:
+            self.logger.warning(f"Modo de perfil desconhecido: {self.modo_perfil} (use cprofile ou pyinstrument)")
+            self.modo_perfil = None
+
+        _ativo = self
+
+    @contextmanager
+    def stage(self, nome: str, linhas_entrada: Optional[int] = None):
+        """
+        Mede uma etapa do pipeline
+
+        Args:
+            nome: Nome da etapa (mesmos nomes dos eventos de progresso)
+            linhas_entrada: Quantidade de linhas recebidas pela etapa
+
+        Yields:
+            Dicionário da etapa (preencha 'linhas_saida' e métricas extras)
+        """
+        registro = {'etapa': nome, 'linhas_entrada': linhas_entrada, 'linhas_saida': None}
+        inicio = time.perf_counter()
+        inicio_cpu = time.thread_time()
+        if self._iniciou_tracemalloc and not self._etapas_em_andamento():
+            tracemalloc.reset_peak()
+        registro['_em_andamento'] = True
+        with self._lock:
+            self.etapas.append(registro)
+        try:
+            yield registro
+        except Exception as e:
+            registro['erro'] = str(e)
+            raise
+        finally:
+            registro.pop('_em_andamento', None)
+            registro['inicio_s'] = round(inicio - self._inicio, 3) if self._inicio is not None else 0.0
+            registro['duracao_s'] = round(time.perf_counter() - inicio, 3)
+            registro['cpu_thread_s'] = round(time.thread_time() - inicio_cpu, 3)
+            registro['pico_rss_mb'] = _pico_rss_mb()
+            if self._iniciou_tracemalloc:
+                registro['pico_tracemalloc_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+
+    def _etapas_em_andamento(self) -> bool:
+        with self._lock:
+            return any(etapa.get('_em_andamento') for etapa in self.etapas)
+
+    def add_section_time(self, nome: str, segundos: float):
+        """Soma o tempo de uma seção interna (chamado de qualquer thread)"""
+        with self._lock:
+            secao = self.secoes.setdefault(nome, {'chamadas': 0, 'tempo_s': 0.0})
+            secao['chamadas'] += 1
+            secao['tempo_s'] += segundos
+
+    def section_time(self, nome: str) -> float:
+        """Tempo acumulado (s) de uma seção interna até o momento"""
+        with self._lock:
+            return self.secoes.get(nome, {}).get('tempo_s', 0.0)
+
+    def finish(self, arquivo_final: Optional[str] = None, erro: Optional[str] = None) -> Optional[Path]:
+        """
+        Encerra a coleta e grava o relatório da execução
+
+        Falhas na gravação do relatório nunca interrompem o processamento - apenas são logadas
+
+        Returns:
+            Caminho do relatório JSON ou None em caso de falha
+        """
+        global _ativo
+        if _ativo is self:
+            _ativo = None
+
+        arquivo_perfil = self._stop_profiler()
+        pico_tracemalloc = None
+        if self._iniciou_tracemalloc:
+            # O pico é reiniciado a cada etapa: o da execução é o maior entre as etapas
+            picos = [etapa.get('pico_tracemalloc_mb') or 0 for etapa in self.etapas]
+            picos.append(round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1))
+            pico_tracemalloc = max(picos)
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+        relatorio = {
+            'run_id': self.run_id,
+            'iniciado_em': self._iniciado_em,
+            'finalizado_em': datetime.now().isoformat(),
+            'duracao_s': round(time.perf_counter() - self._inicio, 3) if self._inicio is not None else None,
+            'cpu_processo_s': round(time.process_time() - self._inicio_cpu, 3) if self._inicio_cpu is not None else None,
+            'pico_rss_mb': _pico_rss_mb(),
+            'pico_tracemalloc_mb': pico_tracemalloc,
+            'arquivo_final': arquivo_final,
+            'erro': erro,
+            'etapas': self.etapas,
+            'secoes': {nome: {'chamadas': secao['chamadas'], 'tempo_s': round(secao['tempo_s'], 3)}
+                       for nome, secao in sorted(self.secoes.items())},
+            'perfil': str(arquivo_perfil) if arquivo_perfil else None,
+            **self.extras
+        }
+
+        try:
+            arquivo = self.config.pasta_marca_setor / f"run_report_{self.run_id}.json"
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, ensure_ascii=False, indent=2, default=str)
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o relatório da execução: {str(e)}")
+            return None
+
+        self._log_summary(relatorio)
+        self.logger.info(f"Relatório da execução salvo em: {arquivo}")
+        return arquivo
+
+    def _stop_profiler(self) -> Optional[Path]:
+        """Encerra o perfil detalhado e grava o arquivo correspondente"""
+        if self._perfilador is None:
+            return None
+        perfilador, self._perfilador = self._perfilador, None
+        try:
+            if self.modo_perfil == 'cprofile':
+                perfilador.disable()
+                arquivo = self.config.pasta_marca_setor / f"run_profile_{self.run_id}.prof"
+                perfilador.dump_stats(str(arquivo))
+            else:
+                perfilador.stop()
+                arquivo = self.config.pasta_marca_setor / f"run_profile_{self.run_id}.html"
+                arquivo.write_text(perfilador.output_html(), encoding='utf-8')
+            self.logger.info(f"Perfil detalhado ({self.modo_perfil}) salvo em: {arquivo}")
+            return arquivo
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o perfil detalhado: {str(e)}")
+            return None
+
+    def _log_summary(self, relatorio: Dict):
+        """Resumo das etapas no log"""
+        self.logger.info(f"Perfil da execução {self.run_id}: {relatorio['duracao_s']}s "
+                         f"(CPU {relatorio['cpu_processo_s']}s, pico RSS {relatorio['pico_rss_mb']} MB)")
+        for etapa in self.etapas:
+            self.logger.info(
+                f"  {etapa['etapa']:<13} {etapa.get('duracao_s', 0):>8.2f}s  "
+                f"CPU {etapa.get('cpu_thread_s', 0):>7.2f}s  "
+                f"linhas {etapa['linhas_entrada']} → {etapa['linhas_saida']}"
+            )
+        for nome, secao in relatorio['secoes'].items():
+            self.logger.info(f"  · {nome:<24} {secao['tempo_s']:>8.2f}s em {secao['chamadas']} chamada(s)")
@@ -9,11 +9,35 @@ from .file_utils import (
     get_file_size,
     clean_temp_files
 )
+from .excel_writer import write_final_workbooks
+from .progress import ProgressCallback, notify_progress
+from .file_lock import FileLock
+from .log_tail import LogTailer
+from .rate_limiter import RateLimiter
+from .jsonl_cache import JsonlCache
+from .gazetteer import Gazetteer, fold_text
+from .usage_accounting import UsageAccounting
+from .call_budget import CallBudget, parse_deadline
+from .retry_queue import RetryQueue, is_transient_error
 
 __all__ = [
     'create_directories',
     'setup_download_button', 
     'validate_file_exists',
     'get_file_size',
-    'clean_temp_files'
+    'clean_temp_files',
+    'write_final_workbooks',
+    'ProgressCallback',
+    'notify_progress',
+    'FileLock',
+    'LogTailer',
+    'RateLimiter',
+    'JsonlCache',
+    'Gazetteer',
+    'fold_text',
+    'UsageAccounting',
+    'CallBudget',
+    'parse_deadline',
+    'RetryQueue',
+    'is_transient_error'
 ]
\ No newline at end of file
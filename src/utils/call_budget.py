@@ -0,0 +1,76 @@
+"""
+Orçamento de chamadas à DeepSeek: prazo (horário) e/ou máximo de chamadas
+"""
+
+import threading
+from datetime import datetime, time as dt_time
+from typing import Dict, Optional
+
+
+def parse_deadline(texto: Optional[str], agora: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Converte o prazo configurado em data/hora
+
+    Args:
+        texto: "HH:MM" (horário de hoje) ou data/hora ISO ("2025-01-31T09:00"); vazio = sem prazo
+
+    Raises:
+        ValueError: Formato inválido
+    """
+    texto = (texto or '').strip()
+    if not texto:
+        return None
+    agora = agora or datetime.now()
+    if 'T' not in texto and '-' not in texto:
+        return datetime.combine(agora.date(), dt_time.fromisoformat(texto))
+    return datetime.fromisoformat(texto)
+
+
+class CallBudget:
+    """
+    Prazo e máximo de chamadas de uma análise
+
+    - allows(): ainda há prazo e chamadas disponíveis (sempre True sem limites)
+    - consume(): contabiliza chamadas feitas
+
+    Args:
+        prazo: Horário limite para novas chamadas (None = sem prazo)
+        max_chamadas: Máximo de chamadas (None ou 0 = sem limite)
+    """
+
+    def __init__(self, prazo: Optional[datetime] = None, max_chamadas: Optional[int] = None):
+        self.prazo = prazo
+        self.max_chamadas = max_chamadas or None
+        self.chamadas = 0
+        # Chamadas não autorizadas (pares que receberam o nível por regra)
+        self.recusadas = 0
+        self.esgotado_por: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self.prazo is not None or self.max_chamadas is not None
+
+    def allows(self) -> bool:
+        with self._lock:
+            if self.max_chamadas is not None and self.chamadas >= self.max_chamadas:
+                self.esgotado_por = self.esgotado_por or 'max_chamadas'
+            elif self.prazo is not None and datetime.now() >= self.prazo:
+                self.esgotado_por = self.esgotado_por or 'prazo'
+            else:
+                return True
+            self.recusadas += 1
+            return False
+
+    def consume(self, chamadas: int = 1):
+        with self._lock:
+            self.chamadas += chamadas
+
+    def to_dict(self) -> Dict:
+        return {
+            'prazo': self.prazo.isoformat(timespec='seconds') if self.prazo else None,
+            'max_chamadas': self.max_chamadas,
+            'chamadas': self.chamadas,
+            'recusadas': self.recusadas,
+            'esgotado_por': self.esgotado_por
+        }
@@ -0,0 +1,183 @@
+"""
+Escrita de planilhas Excel em modo streaming (xlsxwriter constant_memory)
+Gera o arquivo simples e o arquivo com hyperlinks em uma única passagem pelo DataFrame
+"""
+
+import logging
+import math
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import pandas as pd
+import xlsxwriter
+
+# Limite do Excel para hyperlinks por planilha
+MAX_URLS_POR_PLANILHA = 65530
+
+# Tamanho máximo de URL aceito pelo write_url do xlsxwriter
+MAX_TAMANHO_URL = 2079
+
+# Tamanho máximo de string literal dentro de uma fórmula (=HYPERLINK)
+MAX_TAMANHO_URL_FORMULA = 255
+
+# Formato de cabeçalho equivalente ao usado pelo pandas.to_excel
+FORMATO_CABECALHO = {
+    'bold': True,
+    'border': 1,
+    'align': 'center',
+    'valign': 'top'
+}
+
+
+def _valor_celula(valor):
+    """
+    Converte um valor do DataFrame para um tipo aceito pelo xlsxwriter
+
+    Returns:
+        Valor convertido ou None quando a célula deve ficar em branco
+    """
+    if valor is None:
+        return None
+
+    if isinstance(valor, float) and (math.isnan(valor) or math.isinf(valor)):
+        return None
+
+    if isinstance(valor, pd.Timestamp):
+        return None if pd.isna(valor) else valor.to_pydatetime()
+
+    if valor is pd.NaT or valor is pd.NA:
+        return None
+
+    if isinstance(valor, (str, int, float, bool, datetime, date)):
+        return valor
+
+    # Tipos numpy e demais objetos
+    try:
+        if pd.isna(valor):
+            return None
+    except (TypeError, ValueError):
+        pass
+
+    if hasattr(valor, 'item'):
+        return valor.item()
+
+    return str(valor)
+
+
+def _criar_planilha(arquivo: str, sheet_name: str):
+    """
+    Cria workbook em modo constant_memory com os formatos padrão
+
+    Textos não são convertidos em hyperlinks nem em fórmulas: apenas a coluna de URL do
+    arquivo com hyperlinks recebe links (o Excel aceita até MAX_URLS_POR_PLANILHA por planilha)
+    """
+    workbook = xlsxwriter.Workbook(arquivo, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format(FORMATO_CABECALHO)
+    return workbook, worksheet, header_format
+
+
+def write_final_workbooks(df: pd.DataFrame,
+                          arquivo_simples: Optional[str] = None,
+                          arquivo_hyperlinks: Optional[str] = None,
+                          url_column: str = 'UrlVisualizacao',
+                          sheet_name: str = 'Sheet1') -> Dict[str, int]:
+    """
+    Escreve o arquivo simples e/ou o arquivo com hyperlinks percorrendo o DataFrame uma única vez
+
+    As linhas são gravadas em ordem no modo constant_memory do xlsxwriter, de forma que
+    apenas a linha corrente fica em memória. Na coluna de URL do arquivo com hyperlinks:
+    - até MAX_URLS_POR_PLANILHA URLs são gravadas com write_url
+    - acima do limite (ou URLs longas demais) usa fórmula =HYPERLINK
+    - URLs que não cabem em fórmula são gravadas como texto
+
+    Args:
+        df: DataFrame a ser gravado
+        arquivo_simples: Caminho do arquivo sem formatação (opcional)
+        arquivo_hyperlinks: Caminho do arquivo com hyperlinks (opcional)
+        url_column: Coluna que recebe os hyperlinks
+        sheet_name: Nome da planilha
+
+    Returns:
+        Dicionário com estatísticas da escrita (linhas, urls, formulas, textos)
+    """
+    logger = logging.getLogger(__name__)
+
+    if not arquivo_simples and not arquivo_hyperlinks:
+        raise ValueError("Informe ao menos um arquivo de saída")
+
+    stats = {'linhas': 0, 'urls': 0, 'formulas': 0, 'urls_texto': 0}
+
+    destinos = []
+    if arquivo_simples:
+        destinos.append(_criar_planilha(arquivo_simples, sheet_name))
+
+    planilha_links = None
+    url_format = None
+    if arquivo_hyperlinks:
+        planilha_links = _criar_planilha(arquivo_hyperlinks, sheet_name)
+        url_format = planilha_links[0].add_format({
+            'font_color': 'blue',
+            'underline': 1
+        })
+        destinos.append(planilha_links)
+
+    url_col_idx = df.columns.get_loc(url_column) if url_column in df.columns else None
+
+    try:
+        # Cabeçalho
+        for _, worksheet, header_format in destinos:
+            for col_idx, coluna in enumerate(df.columns):
+                worksheet.write_string(0, col_idx, str(coluna), header_format)
+
+        # Linhas (uma única passagem pelo DataFrame)
+        for row_idx, valores in enumerate(df.itertuples(index=False, name=None), start=1):
+            for col_idx, valor in enumerate(valores):
+                valor = _valor_celula(valor)
+
+                if valor is None:
+                    continue
+
+                for destino in destinos:
+                    worksheet = destino[1]
+
+                    if destino is planilha_links and col_idx == url_col_idx and str(valor).startswith('http'):
+                        _write_link(worksheet, row_idx, col_idx, str(valor), url_format, stats)
+                    elif isinstance(valor, str):
+                        worksheet.write_string(row_idx, col_idx, valor)
+                    else:
+                        worksheet.write(row_idx, col_idx, valor)
+
+            stats['linhas'] += 1
+    finally:
+        for workbook, _, _ in destinos:
+            workbook.close()
+
+    if stats['formulas'] or stats['urls_texto']:
+        logger.warning(
+            f"Limite de hyperlinks do Excel atingido: {stats['urls']} via write_url, "
+            f"{stats['formulas']} via =HYPERLINK, {stats['urls_texto']} gravadas como texto"
+        )
+
+    return stats
+
+
+def _write_link(worksheet, row_idx: int, col_idx: int, url: str, url_format, stats: Dict[str, int]):
+    """Grava um hyperlink respeitando os limites do Excel"""
+    if stats['urls'] < MAX_URLS_POR_PLANILHA and len(url) <= MAX_TAMANHO_URL:
+        worksheet.write_url(row_idx, col_idx, url, url_format, 'Link')
+        stats['urls'] += 1
+        return
+
+    url_formula = url.replace('"', '""')
+    if len(url_formula) <= MAX_TAMANHO_URL_FORMULA:
+        worksheet.write_formula(row_idx, col_idx, f'=HYPERLINK("{url_formula}","Link")', url_format, 'Link')
+        stats['formulas'] += 1
+    else:
+        worksheet.write_string(row_idx, col_idx, url)
+        stats['urls_texto'] += 1
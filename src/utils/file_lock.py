@@ -0,0 +1,90 @@
+"""
+Trava de arquivo entre processos (fcntl no Linux/Docker, msvcrt no Windows)
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Trava exclusiva baseada em arquivo, liberada automaticamente se o processo terminar
+
+    Uso:
+        with FileLock("dados/.pipeline.lock"):
+            ...
+    """
+
+    def __init__(self, path, poll_interval: float = 1.0):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Adquire a trava
+
+        Args:
+            blocking: Se False, retorna imediatamente quando a trava está ocupada
+            timeout: Tempo máximo de espera em segundos (None = sem limite)
+
+        Returns:
+            bool: True se a trava foi adquirida
+        """
+        if self._fd is not None:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        inicio = time.monotonic()
+
+        while not self._try_lock(fd):
+            if not blocking or (timeout is not None and time.monotonic() - inicio >= timeout):
+                os.close(fd)
+                return False
+            time.sleep(self.poll_interval)
+
+        # Registra o PID do dono da trava (apenas informativo)
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Libera a trava"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,164 @@
+"""
+Dicionário local de termos com busca de múltiplos padrões (Aho-Corasick)
+Encontra, em uma única passada pelo texto, todas as ocorrências de milhares de termos,
+comparando o texto sem acentos e em minúsculas; termos com inicial maiúscula (nomes próprios)
+só são aceitos onde o texto original também tem inicial maiúscula
+"""
+
+import unicodedata
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# Valor padrão de Gazetteer.add(): o próprio termo
+_PROPRIO_TERMO = object()
+
+
+def fold_text(texto: str) -> str:
+    """
+    Remove acentos e converte para minúsculas preservando o comprimento do texto
+
+    Cada caractere é normalizado isoladamente, de forma que as posições no texto
+    normalizado correspondem às posições no texto original
+    """
+    caracteres = []
+    for caractere in texto:
+        base = ''.join(c for c in unicodedata.normalize('NFKD', caractere)
+                       if not unicodedata.combining(c)).lower()
+        if len(base) != 1:
+            base = caractere.lower() if len(caractere.lower()) == 1 else caractere
+        caracteres.append(base)
+    return ''.join(caracteres)
+
+
+class Gazetteer:
+    """
+    Autômato Aho-Corasick sobre termos normalizados (fold_text)
+
+    - add(): registra um termo e o valor retornado quando ele é encontrado
+    - build(): calcula os links de falha (chamado automaticamente na primeira busca)
+    - find(): ocorrências de palavras inteiras, sem sobreposição (a mais à esquerda e,
+      em empate, a mais longa prevalece - "Bradesco BBI" em vez de "Bradesco"); um termo
+      registrado com inicial maiúscula ("Vale") não corresponde a "vale" em minúsculas
+    """
+
+    def __init__(self):
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falhas: List[int] = [0]
+        self._saidas: List[List[Tuple[int, Any]]] = [[]]
+        self._termos: Dict[str, Any] = {}
+        # Termos registrados com inicial maiúscula (exigem inicial maiúscula no texto)
+        self._maiusculas: Dict[str, bool] = {}
+        self._construido = True
+
+    def add(self, termo: str, valor: Any = _PROPRIO_TERMO):
+        """
+        Registra um termo
+
+        Args:
+            termo: Texto a ser encontrado (comparado sem acentos e em minúsculas)
+            valor: Valor associado às ocorrências (padrão: o próprio termo; None registra
+                   um termo que apenas cobre o trecho do texto)
+        """
+        chave = fold_text(termo.strip())
+        if not chave:
+            return
+        if valor is _PROPRIO_TERMO:
+            valor = termo.strip()
+
+        no = 0
+        for caractere in chave:
+            proximo = self._transicoes[no].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[no][caractere] = proximo
+                self._transicoes.append({})
+                self._falhas.append(0)
+                self._saidas.append([])
+            no = proximo
+        # Termo repetido substitui o valor anterior
+        self._termos[chave] = valor
+        self._maiusculas[chave] = termo.strip()[0].isupper()
+        self._construido = False
+
+    def _no_final(self, chave: str) -> int:
+        no = 0
+        for caractere in chave:
+            no = self._transicoes[no][caractere]
+        return no
+
+    def build(self):
+        """Calcula os links de falha (busca em largura) e propaga as saídas"""
+        # Saídas recalculadas a partir dos termos (inclusive após novos add())
+        for no in range(len(self._saidas)):
+            self._saidas[no] = []
+        for chave, valor in self._termos.items():
+            self._saidas[self._no_final(chave)].append((len(chave), valor, self._maiusculas[chave]))
+
+        fila = deque()
+        for proximo in self._transicoes[0].values():
+            self._falhas[proximo] = 0
+            fila.append(proximo)
+
+        while fila:
+            no = fila.popleft()
+            for caractere, proximo in self._transicoes[no].items():
+                fila.append(proximo)
+                falha = self._falhas[no]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falhas[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo].extend(self._saidas[self._falhas[proximo]])
+
+        self._construido = True
+
+    def find(self, texto: str, texto_normalizado: Optional[str] = None) -> List[Tuple[int, int, Any]]:
+        """
+        Busca os termos no texto
+
+        Args:
+            texto: Texto original
+            texto_normalizado: Resultado de fold_text(texto), se já calculado
+
+        Returns:
+            Lista de (início, fim, valor) em ordem de posição
+        """
+        if not self._construido:
+            self.build()
+        if texto_normalizado is None:
+            texto_normalizado = fold_text(texto)
+
+        candidatas = []
+        no = 0
+        for posicao, caractere in enumerate(texto_normalizado):
+            while no and caractere not in self._transicoes[no]:
+                no = self._falhas[no]
+            no = self._transicoes[no].get(caractere, 0)
+            for comprimento, valor, maiuscula in self._saidas[no]:
+                inicio = posicao + 1 - comprimento
+                if maiuscula and not texto[inicio].isupper():
+                    continue
+                if self._palavra_inteira(texto_normalizado, inicio, posicao + 1):
+                    candidatas.append((inicio, posicao + 1, valor))
+
+        # Sem sobreposição: mais à esquerda, depois a mais longa
+        candidatas.sort(key=lambda ocorrencia: (ocorrencia[0], ocorrencia[0] - ocorrencia[1]))
+        ocorrencias = []
+        fim_anterior = 0
+        for inicio, fim, valor in candidatas:
+            if inicio >= fim_anterior:
+                ocorrencias.append((inicio, fim, valor))
+                fim_anterior = fim
+        return ocorrencias
+
+    @staticmethod
+    def _palavra_inteira(texto: str, inicio: int, fim: int) -> bool:
+        antes = texto[inicio - 1] if inicio > 0 else ' '
+        depois = texto[fim] if fim < len(texto) else ' '
+        return not antes.isalnum() and not depois.isalnum()
+
+    def __len__(self) -> int:
+        return len(self._termos)
+
+    def __contains__(self, termo: str) -> bool:
+        return fold_text(termo.strip()) in self._termos
@@ -0,0 +1,153 @@
+"""
+Cache persistente em log append-only (JSON Lines)
+Cada entrada nova é acrescentada ao final do arquivo; gravações são sincronizadas em disco
+(fsync) em pequenos lotes e o arquivo é compactado quando acumula entradas repetidas
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class JsonlCache:
+    """
+    Dicionário chave → valor persistido como log JSON Lines ({key_field: ..., value_field: ...})
+
+    - load(): leitura linha a linha (a última ocorrência de cada chave prevalece); uma linha
+      final incompleta, deixada por uma interrupção no meio da gravação, é ignorada
+    - append(): acrescenta a entrada ao buffer; o buffer é gravado e sincronizado (fsync)
+      a cada `batch_size` entradas ou `flush_interval` segundos
+    - compact(): reescreve o arquivo apenas com as entradas atuais (troca atômica)
+    """
+
+    def __init__(self, path, key_field: str = 'key', value_field: str = 'value',
+                 batch_size: int = 50, flush_interval: float = 5.0, compact_ratio: float = 2.0):
+        self.path = Path(path)
+        self.key_field = key_field
+        self.value_field = value_field
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_ratio = compact_ratio
+        self.logger = logging.getLogger(__name__)
+
+        self._dados: Dict[str, Any] = {}
+        self._linhas_arquivo = 0
+        self._buffer = []
+        self._ultimo_flush = time.monotonic()
+        self._arquivo = None
+        self._precisa_quebra = False
+        self._lock = threading.RLock()
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Carrega o log do disco
+
+        Returns:
+            Dicionário com as entradas atuais (a mesma instância é mantida internamente)
+        """
+        with self._lock:
+            self._dados = {}
+            self._linhas_arquivo = 0
+            if not self.path.exists():
+                return self._dados
+
+            invalidas = 0
+            with open(self.path, 'rb') as f:
+                for linha in f:
+                    if not linha.strip():
+                        continue
+                    self._linhas_arquivo += 1
+                    try:
+                        registro = json.loads(linha)
+                        self._dados[registro[self.key_field]] = registro[self.value_field]
+                    except (ValueError, KeyError, TypeError):
+                        invalidas += 1
+
+                # Gravação interrompida no meio da última linha: a próxima entrada começa em nova linha
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    self._precisa_quebra = f.read(1) != b'\n'
+
+            if invalidas:
+                self.logger.warning(f"{invalidas} linha(s) inválida(s) ignorada(s) em {self.path.name}")
+
+            if self.needs_compaction():
+                self.compact()
+            return self._dados
+
+    def append(self, key: str, value: Any):
+        """Registra uma entrada (gravada em disco no próximo lote)"""
+        with self._lock:
+            self._dados[key] = value
+            self._buffer.append(json.dumps({self.key_field: key, self.value_field: value}, ensure_ascii=False))
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._ultimo_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        """Grava as entradas pendentes e sincroniza o arquivo em disco"""
+        with self._lock:
+            self._ultimo_flush = time.monotonic()
+            if not self._buffer:
+                return
+
+            if self._arquivo is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._arquivo = open(self.path, 'a', encoding='utf-8')
+
+            prefixo = '\n' if self._precisa_quebra else ''
+            self._precisa_quebra = False
+            self._arquivo.write(prefixo + '\n'.join(self._buffer) + '\n')
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._linhas_arquivo += len(self._buffer)
+            self._buffer = []
+
+    def needs_compaction(self) -> bool:
+        """Indica se o arquivo acumula entradas repetidas/inválidas acima do limite"""
+        return self._linhas_arquivo > self.compact_ratio * max(len(self._dados), 1)
+
+    def compact(self):
+        """Reescreve o log apenas com as entradas atuais (arquivo temporário + troca atômica)"""
+        with self._lock:
+            self.flush()
+            self._fechar_arquivo()
+
+            temp_file = self.path.with_name(self.path.name + '.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for key, value in self._dados.items():
+                    f.write(json.dumps({self.key_field: key, self.value_field: value}, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.path)
+            self._precisa_quebra = False
+
+            self.logger.info(
+                f"Cache {self.path.name} compactado: {self._linhas_arquivo} → {len(self._dados)} linhas"
+            )
+            self._linhas_arquivo = len(self._dados)
+
+    def close(self, compact: Optional[bool] = None):
+        """
+        Grava as entradas pendentes e fecha o arquivo
+
+        Args:
+            compact: Força (True) ou impede (False) a compactação; None compacta se necessário
+        """
+        with self._lock:
+            self.flush()
+            if compact or (compact is None and self.needs_compaction()):
+                self.compact()
+            self._fechar_arquivo()
+
+    def _fechar_arquivo(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def __len__(self) -> int:
+        return len(self._dados)
@@ -0,0 +1,91 @@
+"""
+Leitura incremental do final de arquivos de log (tail)
+Lê apenas os bytes novos desde a última consulta, sem carregar o arquivo inteiro
+"""
+
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import List, Optional
+
+
+class LogTailer:
+    """
+    Acompanha o final de um arquivo de log guardando o deslocamento (em bytes) já lido
+
+    - Na primeira leitura, busca a partir do fim e lê no máximo `initial_bytes`
+    - Nas seguintes, lê apenas o que foi acrescentado desde a leitura anterior
+    - Detecta rotação (arquivo substituído) e truncamento, recomeçando do fim do novo arquivo
+    - Mantém em memória apenas as últimas `max_lines` linhas
+    """
+
+    def __init__(self, path, max_lines: int = 200, initial_bytes: int = 64 * 1024):
+        self.path = Path(path)
+        self.initial_bytes = initial_bytes
+        self._linhas = deque(maxlen=max_lines)
+        self._offset: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._parcial = b''
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self._offset = None
+        self._inode = None
+        self._parcial = b''
+
+    def read_new(self) -> List[str]:
+        """
+        Lê as linhas completas acrescentadas desde a última chamada
+
+        Returns:
+            Lista de linhas novas (sem quebra de linha)
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return []
+
+            # Arquivo rotacionado (outro inode) ou truncado: recomeça do fim
+            if self._inode != stat.st_ino or (self._offset is not None and stat.st_size < self._offset):
+                self._reset()
+                self._inode = stat.st_ino
+
+            inicio = self._offset
+            descartar_primeira = False
+            if inicio is None or stat.st_size - inicio > self.initial_bytes:
+                # Primeira leitura (ou atraso grande): apenas o trecho final do arquivo
+                inicio = max(0, stat.st_size - self.initial_bytes)
+                descartar_primeira = inicio > 0
+                self._parcial = b''
+
+            if inicio == stat.st_size:
+                self._offset = inicio
+                return []
+
+            with open(self.path, 'rb') as f:
+                f.seek(inicio)
+                dados = f.read(stat.st_size - inicio)
+            self._offset = inicio + len(dados)
+
+            blocos = (self._parcial + dados).split(b'\n')
+            # Último bloco é uma linha ainda incompleta (ou vazio)
+            self._parcial = blocos.pop()
+            if descartar_primeira and blocos:
+                blocos = blocos[1:]
+
+            novas = [bloco.decode('utf-8', errors='replace').rstrip('\r') for bloco in blocos]
+            self._linhas.extend(novas)
+            return novas
+
+    def tail(self, n: int) -> List[str]:
+        """
+        Retorna as últimas `n` linhas do arquivo (lendo antes apenas o conteúdo novo)
+        """
+        self.read_new()
+        with self._lock:
+            if n <= 0:
+                return []
+            return list(self._linhas)[-n:]
@@ -0,0 +1,122 @@
+"""
+Configuração de logging compartilhada entre main.py e app.py
+As mensagens são entregues a uma fila (QueueHandler); a gravação em arquivo e no console
+acontece em uma thread de fundo (QueueListener), fora das threads de processamento.
+Opcionalmente, as chamadas à DeepSeek são registradas em um log estruturado (JSON Lines).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+# Logger dos registros estruturados de chamadas à DeepSeek (não propaga para o app.log)
+CALLS_LOGGER_NAME = "deepseek.chamadas"
+logging.getLogger(CALLS_LOGGER_NAME).propagate = False
+
+FORMATO_PADRAO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handlers: List[logging.Handler] = []
+_lock = threading.Lock()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata um registro como uma linha JSON com os campos passados em extra={'campos': {...}}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'evento': record.getMessage()
+        }
+        dados.update(getattr(record, 'campos', {}))
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+def setup_logging(formatter: Optional[logging.Formatter] = None,
+                  log_dir='logs',
+                  level: int = logging.INFO,
+                  calls_log: bool = False) -> logging.Logger:
+    """
+    Configura o logging do processo (idempotente: execuções seguintes reaproveitam a fila)
+
+    Args:
+        formatter: Formatador das mensagens de texto (padrão: FORMATO_PADRAO)
+        log_dir: Diretório do app.log (e do deepseek_calls.jsonl)
+        level: Nível mínimo do logger raiz
+        calls_log: Grava também as chamadas à DeepSeek em deepseek_calls.jsonl
+
+    Returns:
+        Logger do módulo chamador (__main__)
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return logging.getLogger('__main__')
+
+        formatter = formatter or logging.Formatter(FORMATO_PADRAO)
+        log_dir = Path(log_dir)
+        log_dir.mkdir(exist_ok=True)
+
+        file_handler = logging.FileHandler(log_dir / 'app.log', encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers = [file_handler, stream_handler]
+
+        # Log estruturado das chamadas: somente os registros do logger de chamadas
+        calls_logger = logging.getLogger(CALLS_LOGGER_NAME)
+        if calls_log:
+            calls_handler = logging.FileHandler(log_dir / 'deepseek_calls.jsonl', encoding='utf-8')
+            calls_handler.setFormatter(JsonLinesFormatter())
+            calls_handler.addFilter(lambda record: record.name == CALLS_LOGGER_NAME)
+            file_handler.addFilter(lambda record: record.name != CALLS_LOGGER_NAME)
+            stream_handler.addFilter(lambda record: record.name != CALLS_LOGGER_NAME)
+            handlers.append(calls_handler)
+            calls_logger.setLevel(logging.INFO)
+        else:
+            calls_logger.disabled = True
+
+        fila: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(fila)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+        if calls_log:
+            calls_logger.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(fila, *handlers, respect_handler_level=True)
+        _listener.start()
+        _handlers[:] = handlers
+        atexit.register(stop_logging)
+
+    return logging.getLogger('__main__')
+
+
+def stop_logging():
+    """Esvazia a fila e encerra a thread de gravação"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def close_log_file(path):
+    """
+    Fecha os handlers que gravam no arquivo (ex.: após mover o app.log na rotação)
+
+    O arquivo é reaberto pelo handler na próxima mensagem
+    """
+    path = Path(path).resolve()
+    for handler in _handlers:
+        if isinstance(handler, logging.FileHandler) and Path(handler.baseFilename) == path:
+            handler.close()
@@ -0,0 +1,27 @@
+"""
+Publicação de progresso das etapas de processamento
+"""
+
+import logging
+from typing import Callable, Dict, Optional
+
+# Callback de progresso: recebe um dicionário com 'etapa', 'status' e contadores da etapa
+ProgressCallback = Callable[[Dict], None]
+
+
+def notify_progress(progress_callback: Optional[ProgressCallback], etapa: str, status: str, **info):
+    """
+    Publica um evento de progresso (falhas no callback nunca interrompem o processamento)
+
+    Args:
+        progress_callback: Callback de progresso (ou None)
+        etapa: Nome da etapa ('api', 'protagonismo', 'consolidacao', 'lote')
+        status: 'iniciada', 'andamento' ou 'concluida'
+        **info: Contadores da etapa (processados, total, chamadas_deepseek, ...)
+    """
+    if progress_callback is None:
+        return
+    try:
+        progress_callback({'etapa': etapa, 'status': status, **info})
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Erro no callback de progresso: {str(e)}")
@@ -0,0 +1,43 @@
+"""
+Limitador de taxa (token bucket) compartilhado entre threads
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Limita a quantidade de requisições por segundo entre todas as threads que o compartilham
+
+    Permite rajadas de até `burst` requisições; acima disso, cada chamada a acquire()
+    aguarda a sua vez (as vagas são reservadas em ordem de chegada).
+    """
+
+    def __init__(self, requisicoes_por_segundo: float, burst: int = 1):
+        if requisicoes_por_segundo <= 0:
+            raise ValueError("requisicoes_por_segundo deve ser maior que zero")
+        self.taxa = float(requisicoes_por_segundo)
+        self.capacidade = max(1, int(burst))
+        self._tokens = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Aguarda até que uma requisição possa ser feita
+
+        Returns:
+            float: Tempo de espera (segundos)
+        """
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            # Tokens negativos representam vagas já reservadas por outras threads
+            self._tokens -= 1
+            espera = 0.0 if self._tokens >= 0 else -self._tokens / self.taxa
+
+        if espera > 0:
+            time.sleep(espera)
+        return espera
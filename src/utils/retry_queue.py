@@ -0,0 +1,85 @@
+"""
+Fila de repetição de chamadas que falharam por erro transitório (timeout, conexão, 429, 5xx)
+Drenada ao final da análise, em rodadas com espera exponencial
+"""
+
+import time
+from typing import Callable, Dict, List
+
+import requests
+
+
+def is_transient_error(erro: Exception) -> bool:
+    """Erro que pode não se repetir: timeout, falha de conexão, HTTP 408/429 ou 5xx"""
+    if isinstance(erro, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(erro, 'response', None)
+    if response is None:
+        return False
+    return response.status_code in (408, 429) or response.status_code >= 500
+
+
+class RetryQueue:
+    """
+    Itens cuja chamada falhou por erro transitório, repetidos ao final da análise
+
+    - add(): enfileira um item para a próxima rodada
+    - drain(tentar): antes de cada rodada espera espera_base_s * 2^(rodada - 1), limitada a
+      espera_max_s, e chama tentar(item) para os itens da rodada; tentar retorna True quando o
+      item foi concluído e False quando falhou de novo por erro transitório (próxima rodada)
+
+    Args:
+        max_tentativas: Rodadas de repetição (0 = desativada: os itens falham de imediato)
+        espera_base_s: Espera antes da primeira rodada (segundos)
+        espera_max_s: Espera máxima entre rodadas (segundos)
+    """
+
+    def __init__(self, max_tentativas: int = 3, espera_base_s: float = 2.0, espera_max_s: float = 30.0):
+        self.max_tentativas = max_tentativas
+        self.espera_base_s = espera_base_s
+        self.espera_max_s = espera_max_s
+        self._itens: List = []
+        self.enfileirados = 0
+        self.rodadas = 0
+        self.repeticoes = 0
+        self.concluidos = 0
+        self.permanentes = 0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def add(self, item):
+        if not self.rodadas:
+            self.enfileirados += 1
+        self._itens.append(item)
+
+    def drain(self, tentar: Callable[[object], bool]) -> List:
+        """
+        Repete os itens enfileirados
+
+        Returns:
+            Itens que falharam em todas as tentativas (falha permanente)
+        """
+        while self._itens and self.rodadas < self.max_tentativas:
+            self.rodadas += 1
+            time.sleep(min(self.espera_base_s * 2 ** (self.rodadas - 1), self.espera_max_s))
+            itens, self._itens = self._itens, []
+            for item in itens:
+                self.repeticoes += 1
+                if tentar(item):
+                    self.concluidos += 1
+                else:
+                    self._itens.append(item)
+
+        permanentes, self._itens = self._itens, []
+        self.permanentes += len(permanentes)
+        return permanentes
+
+    def to_dict(self) -> Dict:
+        return {
+            'enfileirados': self.enfileirados,
+            'rodadas': self.rodadas,
+            'repeticoes': self.repeticoes,
+            'concluidos': self.concluidos,
+            'permanentes': self.permanentes
+        }
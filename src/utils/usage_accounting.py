@@ -0,0 +1,106 @@
+"""
+Contabilidade de tokens e custo das chamadas à DeepSeek
+Contadores exatos por marca e por caminho de decisão do nível de protagonismo
+"""
+
+import threading
+from typing import Dict, Optional
+
+# Caminhos de decisão do nível de uma marca em uma notícia
+CAMINHO_REGRA = 'regra'        # contagem de ocorrências, marca isolada no título ou marca ausente do texto
+CAMINHO_CACHE = 'cache'        # resposta já obtida para a notícia (análise combinada) reaproveitada
+CAMINHO_LLM = 'llm'            # resposta de uma chamada à DeepSeek
+CAMINHO_FALLBACK = 'fallback'  # chamada falhou ou orçamento esgotado: nível por regra/correção pós-processamento
+
+CAMINHOS = (CAMINHO_REGRA, CAMINHO_CACHE, CAMINHO_LLM, CAMINHO_FALLBACK)
+
+# *_estimados: chamadas em stream encerradas antes do bloco 'usage' (estimativa local, fora
+# dos contadores exatos informados pela API)
+CONTADORES = ('decisoes', 'requisicoes', 'prompt_tokens', 'completion_tokens', 'cached_tokens',
+              'prompt_tokens_estimados', 'completion_tokens_estimados')
+
+
+def _zeros() -> Dict[str, int]:
+    return dict.fromkeys(CONTADORES, 0)
+
+
+class UsageAccounting:
+    """
+    Decisões, requisições e tokens (prompt, completion e prompt em cache) por marca e caminho
+
+    - record_decision(): nível de uma marca decidido por um caminho
+    - record_request(): requisição à DeepSeek feita para a marca (tokens do 'usage' da resposta)
+    - to_dict(): totais, por caminho e por marca, com o custo estimado pelos preços informados
+
+    Args:
+        precos: Preços em USD por milhão de tokens ('entrada', 'entrada_cache', 'saida')
+    """
+
+    def __init__(self, precos: Optional[Dict[str, float]] = None):
+        self.precos = precos or {}
+        self._por_marca: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def _counters(self, marca: str, caminho: str) -> Dict[str, int]:
+        return self._por_marca.setdefault(marca, {}).setdefault(caminho, _zeros())
+
+    def record_decision(self, marca: str, caminho: str):
+        with self._lock:
+            self._counters(marca, caminho)['decisoes'] += 1
+
+    def record_request(self, marca: str, caminho: str, usage: Optional[Dict] = None):
+        """
+        Args:
+            usage: Bloco 'usage' da resposta (prompt_tokens, completion_tokens, prompt_cache_hit_tokens)
+                   ou a estimativa de um stream interrompido (prompt/completion_tokens_estimados)
+        """
+        usage = usage or {}
+        with self._lock:
+            contadores = self._counters(marca, caminho)
+            contadores['requisicoes'] += 1
+            contadores['prompt_tokens'] += usage.get('prompt_tokens', 0)
+            contadores['completion_tokens'] += usage.get('completion_tokens', 0)
+            contadores['cached_tokens'] += usage.get('prompt_cache_hit_tokens', 0)
+            contadores['prompt_tokens_estimados'] += usage.get('prompt_tokens_estimados', 0)
+            contadores['completion_tokens_estimados'] += usage.get('completion_tokens_estimados', 0)
+
+    def cost(self, contadores: Dict[str, int]) -> float:
+        """
+        Custo estimado (USD): prompt fora do cache, prompt em cache e completion
+        Os tokens estimados entram pelo preço sem cache
+        """
+        sem_cache = (contadores['prompt_tokens'] - contadores['cached_tokens']
+                     + contadores.get('prompt_tokens_estimados', 0))
+        completion = contadores['completion_tokens'] + contadores.get('completion_tokens_estimados', 0)
+        return (sem_cache * self.precos.get('entrada', 0.0)
+                + contadores['cached_tokens'] * self.precos.get('entrada_cache', 0.0)
+                + completion * self.precos.get('saida', 0.0)) / 1_000_000
+
+    def _with_cost(self, contadores: Dict[str, int]) -> Dict:
+        return {**contadores, 'custo_usd': round(self.cost(contadores), 6)}
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            por_marca = {marca: {caminho: dict(c) for caminho, c in caminhos.items()}
+                         for marca, caminhos in self._por_marca.items()}
+
+        total = _zeros()
+        por_caminho = {caminho: _zeros() for caminho in CAMINHOS}
+        for caminhos in por_marca.values():
+            for caminho, contadores in caminhos.items():
+                for nome, valor in contadores.items():
+                    total[nome] += valor
+                    por_caminho.setdefault(caminho, _zeros())[nome] += valor
+
+        return {
+            'total': self._with_cost(total),
+            'por_caminho': {caminho: self._with_cost(c) for caminho, c in por_caminho.items()},
+            'por_marca': {
+                marca: {
+                    'total': self._with_cost({nome: sum(c[nome] for c in caminhos.values()) for nome in CONTADORES}),
+                    **{caminho: self._with_cost(c) for caminho, c in caminhos.items()}
+                }
+                for marca, caminhos in por_marca.items()
+            },
+            'precos_usd_por_milhao': dict(self.precos)
+        }
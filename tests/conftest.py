@@ -0,0 +1,8 @@
+"""
+Configuração dos testes: raiz do projeto no path para importar o pacote src
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
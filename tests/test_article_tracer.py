@@ -0,0 +1,48 @@
+from src.article_tracer import merge_traces
+
+
+def _registro(noticia_id, duracao, fases, chamadas, marcas, caracteres=0):
+    return {
+        'run_id': '20240101_120000',
+        'noticia_id': noticia_id,
+        'caracteres': caracteres,
+        'marcas': marcas,
+        'duracao_s': duracao,
+        'fases': fases,
+        'chamadas': chamadas,
+        'prompt_tokens': sum(c['prompt_tokens'] for c in chamadas),
+        'completion_tokens': sum(c['completion_tokens'] for c in chamadas),
+        'cached_tokens': 0
+    }
+
+
+def test_registros_da_mesma_noticia_sao_agregados():
+    chamada = {'etapa': 'protagonismo', 'prompt_tokens': 100, 'completion_tokens': 5}
+    traces = [
+        _registro(1, 0.5, {'contagem': 0.2, 'deepseek': 0.3}, [chamada], ['Bradesco', 'Itaú'], 2000),
+        _registro(2, 0.1, {'contagem': 0.1}, [], ['Bradesco'], 500),
+        _registro(1, 1.0, {'deepseek': 0.9, 'montagem': 0.1}, [chamada], ['Itaú']),
+        _registro(1, 2.0, {'deepseek': 2.0}, [chamada], ['Itaú']),
+    ]
+
+    agregados = merge_traces(traces)
+
+    assert [trace['noticia_id'] for trace in agregados] == [1, 2]
+    noticia = agregados[0]
+    assert noticia['duracao_s'] == 3.5
+    assert noticia['fases'] == {'contagem': 0.2, 'deepseek': 3.2, 'montagem': 0.1}
+    assert len(noticia['chamadas']) == 3
+    assert noticia['prompt_tokens'] == 300
+    assert noticia['completion_tokens'] == 15
+    assert noticia['marcas'] == ['Bradesco', 'Itaú']
+    assert noticia['caracteres'] == 2000
+
+
+def test_agregacao_nao_altera_registros_originais():
+    traces = [_registro(1, 0.5, {'deepseek': 0.5}, [], ['Bradesco']),
+              _registro(1, 0.5, {'deepseek': 0.5}, [], ['Itaú'])]
+
+    merge_traces(traces)
+
+    assert traces[0]['fases'] == {'deepseek': 0.5}
+    assert traces[0]['marcas'] == ['Bradesco']
@@ -0,0 +1,56 @@
+"""
+Testes da política de retenção do catálogo de artefatos
+"""
+
+import os
+from types import SimpleNamespace
+
+from src.artifact_catalog import ArtifactCatalog, TIPO_LOTE_FINAL
+
+
+def _catalogo(tmp_path) -> ArtifactCatalog:
+    config = SimpleNamespace(arq_catalogo=tmp_path / 'catalogo.db', run_id='20250101_000000',
+                             retencao_execucoes=2, retencao_execucoes_compactadas=1)
+    return ArtifactCatalog(config)
+
+
+def _registrar_execucao(catalogo: ArtifactCatalog, tmp_path, run_id: str, mtime: float):
+    arquivo = tmp_path / f"Tabela_{run_id}.xlsx"
+    arquivo.write_bytes(b'conteudo ' * 100)
+    os.utime(arquivo, (mtime, mtime))
+    catalogo.register(arquivo, TIPO_LOTE_FINAL, run_id=run_id)
+
+
+def _estado(catalogo: ArtifactCatalog):
+    with catalogo._connect() as conn:
+        return dict(conn.execute("SELECT run_id, compactado FROM artefatos ORDER BY run_id"))
+
+
+def test_execucao_compactada_nao_passa_a_ser_a_mais_recente(tmp_path):
+    catalogo = _catalogo(tmp_path)
+    for dia in range(1, 5):
+        _registrar_execucao(catalogo, tmp_path, f"2025010{dia}_080000", mtime=1_700_000_000 + dia)
+
+    assert catalogo.apply_retention() == {'compactados': 1, 'removidos': 1}
+    assert _estado(catalogo) == {'20250102_080000': 1, '20250103_080000': 0, '20250104_080000': 0}
+
+    # Nova passada sem execuções novas não altera nada
+    assert catalogo.apply_retention() == {'compactados': 0, 'removidos': 0}
+
+    _registrar_execucao(catalogo, tmp_path, '20250105_080000', mtime=1_700_000_005)
+    assert catalogo.apply_retention() == {'compactados': 1, 'removidos': 1}
+    assert _estado(catalogo) == {'20250103_080000': 1, '20250104_080000': 0, '20250105_080000': 0}
+    assert (tmp_path / 'Tabela_20250103_080000.xlsx.gz').exists()
+    assert not (tmp_path / 'Tabela_20250102_080000.xlsx.gz').exists()
+
+
+def test_compactacao_mantem_mtime_original(tmp_path):
+    catalogo = _catalogo(tmp_path)
+    for dia in range(1, 4):
+        _registrar_execucao(catalogo, tmp_path, f"2025010{dia}_080000", mtime=1_700_000_000 + dia)
+
+    catalogo.apply_retention(keep_runs=2, keep_compressed_runs=1)
+
+    with catalogo._connect() as conn:
+        mtime = conn.execute("SELECT mtime FROM artefatos WHERE run_id = '20250101_080000'").fetchone()[0]
+    assert mtime == 1_700_000_001
@@ -0,0 +1,78 @@
+import json
+
+from src.brand_month_state import BrandMonthState
+
+
+def _artigo(article_id, brands, exclusive_brand=None):
+    return {'article_id': article_id, 'title': f"Título {article_id}", 'brands': brands,
+            'exclusive_brand': exclusive_brand, 'content_preview': "..."}
+
+
+def _execucao(pasta, artigos):
+    estado = BrandMonthState(pasta, '2025_01')
+    estado.load()
+    for content_hash, artigo in artigos:
+        estado.update(content_hash, artigo)
+    estado.close()
+    return estado.to_results('2025-01-31T10:00:00')
+
+
+def test_execucoes_diarias_acumulam_os_totais_do_mes(tmp_path):
+    _execucao(tmp_path, [('h1', _artigo('1', ['Bradesco'], 'Bradesco')), ('h2', _artigo('2', ['Itaú', 'XP']))])
+    resultados = _execucao(tmp_path, [('h3', _artigo('3', ['XP'])), ('h4', _artigo('4', None))])
+
+    assert resultados['total_articles'] == 4
+    assert resultados['processed_articles'] == 3
+    assert resultados['all_brands_frequency'] == {'Bradesco': 1, 'Itaú': 1, 'XP': 2}
+    assert [artigo['article_id'] for artigo in resultados['exclusive_articles']] == ['1']
+
+
+def test_reprocessar_artigo_substitui_a_contribuicao(tmp_path):
+    _execucao(tmp_path, [('h1', _artigo('1', ['Bradesco'], 'Bradesco')), ('h2', _artigo('2', ['Itaú']))])
+    resultados = _execucao(tmp_path, [('h1', _artigo('1', ['Bradesco', 'Itaú'])), ('h2', _artigo('2', ['Itaú']))])
+
+    assert resultados['total_articles'] == 2
+    assert resultados['all_brands_frequency'] == {'Bradesco': 1, 'Itaú': 2}
+    assert resultados['exclusive_articles'] == []
+
+
+def test_carregamento_le_apenas_o_log_posterior_ao_snapshot(tmp_path):
+    _execucao(tmp_path, [('h1', _artigo('1', ['Bradesco']))])
+    log = tmp_path / ".brands_state_2025_01.jsonl"
+    incorporado = log.stat().st_size
+    # Contribuições já incorporadas ao snapshot não são relidas
+    log.write_bytes(b' ' * (incorporado - 1) + b'\n')
+
+    # Execução interrompida antes do snapshot: as contribuições ficam apenas no log
+    estado = BrandMonthState(tmp_path, '2025_01')
+    estado.load()
+    estado.update('h2', _artigo('2', ['Itaú']))
+    estado._log.flush()
+    with open(log, 'a', encoding='utf-8') as f:
+        f.write('{"hash": "h3", "art')
+
+    estado = BrandMonthState(tmp_path, '2025_01')
+    estado.load()
+
+    assert estado.total_articles == 2
+    assert estado.brands_frequency == {'Bradesco': 1, 'Itaú': 1}
+    assert log.read_bytes().endswith(b'\n')
+
+
+def test_brands_month_sem_estado_semeia_os_totais(tmp_path):
+    (tmp_path / "brands_month_2025_01.json").write_text(json.dumps({
+        'total_articles': 10,
+        'processed_articles': 9,
+        'all_brands_frequency': {'Bradesco': 6, 'Itaú': 3},
+        'exclusive_articles': [{'article_id': '7', 'title': "Título 7", 'exclusive_brand': 'Bradesco',
+                                'all_brands': ['Bradesco'], 'content_preview': "..."}]
+    }), encoding='utf-8')
+
+    resultados = _execucao(tmp_path, [('h7', _artigo('7', ['Bradesco', 'Itaú'])), ('h11', _artigo('11', ['Itaú']))])
+
+    assert resultados['total_articles'] == 11
+    assert resultados['processed_articles'] == 10
+    assert resultados['all_brands_frequency'] == {'Bradesco': 6, 'Itaú': 5}
+    assert resultados['exclusive_articles'] == []
+    # Os totais semeados permanecem nas execuções seguintes
+    assert _execucao(tmp_path, [])['total_articles'] == 11
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.call_budget import CallBudget, parse_deadline
+
+
+def test_parse_deadline():
+    agora = datetime(2025, 1, 31, 8, 0)
+    assert parse_deadline("09:30", agora) == datetime(2025, 1, 31, 9, 30)
+    assert parse_deadline("2025-02-01T07:00", agora) == datetime(2025, 2, 1, 7, 0)
+    assert parse_deadline("", agora) is None
+    with pytest.raises(ValueError):
+        parse_deadline("amanhã", agora)
+
+
+def test_sem_limites_sempre_permite():
+    orcamento = CallBudget(max_chamadas=0)
+    orcamento.consume(1000)
+
+    assert not orcamento.ativo
+    assert orcamento.allows()
+
+
+def test_maximo_de_chamadas():
+    orcamento = CallBudget(max_chamadas=2)
+    assert orcamento.allows()
+    orcamento.consume(2)
+
+    assert not orcamento.allows()
+    assert not orcamento.allows()
+    assert orcamento.to_dict()['recusadas'] == 2
+    assert orcamento.esgotado_por == 'max_chamadas'
+
+
+def test_prazo_vencido():
+    orcamento = CallBudget(prazo=datetime.now() - timedelta(seconds=1))
+
+    assert orcamento.ativo
+    assert not orcamento.allows()
+    assert orcamento.esgotado_por == 'prazo'
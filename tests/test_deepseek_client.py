@@ -0,0 +1,136 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.config_manager import ConfigManager
+from src.deepseek_client import DeepSeekClient
+from src.protagonismo_analyzer import extract_level
+from src.utils.usage_accounting import CAMINHO_LLM, UsageAccounting
+
+
+class _Resposta:
+    """Resposta HTTP mínima (completa ou em stream) que registra os eventos lidos"""
+
+    def __init__(self, conteudo=None, blocos=None, usage=None):
+        self.ok = True
+        self.status_code = 200
+        self.conteudo = conteudo
+        self.blocos = blocos or []
+        self.usage = usage
+        self.lidos = 0
+        self.fechada = False
+        self.headers = {'Content-Type': 'text/event-stream' if blocos else 'application/json'}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'choices': [{'message': {'content': self.conteudo}}], 'usage': self.usage or {}}
+
+    def iter_lines(self):
+        eventos = [{'choices': [{'delta': {'content': bloco}}]} for bloco in self.blocos]
+        if self.usage:
+            eventos.append({'choices': [], 'usage': self.usage})
+        for evento in eventos:
+            self.lidos += 1
+            yield b'data: ' + json.dumps(evento).encode('utf-8')
+        yield b'data: [DONE]'
+
+    def close(self):
+        self.fechada = True
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setenv('DEEPSEEK_API_KEY', 'teste')
+    monkeypatch.setenv('DEEPSEEK_REQUISICOES_POR_SEGUNDO', '1000')
+    return DeepSeekClient(ConfigManager())
+
+
+def _enviar(cliente, monkeypatch, resposta):
+    payloads = []
+
+    def post(url, headers=None, json=None, **kwargs):
+        payloads.append(json)
+        return resposta
+
+    monkeypatch.setattr(cliente.session, 'post', post)
+    return payloads
+
+
+def test_max_tokens_e_stop_vao_no_payload(cliente, monkeypatch):
+    payloads = _enviar(cliente, monkeypatch, _Resposta("Nível 2", usage={'prompt_tokens': 50}))
+
+    cliente.chat([{'role': 'user', 'content': 'texto'}], max_tokens=16, stop=['\n\n'])
+
+    assert payloads[0]['max_tokens'] == 16
+    assert payloads[0]['stop'] == ['\n\n']
+    assert 'stream_options' not in payloads[0]
+
+
+def test_stream_completo_usa_o_uso_informado_pela_api(cliente, monkeypatch):
+    usage = {'prompt_tokens': 120, 'completion_tokens': 3, 'prompt_cache_hit_tokens': 64}
+    payloads = _enviar(cliente, monkeypatch, _Resposta(blocos=['Nível', ' 2'], usage=usage))
+
+    resposta = cliente.chat([{'role': 'user', 'content': 'texto'}], stream=True)
+
+    assert payloads[0]['stream_options'] == {'include_usage': True}
+    assert resposta == {'content': 'Nível 2', 'usage': usage}
+    assert cliente.stats['prompt_tokens'] == 120
+    assert cliente.stats['prompt_tokens_estimados'] == 0
+    assert cliente.stats['streams_interrompidos'] == 0
+
+
+def test_stream_encerrado_assim_que_a_condicao_e_satisfeita(cliente, monkeypatch):
+    stream = _Resposta(blocos=['Nív', 'el 3', '\n', 'Justificativa', ' longa'],
+                       usage={'prompt_tokens': 120, 'completion_tokens': 40})
+    _enviar(cliente, monkeypatch, stream)
+    mensagens = [{'role': 'system', 'content': 'x' * 400}, {'role': 'user', 'content': 'y' * 40}]
+
+    resposta = cliente.chat(mensagens, stream=True, encerrar_quando=extract_level)
+
+    assert resposta['content'] == 'Nível 3'
+    assert stream.lidos == 2
+    assert stream.fechada
+    # Sem o bloco 'usage': tokens estimados, fora dos contadores exatos
+    assert resposta['usage'] == {'completion_tokens_estimados': 2, 'prompt_tokens_estimados': 110}
+    assert cliente.stats['prompt_tokens'] == 0
+    assert cliente.stats['completion_tokens'] == 0
+    assert cliente.stats['prompt_tokens_estimados'] == 110
+    assert cliente.stats['streams_interrompidos'] == 1
+
+    contabilidade = UsageAccounting({'entrada': 1_000_000, 'saida': 1_000_000})
+    contabilidade.record_request('Bradesco', CAMINHO_LLM, resposta['usage'])
+    total = contabilidade.to_dict()['total']
+    assert (total['prompt_tokens'], total['prompt_tokens_estimados']) == (0, 110)
+    assert total['custo_usd'] == 112
+
+
+def test_hedge_duplica_requisicao_lenta_ate_o_limite(cliente):
+    cliente.hedge_max_fracao = 0.5
+    cliente._latencias.extend([0.01] * cliente.hedge_min_amostras)
+    cliente._hedge_executor = ThreadPoolExecutor(max_workers=4)
+    envios = []
+
+    def enviar(payload):
+        envios.append(payload)
+        # Primeira requisição de cada chamada é lenta; a duplicada responde na hora
+        if len(envios) % 2:
+            time.sleep(0.3)
+        return _Resposta("Nível 1")
+
+    cliente._send = enviar
+    cliente.stats['chamadas'] = 1
+
+    assert cliente._post({}).conteudo == "Nível 1"
+    assert cliente.stats['hedges'] == 1
+    assert cliente.stats['hedges_vencedores'] == 1
+
+    # Limite atingido (hedges >= 50% das chamadas): a chamada lenta não é duplicada
+    envios.clear()
+    cliente._post({})
+    assert len(envios) == 1
+    assert cliente.stats['hedges'] == 1
+    cliente._hedge_executor.shutdown(wait=True)
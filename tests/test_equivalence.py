@@ -0,0 +1,48 @@
+import pandas as pd
+
+from benchmarks import equivalence
+from benchmarks.equivalence import run_engine
+from src.config_manager import ConfigManager
+from src.deepseek_client import DeepSeekClient
+from src.utils.jsonl_cache import JsonlCache
+
+
+class _MotorPorNoticia:
+    """Motor mínimo: uma chamada à DeepSeek por notícia"""
+
+    def __init__(self, config_manager):
+        self.deepseek_client = None
+
+    def analyze_protagonismo(self, final_df, salvar=False):
+        niveis = [
+            self.deepseek_client.chat([{'role': 'user', 'content': titulo}], max_tokens=8)['content']
+            for titulo in final_df['Titulo']
+        ]
+        return final_df.assign(Nivel=niveis)
+
+
+def test_candidato_reproduz_as_respostas_gravadas_pela_referencia(tmp_path, monkeypatch):
+    chamadas_api = []
+
+    def chat_api(self, messages, temperature=0.1, model="deepseek-chat", **kwargs):
+        chamadas_api.append(messages[0]['content'])
+        return {'content': f"Nível {len(chamadas_api) % 3 + 1}", 'usage': {}}
+
+    monkeypatch.setattr(DeepSeekClient, 'chat', chat_api)
+    monkeypatch.setenv('DEEPSEEK_API_KEY', 'teste')
+    config = ConfigManager()
+    final_df = pd.DataFrame({'Id': [1, 2, 3], 'Titulo': ['Bradesco lucra', 'Itaú cai', 'Ágora indica']})
+    # Lote maior que as notícias: nada chega ao disco antes do candidato
+    gravacoes = JsonlCache(tmp_path / "respostas.jsonl", batch_size=50, flush_interval=60)
+    respostas = gravacoes.load()
+
+    ref, _, replay_ref = run_engine(_MotorPorNoticia, config, final_df, gravacoes, respostas,
+                                    estrito=False, repeticoes=1)
+    cand, _, replay_cand = run_engine(_MotorPorNoticia, config, final_df, gravacoes, respostas,
+                                      estrito=True, repeticoes=1)
+    gravacoes.close()
+
+    assert replay_ref['gravadas'] == 3
+    assert replay_cand == {'reproduzidas': 3, 'gravadas': 0, 'ausentes': 0}
+    assert len(chamadas_api) == 3
+    assert equivalence.is_equivalent(equivalence.diff_frames(ref, cand))
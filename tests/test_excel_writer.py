@@ -0,0 +1,56 @@
+"""
+Testes do escritor streaming dos arquivos finais do lote
+"""
+
+import zipfile
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.utils.excel_writer import write_final_workbooks, MAX_URLS_POR_PLANILHA
+
+
+def _hyperlinks_na_planilha(arquivo) -> int:
+    with zipfile.ZipFile(arquivo) as pacote:
+        return pacote.read('xl/worksheets/sheet1.xml').count(b'<hyperlink ')
+
+
+def test_acima_do_limite_de_urls_nenhuma_celula_e_perdida(tmp_path):
+    linhas = MAX_URLS_POR_PLANILHA + 500
+    df = pd.DataFrame({
+        'Id': range(linhas),
+        'UrlVisualizacao': [f"https://exemplo.com/noticia/{i}" for i in range(linhas)],
+        'UrlOriginal': [f"https://origem.com/{i}" for i in range(linhas)],
+    })
+    simples, links = tmp_path / 'simples.xlsx', tmp_path / 'links.xlsx'
+
+    stats = write_final_workbooks(df, str(simples), str(links))
+
+    assert stats['linhas'] == linhas
+    assert stats['urls'] == MAX_URLS_POR_PLANILHA
+    assert stats['formulas'] == 500
+    # Apenas a coluna de URL do arquivo com hyperlinks recebe links
+    assert _hyperlinks_na_planilha(simples) == 0
+    assert _hyperlinks_na_planilha(links) == MAX_URLS_POR_PLANILHA
+
+    ultima = linhas + 1  # cabeçalho na linha 1
+    planilha = load_workbook(simples, read_only=True)['Sheet1']
+    assert [c.value for c in next(planilha.iter_rows(min_row=ultima, max_row=ultima))] == [
+        linhas - 1, f"https://exemplo.com/noticia/{linhas - 1}", f"https://origem.com/{linhas - 1}"
+    ]
+    planilha = load_workbook(links, read_only=True)['Sheet1']
+    linha = [c.value for c in next(planilha.iter_rows(min_row=ultima, max_row=ultima))]
+    assert linha[1].startswith('=HYPERLINK("https://exemplo.com/noticia/')
+    assert linha[2] == f"https://origem.com/{linhas - 1}"
+
+
+def test_textos_sao_gravados_como_texto(tmp_path):
+    df = pd.DataFrame({'Titulo': ['=1+1', 'www.exemplo.com'], 'Ocorrencias': [3, None]})
+    arquivo = tmp_path / 'simples.xlsx'
+
+    write_final_workbooks(df, arquivo_simples=str(arquivo))
+
+    planilha = load_workbook(arquivo)['Sheet1']
+    assert planilha['A2'].value == '=1+1' and planilha['A2'].data_type == 's'
+    assert planilha['A3'].value == 'www.exemplo.com'
+    assert planilha['B2'].value == 3 and planilha['B3'].value is None
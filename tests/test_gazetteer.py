@@ -0,0 +1,75 @@
+"""
+Testes do dicionário local de marcas (Gazetteer) e da resolução local do extrator
+"""
+
+from src.brand_extractor import BrandExtractor
+from src.utils.gazetteer import Gazetteer, fold_text
+
+
+def _gazetteer(*termos) -> Gazetteer:
+    gazetteer = Gazetteer()
+    for termo in termos:
+        gazetteer.add(termo)
+    gazetteer.add('brasil', None)
+    return gazetteer
+
+
+def _marcas(gazetteer: Gazetteer, texto: str):
+    return [valor for _, _, valor in gazetteer.find(texto) if valor is not None]
+
+
+def test_fold_text_preserva_posicoes():
+    assert fold_text('Ágora São Paulo') == 'agora sao paulo'
+    assert len(fold_text('Itaú Unibanco')) == len('Itaú Unibanco')
+
+
+def test_palavras_comuns_em_minusculas_nao_sao_marcas():
+    gazetteer = _gazetteer('Vale', 'Claro', 'Bradesco', 'Ágora')
+    assert _marcas(gazetteer, 'Vale a pena? vale a pena, é claro, agora') == ['Vale']
+    assert _marcas(gazetteer, 'vale a pena, é claro') == []
+
+
+def test_nome_proprio_com_e_sem_acento():
+    gazetteer = _gazetteer('Vale', 'Claro', 'Bradesco', 'Ágora', 'iFood')
+    assert _marcas(gazetteer, 'A VALE, a Claro e o BRADESCO; Agora e iFood') == [
+        'Vale', 'Claro', 'Bradesco', 'Ágora', 'iFood'
+    ]
+
+
+def test_termo_em_minusculas_aceita_qualquer_grafia():
+    gazetteer = _gazetteer('Bradesco')
+    assert [(inicio, fim) for inicio, fim, _ in gazetteer.find('Brasil e brasil')] == [(0, 6), (9, 15)]
+
+
+def test_mais_longa_prevalece():
+    gazetteer = _gazetteer('Bradesco', 'Bradesco BBI')
+    assert _marcas(gazetteer, 'O Bradesco BBI e o Bradesco') == ['Bradesco BBI', 'Bradesco']
+
+
+def _extrator(*termos) -> BrandExtractor:
+    extrator = BrandExtractor.__new__(BrandExtractor)
+    extrator.gazetteer = _gazetteer(*termos)
+    return extrator
+
+
+def test_resolucao_local_ignora_palavras_comuns():
+    extrator = _extrator('Vale', 'Claro', 'Bradesco')
+    assert extrator.resolve_locally('Bradesco sobe', 'vale a pena, é claro, olhar o Bradesco') == ['Bradesco']
+
+
+def test_marca_ambigua_segue_para_a_api():
+    extrator = _extrator('Vale', 'Claro', 'Bradesco')
+    assert extrator.resolve_locally('Bradesco sobe', 'Vale a pena olhar o Bradesco') is None
+    assert extrator.resolve_locally('Bradesco e Claro', 'Resultados no Brasil') is None
+
+
+def test_pre_selecao_mantem_apenas_frases_com_candidatas():
+    extrator = _extrator('Bradesco')
+    extrator.max_content_chars = 10_000
+    conteudo = ("Analistas esperam juros menores. Economistas discordam. Ninguém sabe ao certo. "
+                "O Bradesco anunciou resultados. A Caixa Econômica Federal também. "
+                "Segundo a XP, o cenário melhora. Banco do Brasil em alta.")
+    assert extrator.select_candidate_text(conteudo) == (
+        "O Bradesco anunciou resultados. A Caixa Econômica Federal também. "
+        "Segundo a XP, o cenário melhora."
+    )
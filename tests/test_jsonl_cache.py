@@ -0,0 +1,37 @@
+from src.utils.jsonl_cache import JsonlCache
+
+
+def test_entradas_persistem_e_ultima_ocorrencia_prevalece(tmp_path):
+    arquivo = tmp_path / "cache.jsonl"
+    cache = JsonlCache(arquivo, batch_size=2, compact_ratio=10)
+    cache.load()
+    cache.append('a', 1)
+    cache.append('b', 2)
+    cache.append('a', 3)
+    cache.close(compact=False)
+
+    assert len(arquivo.read_text(encoding='utf-8').splitlines()) == 3
+    assert JsonlCache(arquivo, compact_ratio=10).load() == {'a': 3, 'b': 2}
+
+
+def test_linha_final_incompleta_e_ignorada(tmp_path):
+    arquivo = tmp_path / "cache.jsonl"
+    arquivo.write_text('{"key": "a", "value": 1}\n{"key": "b", "val', encoding='utf-8')
+
+    cache = JsonlCache(arquivo, compact_ratio=10)
+    assert cache.load() == {'a': 1}
+    cache.append('c', 3)
+    cache.close(compact=False)
+
+    assert JsonlCache(arquivo, compact_ratio=10).load() == {'a': 1, 'c': 3}
+
+
+def test_compactacao_mantem_apenas_entradas_atuais(tmp_path):
+    arquivo = tmp_path / "cache.jsonl"
+    cache = JsonlCache(arquivo, batch_size=1)
+    cache.load()
+    for valor in range(5):
+        cache.append('a', valor)
+    cache.close()
+
+    assert arquivo.read_text(encoding='utf-8').splitlines() == ['{"key": "a", "value": 4}']
@@ -0,0 +1,62 @@
+import pandas as pd
+
+from src.protagonismo_analyzer import (
+    COLUNA_NIVEL_POR_REGRA, ProtagonismoAnalyzer, extract_level
+)
+from src.utils.usage_accounting import UsageAccounting
+
+
+def _analisador():
+    analisador = ProtagonismoAnalyzer.__new__(ProtagonismoAnalyzer)
+    analisador.accounting = UsageAccounting()
+    return analisador
+
+
+def _pendente(marca, contagem, porta_vozes=None, citacao_minima=False):
+    return {
+        'noticia_id': 1, 'marca': marca, 'contagem': contagem,
+        'porta_vozes': porta_vozes or [],
+        'content_check': {'should_be_minimum_citation': citacao_minima}
+    }
+
+
+def test_extract_level():
+    assert extract_level("Nível 2\n\nJustificativa") == 'Nível 2'
+    assert extract_level("nivel: 3") == 'Nível 3'
+    assert extract_level("Nenhum Nivel Encontrado") == 'Nenhum Nível Encontrado'
+    assert extract_level("Sem classificação") is None
+
+
+def test_nivel_por_regra_segue_faixas_de_contagem():
+    analisador = _analisador()
+    assert analisador._rule_based_level(_pendente('Itaú', 6)) == 'Nível 1'
+    assert analisador._rule_based_level(_pendente('Itaú', 3)) == 'Nível 2'
+    assert analisador._rule_based_level(_pendente('Itaú', 1)) == 'Nível 3'
+    assert analisador._rule_based_level(_pendente('Bradesco', 0, citacao_minima=True)) == 'Nível 3'
+    assert analisador._rule_based_level(_pendente('Itaú', 0)) == 'Nenhum Nível Encontrado'
+
+
+def test_nivel_por_regra_aplica_upgrade_por_porta_voz():
+    analisador = _analisador()
+    assert analisador._rule_based_level(_pendente('Bradesco', 2, ['Marcelo Noronha'])) == 'Nível 2'
+    assert analisador._rule_based_level(_pendente('Bradesco', 0, ['Marcelo Noronha'],
+                                                  citacao_minima=True)) == 'Nível 3'
+    # Marca sem porta-vozes cadastrados não tem upgrade
+    assert analisador._rule_based_level(_pendente('Itaú', 2, ['Marcelo Noronha'])) == 'Nível 3'
+
+
+def test_nivel_por_regra_preenche_porta_voz_e_sinaliza_marca():
+    analisador = _analisador()
+    resultado_df = pd.DataFrame({'Id': [1, 2], COLUNA_NIVEL_POR_REGRA: [None, None],
+                                 'Porta-Voz Bradesco': [None, None]})
+    mask = resultado_df['Id'] == 1
+
+    nivel = analisador._apply_rule_level(
+        _pendente('Bradesco', 1, ['Marcelo Noronha', 'Octavio de Lazari']), resultado_df, mask
+    )
+    analisador._apply_rule_level(_pendente('Itaú', 1), resultado_df, mask)
+
+    assert nivel == 'Nível 2'
+    assert resultado_df.loc[0, 'Porta-Voz Bradesco'] == 'Marcelo Noronha, Octavio de Lazari'
+    assert resultado_df.loc[0, COLUNA_NIVEL_POR_REGRA] == 'Bradesco, Itaú'
+    assert resultado_df.loc[1, COLUNA_NIVEL_POR_REGRA] is None
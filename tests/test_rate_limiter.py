@@ -0,0 +1,17 @@
+import pytest
+
+from src.utils.rate_limiter import RateLimiter
+
+
+def test_rajada_sem_espera_e_reserva_em_ordem():
+    limitador = RateLimiter(requisicoes_por_segundo=20, burst=2)
+
+    assert limitador.acquire() == 0
+    assert limitador.acquire() == 0
+    # Terceira requisição aguarda ~1/20 s
+    assert 0 < limitador.acquire() <= 0.05
+
+
+def test_taxa_invalida():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
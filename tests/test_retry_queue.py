@@ -0,0 +1,44 @@
+import requests
+
+from src.utils.retry_queue import RetryQueue, is_transient_error
+
+
+def _erro_http(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+def test_erros_transitorios():
+    assert is_transient_error(requests.exceptions.ReadTimeout())
+    assert is_transient_error(requests.exceptions.ConnectionError())
+    assert is_transient_error(_erro_http(429))
+    assert is_transient_error(_erro_http(503))
+    assert not is_transient_error(_erro_http(401))
+    assert not is_transient_error(ValueError("resposta inválida"))
+
+
+def test_drain_repete_ate_concluir_ou_esgotar_rodadas():
+    fila = RetryQueue(max_tentativas=3, espera_base_s=0)
+    falhas_restantes = {'a': 1, 'b': 10}
+    fila.add('a')
+    fila.add('b')
+
+    def tentar(item):
+        falhas_restantes[item] -= 1
+        return falhas_restantes[item] < 0
+
+    permanentes = fila.drain(tentar)
+
+    assert permanentes == ['b']
+    assert len(fila) == 0
+    assert fila.to_dict() == {'enfileirados': 2, 'rodadas': 3, 'repeticoes': 5,
+                              'concluidos': 1, 'permanentes': 1}
+
+
+def test_fila_desativada_falha_de_imediato():
+    fila = RetryQueue(max_tentativas=0)
+    fila.add('a')
+
+    assert fila.drain(lambda item: True) == ['a']
+    assert fila.rodadas == 0
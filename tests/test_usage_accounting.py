@@ -0,0 +1,35 @@
+from src.utils.usage_accounting import (
+    CAMINHO_CACHE, CAMINHO_LLM, CAMINHO_REGRA, UsageAccounting
+)
+
+
+def test_totais_por_marca_e_caminho_com_custo():
+    contabilidade = UsageAccounting({'entrada': 0.27, 'entrada_cache': 0.07, 'saida': 1.10})
+    contabilidade.record_decision('Bradesco', CAMINHO_REGRA)
+    contabilidade.record_decision('Bradesco', CAMINHO_LLM)
+    contabilidade.record_request('Bradesco', CAMINHO_LLM, {
+        'prompt_tokens': 1_000_000, 'completion_tokens': 1_000_000, 'prompt_cache_hit_tokens': 500_000
+    })
+    contabilidade.record_decision('Itaú', CAMINHO_CACHE)
+
+    resumo = contabilidade.to_dict()
+
+    assert resumo['total']['decisoes'] == 3
+    assert resumo['total']['requisicoes'] == 1
+    assert resumo['total']['custo_usd'] == round(0.5 * 0.27 + 0.5 * 0.07 + 1.10, 6)
+    assert resumo['por_caminho'][CAMINHO_REGRA]['decisoes'] == 1
+    assert resumo['por_caminho'][CAMINHO_CACHE]['custo_usd'] == 0
+    assert resumo['por_marca']['Bradesco']['total']['decisoes'] == 2
+    assert resumo['por_marca']['Bradesco'][CAMINHO_LLM]['cached_tokens'] == 500_000
+    assert 'Itaú' in resumo['por_marca']
+
+
+def test_requisicao_sem_usage():
+    contabilidade = UsageAccounting()
+    contabilidade.record_request('Santander', CAMINHO_LLM)
+
+    resumo = contabilidade.to_dict()
+
+    assert resumo['total']['requisicoes'] == 1
+    assert resumo['total']['prompt_tokens'] == 0
+    assert resumo['total']['custo_usd'] == 0